@@ -1,5 +1,7 @@
 #!python
 
+from collections import deque
+
 
 class BinaryTreeNode(object):
 
@@ -8,6 +10,8 @@ class BinaryTreeNode(object):
         self.data = data
         self.left = None
         self.right = None
+        # Height of this node as maintained by the binary search tree it is in
+        self.cached_height = 0
 
     def __repr__(self):
         """Return a string representation of this binary tree node."""
@@ -15,24 +19,47 @@ class BinaryTreeNode(object):
 
     def is_leaf(self):
         """Return True if this node is a leaf (has no children)."""
-        # TODO: Check if both left child and right child have no value
-        return ... and ...
+        # Check if both left child and right child have no value
+        return self.left is None and self.right is None
 
     def is_branch(self):
         """Return True if this node is a branch (has at least one child)."""
-        # TODO: Check if either left child or right child has a value
-        return ... or ...
+        # Check if either left child or right child has a value
+        return self.left is not None or self.right is not None
 
     def height(self):
         """Return the height of this node (the number of edges on the longest
         downward path from this node to a descendant leaf node).
-        TODO: Best and worst case running time: ??? under what conditions?"""
-        # TODO: Check if left child has a value and if so calculate its height
-        ...
-        # TODO: Check if right child has a value and if so calculate its height
-        ...
+        Height is found iteratively by counting levels of this subtree.
+        Best and worst case running time: O(n) for n nodes in this subtree
+        because every descendant node is visited once."""
+        height = -1
+        level = [self]
+        # Loop until we descend past the deepest level of leaf nodes
+        while level:
+            height += 1
+            # Collect all children of nodes in this level
+            next_level = []
+            for node in level:
+                if node.left is not None:
+                    next_level.append(node.left)
+                if node.right is not None:
+                    next_level.append(node.right)
+            level = next_level
+        return height
+
+    def _height_recursive(self):
+        """Return the height of this node, calculated recursively.
+        Best and worst case running time: O(n) for n nodes in this subtree
+        because every descendant node is visited once."""
+        # Check if left child has a value and if so calculate its height
+        left_height = (self.left._height_recursive()
+                       if self.left is not None else -1)
+        # Check if right child has a value and if so calculate its height
+        right_height = (self.right._height_recursive()
+                        if self.right is not None else -1)
         # Return one more than the greater of the left height and right height
-        ...
+        return 1 + max(left_height, right_height)
 
 
 class BinarySearchTree(object):
@@ -56,75 +83,157 @@ class BinarySearchTree(object):
     def height(self):
         """Return the height of this tree (the number of edges on the longest
         downward path from this tree's root node to a descendant leaf node).
-        TODO: Best and worst case running time: ??? under what conditions?"""
-        # TODO: Check if root node has a value and if so calculate its height
-        ...
+        Best and worst case running time: O(1) because each node's height is
+        cached and kept up to date when items are inserted and deleted."""
+        # Check if root node has a value and if so return its cached height
+        if self.root is None:
+            return -1
+        return self.root.cached_height
+
+    def shape_statistics(self):
+        """Return a dictionary of statistics about the shape of this tree for
+        monitoring how far it has degenerated from a balanced tree:
+        size, height, min_height (height of a complete tree of this size),
+        average_depth of all nodes, balance_factors (a dictionary mapping
+        each balance factor, left subtree height minus right subtree height,
+        to its number of nodes) and max_imbalance (largest absolute balance
+        factor of any node).
+        Running time: O(n) for n nodes because each node is visited once."""
+        total_depth = 0
+        balance_factors = {}
+        stack = [(self.root, 0)] if self.root is not None else []
+        while stack:
+            node, depth = stack.pop()
+            total_depth += depth
+            left_height = -1
+            right_height = -1
+            if node.left is not None:
+                left_height = node.left.cached_height
+                stack.append((node.left, depth + 1))
+            if node.right is not None:
+                right_height = node.right.cached_height
+                stack.append((node.right, depth + 1))
+            balance = left_height - right_height
+            balance_factors[balance] = balance_factors.get(balance, 0) + 1
+        return {
+            'size': self.size,
+            'height': self.height(),
+            'min_height': self.size.bit_length() - 1,
+            'average_depth': total_depth / self.size if self.size else 0.0,
+            'balance_factors': balance_factors,
+            'max_imbalance': max([abs(balance) for balance in balance_factors]
+                                 or [0]),
+        }
 
     def contains(self, item):
         """Return True if this binary search tree contains the given item.
-        TODO: Best case running time: ??? under what conditions?
-        TODO: Worst case running time: ??? under what conditions?"""
+        Best case running time: O(1) if the given item is in the root node.
+        Worst case running time: O(h) for a tree of height h if the given item
+        is in a leaf node or not in this tree (h = n for a degenerate tree)."""
         # Find a node with the given item, if any
-        node = self._find_node_recursive(item, self.root)
+        node = self._find_node_iterative(item)
         # Return True if a node was found, or False
         return node is not None
 
     def search(self, item):
         """Return an item in this binary search tree matching the given item,
         or None if the given item is not found.
-        TODO: Best case running time: ??? under what conditions?
-        TODO: Worst case running time: ??? under what conditions?"""
+        Best case running time: O(1) if the given item is in the root node.
+        Worst case running time: O(h) for a tree of height h if the given item
+        is in a leaf node or not in this tree (h = n for a degenerate tree)."""
         # Find a node with the given item, if any
-        node = self._find_node_recursive(item, self.root)
-        # TODO: Return the node's data if found, or None
-        return node.data if ... else None
+        node = self._find_node_iterative(item)
+        # Return the node's data if found, or None
+        return node.data if node is not None else None
 
     def insert(self, item):
         """Insert the given item in order into this binary search tree.
-        TODO: Best case running time: ??? under what conditions?
-        TODO: Worst case running time: ??? under what conditions?"""
+        If an equal item is already in this tree, replace it instead.
+        Best case running time: O(1) if this tree is empty.
+        Worst case running time: O(h) for a tree of height h because we
+        descend one path from the root to a leaf node and update the cached
+        heights of nodes on that path."""
         # Handle the case where the tree is empty
         if self.is_empty():
-            # TODO: Create a new root node
-            self.root = ...
-            # TODO: Increase the tree size
-            self.size ...
+            # Create a new root node
+            self.root = BinaryTreeNode(item)
+            # Increase the tree size
+            self.size += 1
+            return
+        # Find the path of nodes to where the given item should be inserted
+        path = self._find_path_iterative(item)
+        parent = path[-1]
+        # Check if the given item matches the last node on the path
+        if item == parent.data:
+            parent.data = item
             return
-        # Find the parent node of where the given item should be inserted
-        parent = self._find_parent_node_recursive(item, self.root)
-        # TODO: Check if the given item should be inserted left of parent node
-        if ...:
-            # TODO: Create a new node and set the parent's left child
-            parent.left = ...
-        # TODO: Check if the given item should be inserted right of parent node
-        elif ...:
-            # TODO: Create a new node and set the parent's right child
-            parent.right = ...
-        # TODO: Increase the tree size
-        self.size ...
+        # Check if the given item should be inserted left of parent node
+        elif item < parent.data:
+            # Create a new node and set the parent's left child
+            parent.left = BinaryTreeNode(item)
+        # Check if the given item should be inserted right of parent node
+        elif item > parent.data:
+            # Create a new node and set the parent's right child
+            parent.right = BinaryTreeNode(item)
+        # Increase the tree size
+        self.size += 1
+        # Update heights of the new node's ancestors
+        self._update_heights(path)
+
+    def _find_path_iterative(self, item):
+        """Return a list of the nodes on the path from the root node to the
+        node containing the given item (or to the parent node of where the
+        given item would be if inserted), or an empty list if this tree is
+        empty. Search is performed iteratively starting from the root node.
+        Running time: O(h) for a tree of height h in the worst case."""
+        path = []
+        node = self.root
+        while node is not None:
+            path.append(node)
+            if item == node.data:
+                break
+            node = node.left if item < node.data else node.right
+        return path
+
+    def _update_heights(self, path):
+        """Recalculate the cached heights of the given path of nodes from the
+        deepest node upward, assuming all nodes below the path have correct
+        cached heights. Stop early once a node's height does not change,
+        because then none of its ancestors' heights change either.
+        Running time: O(h) for a path of length h in the worst case."""
+        for node in reversed(path):
+            left_height = (node.left.cached_height
+                           if node.left is not None else -1)
+            right_height = (node.right.cached_height
+                            if node.right is not None else -1)
+            height = 1 + max(left_height, right_height)
+            if height == node.cached_height:
+                break
+            node.cached_height = height
 
     def _find_node_iterative(self, item):
         """Return the node containing the given item in this binary search tree,
         or None if the given item is not found. Search is performed iteratively
         starting from the root node.
-        TODO: Best case running time: ??? under what conditions?
-        TODO: Worst case running time: ??? under what conditions?"""
+        Best case running time: O(1) if the given item is in the root node.
+        Worst case running time: O(h) for a tree of height h if the given item
+        is in a leaf node or not in this tree."""
         # Start with the root node
         node = self.root
         # Loop until we descend past the closest leaf node
         while node is not None:
-            # TODO: Check if the given item matches the node's data
-            if ...:
+            # Check if the given item matches the node's data
+            if item == node.data:
                 # Return the found node
                 return node
-            # TODO: Check if the given item is less than the node's data
-            elif ...:
-                # TODO: Descend to the node's left child
-                node = ...
-            # TODO: Check if the given item is greater than the node's data
-            elif ...:
-                # TODO: Descend to the node's right child
-                node = ...
+            # Check if the given item is less than the node's data
+            elif item < node.data:
+                # Descend to the node's left child
+                node = node.left
+            # Check if the given item is greater than the node's data
+            elif item > node.data:
+                # Descend to the node's right child
+                node = node.right
         # Not found
         return None
 
@@ -132,51 +241,53 @@ class BinarySearchTree(object):
         """Return the node containing the given item in this binary search tree,
         or None if the given item is not found. Search is performed recursively
         starting from the given node (give the root node to start recursion).
-        TODO: Best case running time: ??? under what conditions?
-        TODO: Worst case running time: ??? under what conditions?"""
+        Best case running time: O(1) if the given item is in the root node.
+        Worst case running time: O(h) for a tree of height h if the given item
+        is in a leaf node or not in this tree."""
         # Check if starting node exists
         if node is None:
             # Not found (base case)
             return None
-        # TODO: Check if the given item matches the node's data
-        elif ...:
+        # Check if the given item matches the node's data
+        elif item == node.data:
             # Return the found node
             return node
-        # TODO: Check if the given item is less than the node's data
-        elif ...:
-            # TODO: Recursively descend to the node's left child, if it exists
-            return ...
-        # TODO: Check if the given item is greater than the node's data
-        elif ...:
-            # TODO: Recursively descend to the node's right child, if it exists
-            return ...
+        # Check if the given item is less than the node's data
+        elif item < node.data:
+            # Recursively descend to the node's left child, if it exists
+            return self._find_node_recursive(item, node.left)
+        # Check if the given item is greater than the node's data
+        elif item > node.data:
+            # Recursively descend to the node's right child, if it exists
+            return self._find_node_recursive(item, node.right)
 
     def _find_parent_node_iterative(self, item):
         """Return the parent node of the node containing the given item
         (or the parent node of where the given item would be if inserted)
         in this tree, or None if this tree is empty or has only a root node.
         Search is performed iteratively starting from the root node.
-        TODO: Best case running time: ??? under what conditions?
-        TODO: Worst case running time: ??? under what conditions?"""
+        Best case running time: O(1) if the given item is in the root node.
+        Worst case running time: O(h) for a tree of height h if the given item
+        is in a leaf node or not in this tree."""
         # Start with the root node and keep track of its parent
         node = self.root
         parent = None
         # Loop until we descend past the closest leaf node
         while node is not None:
-            # TODO: Check if the given item matches the node's data
-            if ...:
+            # Check if the given item matches the node's data
+            if item == node.data:
                 # Return the parent of the found node
                 return parent
-            # TODO: Check if the given item is less than the node's data
-            elif ...:
-                # TODO: Update the parent and descend to the node's left child
-                parent = ...
-                node = ...
-            # TODO: Check if the given item is greater than the node's data
-            elif ...:
-                # TODO: Update the parent and descend to the node's right child
-                parent = ...
-                node = ...
+            # Check if the given item is less than the node's data
+            elif item < node.data:
+                # Update the parent and descend to the node's left child
+                parent = node
+                node = node.left
+            # Check if the given item is greater than the node's data
+            elif item > node.data:
+                # Update the parent and descend to the node's right child
+                parent = node
+                node = node.right
         # Not found
         return parent
 
@@ -188,112 +299,269 @@ class BinarySearchTree(object):
         (give the root node to start recursion)."""
         # Check if starting node exists
         if node is None:
-            # Not found (base case)
-            return None
-        # TODO: Check if the given item matches the node's data
-        if ...:
+            # Not found (base case), so parent is where item would be inserted
+            return parent
+        # Check if the given item matches the node's data
+        if item == node.data:
             # Return the parent of the found node
             return parent
-        # TODO: Check if the given item is less than the node's data
-        elif ...:
-            # TODO: Recursively descend to the node's left child, if it exists
-            return ...  # Hint: Remember to update the parent parameter
-        # TODO: Check if the given item is greater than the node's data
-        elif ...:
-            # TODO: Recursively descend to the node's right child, if it exists
-            return ...  # Hint: Remember to update the parent parameter
+        # Check if the given item is less than the node's data
+        elif item < node.data:
+            # Recursively descend to the node's left child, if it exists
+            return self._find_parent_node_recursive(item, node.left, node)
+        # Check if the given item is greater than the node's data
+        elif item > node.data:
+            # Recursively descend to the node's right child, if it exists
+            return self._find_parent_node_recursive(item, node.right, node)
 
     def delete(self, item):
         """Remove given item from this tree, if present, or raise ValueError.
-        TODO: Best case running time: ??? under what conditions?
-        TODO: Worst case running time: ??? under what conditions?"""
-        # TODO: Use helper methods and break this algorithm down into 3 cases
-        # based on how many children the node containing the given item has and
-        # implement new helper methods for subtasks of the more complex cases
+        Best case running time: O(1) if the given item is in the root node
+        and the root node has at most one child.
+        Worst case running time: O(h) for a tree of height h because we
+        descend to the given item's node and then to its successor node."""
+        # Find the path of nodes to the node containing the given item
+        path = self._find_path_iterative(item)
+        # Check if the given item was not found
+        if not path or not item == path[-1].data:
+            raise ValueError('Item not found: {!r}'.format(item))
+        self._delete_node(path)
+
+    def _delete_node(self, path):
+        """Unlink the last node on the given path of nodes from the root node
+        from this tree, relink its children in order, and update the cached
+        heights of nodes whose subtrees changed. Nodes are relinked rather
+        than copied so this works for any node type.
+        Running time: O(h) for a tree of height h in the worst case."""
+        node = path[-1]
+        parent = path[-2] if len(path) > 1 else None
+        # Case 1 and 2: node has at most one child, so replace it by that child
+        if node.left is None or node.right is None:
+            child = node.left if node.left is not None else node.right
+            changed = path[:-1]
+        # Case 3: node has two children, so replace it by its successor node
+        else:
+            child, successor_path = self._unlink_successor_node(node)
+            child.left = node.left
+            child.right = node.right
+            # Successor takes the node's place and height before updating
+            child.cached_height = node.cached_height
+            changed = path[:-1] + [child] + successor_path
+        self._replace_child(parent, node, child)
+        # Decrease the tree size
+        self.size -= 1
+        # Update heights of nodes from the deepest changed node upward
+        self._update_heights(changed)
+
+    def _unlink_successor_node(self, node):
+        """Unlink the in-order successor node of the given node, which must
+        have a right child (the successor is its right subtree's minimum
+        node), and return it with the path of nodes from the given node's
+        right child to the successor's parent node (excluding the given node).
+        The successor node's right subtree takes its place.
+        Running time: O(h) for a tree of height h to descend leftward."""
+        successor_parent = node
+        successor = node.right
+        path = []
+        # Descend left from the right child to find the minimum node
+        while successor.left is not None:
+            successor_parent = successor
+            path.append(successor)
+            successor = successor.left
+        # Relink the successor's right subtree (it has no left child)
+        self._replace_child(successor_parent, successor, successor.right)
+        return successor, path
+
+    def _replace_child(self, parent, child, new_child):
+        """Replace the given child node of the given parent node (or the root
+        node if parent is None) with the given new child node."""
+        if parent is None:
+            self.root = new_child
+        elif parent.left is child:
+            parent.left = new_child
+        else:
+            parent.right = new_child
+
+    def _nodes_in_order(self):
+        """Generate all nodes in this binary search tree in-order (DFS) using
+        an explicit stack of ancestor nodes instead of recursion.
+        Running time: O(n) for n nodes, each pushed and popped once.
+        Memory usage: O(h) for a tree of height h to store the stack."""
+        stack = []
+        node = self.root
+        while node is not None or stack:
+            # Descend left as far as possible, remembering ancestors
+            while node is not None:
+                stack.append(node)
+                node = node.left
+            # Visit the leftmost unvisited node, then its right subtree
+            node = stack.pop()
+            yield node
+            node = node.right
 
     def items_in_order(self):
         """Return an in-order list of all items in this binary search tree."""
         items = []
         if not self.is_empty():
             # Traverse tree in-order from root, appending each node's item
-            self._traverse_in_order_recursive(self.root, items.append)
+            self._traverse_in_order_iterative(self.root, items.append)
         # Return in-order list of all items in tree
         return items
 
     def _traverse_in_order_recursive(self, node, visit):
         """Traverse this binary tree with recursive in-order traversal (DFS).
         Start at the given node and visit each node with the given function.
-        TODO: Running time: ??? Why and under what conditions?
-        TODO: Memory usage: ??? Why and under what conditions?"""
-        # TODO: Traverse left subtree, if it exists
-        ...
-        # TODO: Visit this node's data with given function
-        ...
-        # TODO: Traverse right subtree, if it exists
-        ...
+        Running time: O(n) for n nodes because each node is visited once.
+        Memory usage: O(h) for a tree of height h because of the call stack."""
+        # Traverse left subtree, if it exists
+        if node.left is not None:
+            self._traverse_in_order_recursive(node.left, visit)
+        # Visit this node's data with given function
+        visit(node.data)
+        # Traverse right subtree, if it exists
+        if node.right is not None:
+            self._traverse_in_order_recursive(node.right, visit)
 
     def _traverse_in_order_iterative(self, node, visit):
         """Traverse this binary tree with iterative in-order traversal (DFS).
         Start at the given node and visit each node with the given function.
-        TODO: Running time: ??? Why and under what conditions?
-        TODO: Memory usage: ??? Why and under what conditions?"""
-        # TODO: Traverse in-order without using recursion (stretch challenge)
+        Running time: O(n) for n nodes because each node is pushed and popped
+        on the stack once.
+        Memory usage: O(h) for a tree of height h because the stack holds the
+        ancestors of the current node whose data is not yet visited."""
+        stack = []
+        # Loop until all nodes are visited and no ancestors are left
+        while node is not None or stack:
+            # Descend left as far as possible, remembering ancestors
+            while node is not None:
+                stack.append(node)
+                node = node.left
+            # Visit the leftmost unvisited node's data with given function
+            node = stack.pop()
+            visit(node.data)
+            # Traverse its right subtree next
+            node = node.right
+
+    def _traverse_in_order_morris(self, node, visit):
+        """Traverse this binary tree with Morris in-order traversal (DFS),
+        which threads each node's in-order predecessor to it through the
+        predecessor's empty right link instead of using a stack, and removes
+        each thread after following it, so the tree is restored when done.
+        Start at the given node and visit each node with the given function.
+        Running time: O(n) for n nodes because each edge is walked at most
+        three times (descending, threading, and unthreading).
+        Memory usage: O(1) because no stack or recursion is used. The tree is
+        modified during traversal, so it must not be read concurrently."""
+        while node is not None:
+            # Visit this node's data now if it has no left subtree
+            if node.left is None:
+                visit(node.data)
+                node = node.right
+                continue
+            # Find the rightmost node in the left subtree (its predecessor)
+            predecessor = node.left
+            while (predecessor.right is not None and
+                   predecessor.right is not node):
+                predecessor = predecessor.right
+            if predecessor.right is None:
+                # Thread the predecessor to this node, then go left
+                predecessor.right = node
+                node = node.left
+            else:
+                # Left subtree is done, so remove the thread and visit
+                predecessor.right = None
+                visit(node.data)
+                node = node.right
 
     def items_pre_order(self):
         """Return a pre-order list of all items in this binary search tree."""
         items = []
         if not self.is_empty():
             # Traverse tree pre-order from root, appending each node's item
-            self._traverse_pre_order_recursive(self.root, items.append)
+            self._traverse_pre_order_iterative(self.root, items.append)
         # Return pre-order list of all items in tree
         return items
 
     def _traverse_pre_order_recursive(self, node, visit):
         """Traverse this binary tree with recursive pre-order traversal (DFS).
         Start at the given node and visit each node with the given function.
-        TODO: Running time: ??? Why and under what conditions?
-        TODO: Memory usage: ??? Why and under what conditions?"""
-        # TODO: Visit this node's data with given function
-        ...
-        # TODO: Traverse left subtree, if it exists
-        ...
-        # TODO: Traverse right subtree, if it exists
-        ...
+        Running time: O(n) for n nodes because each node is visited once.
+        Memory usage: O(h) for a tree of height h because of the call stack."""
+        # Visit this node's data with given function
+        visit(node.data)
+        # Traverse left subtree, if it exists
+        if node.left is not None:
+            self._traverse_pre_order_recursive(node.left, visit)
+        # Traverse right subtree, if it exists
+        if node.right is not None:
+            self._traverse_pre_order_recursive(node.right, visit)
 
     def _traverse_pre_order_iterative(self, node, visit):
         """Traverse this binary tree with iterative pre-order traversal (DFS).
         Start at the given node and visit each node with the given function.
-        TODO: Running time: ??? Why and under what conditions?
-        TODO: Memory usage: ??? Why and under what conditions?"""
-        # TODO: Traverse pre-order without using recursion (stretch challenge)
+        Running time: O(n) for n nodes because each node is pushed and popped
+        on the stack once.
+        Memory usage: O(h) for a tree of height h because the stack holds at
+        most one right child of each ancestor of the current node."""
+        stack = [node]
+        # Loop until all nodes are visited
+        while stack:
+            node = stack.pop()
+            # Visit this node's data with given function
+            visit(node.data)
+            # Push right child first so left subtree is traversed first
+            if node.right is not None:
+                stack.append(node.right)
+            if node.left is not None:
+                stack.append(node.left)
 
     def items_post_order(self):
         """Return a post-order list of all items in this binary search tree."""
         items = []
         if not self.is_empty():
             # Traverse tree post-order from root, appending each node's item
-            self._traverse_post_order_recursive(self.root, items.append)
+            self._traverse_post_order_iterative(self.root, items.append)
         # Return post-order list of all items in tree
         return items
 
     def _traverse_post_order_recursive(self, node, visit):
         """Traverse this binary tree with recursive post-order traversal (DFS).
         Start at the given node and visit each node with the given function.
-        TODO: Running time: ??? Why and under what conditions?
-        TODO: Memory usage: ??? Why and under what conditions?"""
-        # TODO: Traverse left subtree, if it exists
-        ...
-        # TODO: Traverse right subtree, if it exists
-        ...
-        # TODO: Visit this node's data with given function
-        ...
+        Running time: O(n) for n nodes because each node is visited once.
+        Memory usage: O(h) for a tree of height h because of the call stack."""
+        # Traverse left subtree, if it exists
+        if node.left is not None:
+            self._traverse_post_order_recursive(node.left, visit)
+        # Traverse right subtree, if it exists
+        if node.right is not None:
+            self._traverse_post_order_recursive(node.right, visit)
+        # Visit this node's data with given function
+        visit(node.data)
 
     def _traverse_post_order_iterative(self, node, visit):
         """Traverse this binary tree with iterative post-order traversal (DFS).
         Start at the given node and visit each node with the given function.
-        TODO: Running time: ??? Why and under what conditions?
-        TODO: Memory usage: ??? Why and under what conditions?"""
-        # TODO: Traverse post-order without using recursion (stretch challenge)
+        Running time: O(n) for n nodes because each node is pushed and popped
+        on the stack once.
+        Memory usage: O(h) for a tree of height h because the stack holds the
+        ancestors of the current node whose data is not yet visited."""
+        stack = []
+        last_visited = None
+        # Loop until all nodes are visited and no ancestors are left
+        while node is not None or stack:
+            # Descend left as far as possible, remembering ancestors
+            while node is not None:
+                stack.append(node)
+                node = node.left
+            top = stack[-1]
+            # Traverse the right subtree first if it exists and is not done
+            if top.right is not None and top.right is not last_visited:
+                node = top.right
+            else:
+                # Both subtrees are done, so visit this node's data
+                stack.pop()
+                visit(top.data)
+                last_visited = top
 
     def items_level_order(self):
         """Return a level-order list of all items in this binary search tree."""
@@ -307,22 +575,294 @@ class BinarySearchTree(object):
     def _traverse_level_order_iterative(self, start_node, visit):
         """Traverse this binary tree with iterative level-order traversal (BFS).
         Start at the given node and visit each node with the given function.
-        TODO: Running time: ??? Why and under what conditions?
-        TODO: Memory usage: ??? Why and under what conditions?"""
-        # TODO: Create queue to store nodes not yet traversed in level-order
-        queue = ...
-        # TODO: Enqueue given starting node
-        ...
-        # TODO: Loop until queue is empty
-        while ...:
-            # TODO: Dequeue node at front of queue
-            node = ...
-            # TODO: Visit this node's data with given function
-            ...
-            # TODO: Enqueue this node's left child, if it exists
-            ...
-            # TODO: Enqueue this node's right child, if it exists
-            ...
+        Running time: O(n) for n nodes because each node is visited once.
+        Memory usage: O(w) for a tree of maximum width w because the queue
+        holds at most two levels of nodes (about n/2 for a complete tree)."""
+        # Create queue to store nodes not yet traversed in level-order
+        queue = deque()
+        # Enqueue given starting node
+        queue.append(start_node)
+        # Loop until queue is empty
+        while queue:
+            # Dequeue node at front of queue
+            node = queue.popleft()
+            # Visit this node's data with given function
+            visit(node.data)
+            # Enqueue this node's left child, if it exists
+            if node.left is not None:
+                queue.append(node.left)
+            # Enqueue this node's right child, if it exists
+            if node.right is not None:
+                queue.append(node.right)
+
+
+class PersistentBinarySearchTree(BinarySearchTree):
+    """Immutable binary search tree whose insert and delete methods return a
+    new tree instead of changing this one. Only the nodes on the path from
+    the root node to the changed node are copied (path copying), and all
+    other nodes are shared with this tree, so each update creates O(h) new
+    nodes for a tree of height h. Nodes are never changed after they are
+    created, so readers can keep using any tree (a snapshot) while a writer
+    builds newer trees from it, without copying or locking."""
+
+    def __init__(self, items=None):
+        """Initialize this persistent binary search tree with the given items.
+        Nodes are only shared once this tree is returned, so inserting the
+        given items builds new nodes without path copying."""
+        super(PersistentBinarySearchTree, self).__init__()
+        if items is not None:
+            for item in items:
+                BinarySearchTree.insert(self, item)
+
+    def __repr__(self):
+        """Return a string representation of this binary search tree."""
+        return 'PersistentBinarySearchTree({} nodes)'.format(self.size)
+
+    def _new_tree(self, root, size):
+        """Return a new persistent binary search tree with the given root node
+        and number of nodes."""
+        tree = PersistentBinarySearchTree()
+        tree.root = root
+        tree.size = size
+        return tree
+
+    def _copy_node(self, node, left, right):
+        """Return a new node with the given node's data and the given children,
+        and set its cached height from the children's cached heights."""
+        copy = BinaryTreeNode(node.data)
+        copy.left = left
+        copy.right = right
+        copy.cached_height = 1 + max(
+            left.cached_height if left is not None else -1,
+            right.cached_height if right is not None else -1)
+        return copy
+
+    def _copy_path(self, path, new_node):
+        """Return the root node of a new tree where the last node on the given
+        path of nodes is replaced by the given new node (or None), by copying
+        every other node on the path bottom-up and sharing all other nodes.
+        Running time: O(h) for a path of length h."""
+        child = new_node
+        for index in range(len(path) - 2, -1, -1):
+            node = path[index]
+            if node.left is path[index + 1]:
+                child = self._copy_node(node, child, node.right)
+            else:
+                child = self._copy_node(node, node.left, child)
+        return child
+
+    def insert(self, item):
+        """Return a new tree with the given item inserted in order, or with
+        an equal item replaced by the given item. This tree is not changed.
+        Running time: O(h) for a tree of height h because we descend one
+        path and copy each node on it."""
+        path = self._find_path_iterative(item)
+        if not path:
+            return self._new_tree(BinaryTreeNode(item), 1)
+        parent = path[-1]
+        # Check if the given item matches the last node on the path
+        if item == parent.data:
+            new_parent = self._copy_node(parent, parent.left, parent.right)
+            new_parent.data = item
+            return self._new_tree(self._copy_path(path, new_parent),
+                                  self.size)
+        # Copy the parent node with a new leaf node as its child
+        leaf = BinaryTreeNode(item)
+        if item < parent.data:
+            new_parent = self._copy_node(parent, leaf, parent.right)
+        else:
+            new_parent = self._copy_node(parent, parent.left, leaf)
+        return self._new_tree(self._copy_path(path, new_parent),
+                              self.size + 1)
+
+    def delete(self, item):
+        """Return a new tree without the given item, or raise ValueError if
+        it is not present. This tree is not changed.
+        Running time: O(h) for a tree of height h because we copy the path
+        to the given item's node and the path to its successor node."""
+        path = self._find_path_iterative(item)
+        if not path or not item == path[-1].data:
+            raise ValueError('Item not found: {!r}'.format(item))
+        node = path[-1]
+        # Case 1 and 2: node has at most one child, so replace it by that child
+        if node.left is None or node.right is None:
+            child = node.left if node.left is not None else node.right
+        # Case 3: node has two children, so replace it by its successor node
+        else:
+            successor_path = [node.right]
+            while successor_path[-1].left is not None:
+                successor_path.append(successor_path[-1].left)
+            successor = successor_path[-1]
+            # Copy the right subtree without its minimum (successor) node
+            right = self._copy_path(successor_path, successor.right)
+            child = self._copy_node(successor, node.left, right)
+        return self._new_tree(self._copy_path(path, child), self.size - 1)
+
+    def _traverse_in_order_morris(self, node, visit):
+        """Traverse this binary tree with iterative in-order traversal (DFS)
+        instead of Morris traversal, which threads nodes that other snapshots
+        share and so would change trees that readers may be using.
+        Memory usage: O(h) for a tree of height h (see
+        _traverse_in_order_iterative)."""
+        self._traverse_in_order_iterative(node, visit)
+
+
+class TreeMapNode(BinaryTreeNode):
+
+    def __init__(self, key, value):
+        """Initialize this tree map node with the given key and value."""
+        super(TreeMapNode, self).__init__(value)
+        self.key = key
+
+    def __repr__(self):
+        """Return a string representation of this tree map node."""
+        return 'TreeMapNode({!r}: {!r})'.format(self.key, self.data)
+
+
+class TreeMap(BinarySearchTree):
+    """Ordered map of keys to values stored in a binary search tree. Nodes
+    compare only their keys, so values never need to be comparable and no
+    (key, value) tuples are built or compared while descending the tree."""
+
+    def __init__(self, entries=None, key=None):
+        """Initialize this tree map and set the given entries, if any.
+        If a key function is given, entries are values and each one is stored
+        under the key computed by calling key(value), otherwise entries are
+        (key, value) pairs."""
+        self.key = key
+        super(TreeMap, self).__init__()
+        if entries is not None:
+            for entry in entries:
+                if key is None:
+                    self.set(*entry)
+                else:
+                    self.add(entry)
+
+    def __repr__(self):
+        """Return a string representation of this tree map."""
+        return 'TreeMap({!r})'.format(self.items())
+
+    def _find_node_iterative(self, key):
+        """Return the node with the given key in this tree map, or None if the
+        given key is not found. Only node keys are compared.
+        Running time: O(h) for a tree of height h in the worst case."""
+        node = self.root
+        while node is not None:
+            if key == node.key:
+                return node
+            elif key < node.key:
+                node = node.left
+            else:
+                node = node.right
+        return None
+
+    def _find_parent_node_iterative(self, key):
+        """Return the parent node of the node with the given key (or of where
+        the given key would be if set) in this tree map, or None if this tree
+        map is empty or the given key is in the root node.
+        Running time: O(h) for a tree of height h in the worst case."""
+        node = self.root
+        parent = None
+        while node is not None:
+            if key == node.key:
+                return parent
+            parent = node
+            node = node.left if key < node.key else node.right
+        return parent
+
+    def _find_path_iterative(self, key):
+        """Return a list of the nodes on the path from the root node to the
+        node with the given key (or to the parent node of where the given key
+        would be if set), or an empty list if this tree map is empty.
+        Running time: O(h) for a tree of height h in the worst case."""
+        path = []
+        node = self.root
+        while node is not None:
+            path.append(node)
+            if key == node.key:
+                break
+            node = node.left if key < node.key else node.right
+        return path
+
+    def contains(self, key):
+        """Return True if this tree map contains the given key, or False.
+        Running time: O(h) for a tree of height h in the worst case."""
+        return self._find_node_iterative(key) is not None
+
+    def search(self, key):
+        """Return the value associated with the given key, or None if the
+        given key is not found.
+        Running time: O(h) for a tree of height h in the worst case."""
+        node = self._find_node_iterative(key)
+        return node.data if node is not None else None
+
+    def get(self, key):
+        """Return the value associated with the given key, or raise KeyError.
+        Running time: O(h) for a tree of height h in the worst case."""
+        node = self._find_node_iterative(key)
+        if node is None:
+            raise KeyError('Key not found: {}'.format(key))
+        return node.data
+
+    def set(self, key, value):
+        """Insert or update the given key with its associated value.
+        Running time: O(h) for a tree of height h in the worst case."""
+        # Find the path of nodes to where the given key should be
+        path = self._find_path_iterative(key)
+        if not path:
+            self.root = TreeMapNode(key, value)
+            self.size += 1
+            return
+        parent = path[-1]
+        if key == parent.key:  # Given key exists, so update its value
+            parent.data = value
+            return
+        elif key < parent.key:
+            parent.left = TreeMapNode(key, value)
+        else:
+            parent.right = TreeMapNode(key, value)
+        self.size += 1
+        self._update_heights(path)
+
+    def add(self, value):
+        """Insert or update the given value under the key computed by this
+        tree map's key function, or raise TypeError if it has no key function.
+        Running time: O(h) for a tree of height h in the worst case."""
+        if self.key is None:
+            raise TypeError('TreeMap has no key function to add values')
+        self.set(self.key(value), value)
+
+    def insert(self, value):
+        """Insert or update the given value under the key computed by this
+        tree map's key function (same as add)."""
+        self.add(value)
+
+    def delete(self, key):
+        """Delete the given key and its associated value, or raise KeyError.
+        Running time: O(h) for a tree of height h in the worst case."""
+        path = self._find_path_iterative(key)
+        if not path or not key == path[-1].key:
+            raise KeyError('Key not found: {}'.format(key))
+        self._delete_node(path)
+
+    def keys(self):
+        """Return an in-order list of all keys in this tree map.
+        Running time: O(n) for n entries because each node is visited once."""
+        return [node.key for node in self._nodes_in_order()]
+
+    def values(self):
+        """Return a list of all values in this tree map in order of their keys.
+        Running time: O(n) for n entries because each node is visited once."""
+        return [node.data for node in self._nodes_in_order()]
+
+    def items(self):
+        """Return an in-order list of all entries (key-value pairs) in this
+        tree map. Running time: O(n) for n entries."""
+        return [(node.key, node.data) for node in self._nodes_in_order()]
+
+    def length(self):
+        """Return the number of key-value entries in this tree map."""
+        return self.size
 
 
 def test_binary_search_tree():
@@ -357,5 +897,74 @@ def test_binary_search_tree():
     print('items level-order: {}'.format(tree.items_level_order()))
 
 
+def benchmark_binary_search_tree(num_items=1000, repeat=5):
+    """Time recursive versus iterative implementations of tree operations on
+    a balanced tree and on a degenerate tree (items inserted in order)."""
+    import random
+    import sys
+    import timeit
+    items = list(range(num_items))
+    balanced = BinarySearchTree(random.sample(items, num_items))
+    degenerate = BinarySearchTree(items)
+    print('Benchmarking {} items, best of {} runs (ms):'
+          .format(num_items, repeat))
+    print('{:<24} {:>10} {:>10}'.format('operation', 'balanced', 'degenerate'))
+
+    def find_all(tree, find):
+        for item in items:
+            find(tree, item)
+
+    def traverse(tree, method):
+        method(tree, tree.root, lambda data: None)
+
+    operations = [
+        ('find recursive', find_all, lambda tree, item:
+            tree._find_node_recursive(item, tree.root)),
+        ('find iterative', find_all, BinarySearchTree._find_node_iterative),
+        ('parent recursive', find_all, lambda tree, item:
+            tree._find_parent_node_recursive(item, tree.root)),
+        ('parent iterative', find_all,
+            BinarySearchTree._find_parent_node_iterative),
+        ('height recursive', lambda tree, method: method(tree.root),
+            BinaryTreeNode._height_recursive),
+        ('height iterative', lambda tree, method: method(tree.root),
+            BinaryTreeNode.height),
+    ]
+    for order in ['in', 'pre', 'post']:
+        for kind in ['recursive', 'iterative']:
+            name = '_traverse_{}_order_{}'.format(order, kind)
+            operations.append(('{}-order {}'.format(order, kind), traverse,
+                               getattr(BinarySearchTree, name)))
+    operations.append(('in-order morris', traverse,
+                       BinarySearchTree._traverse_in_order_morris))
+    # Degenerate trees are as tall as their size, so allow deep recursion
+    limit = sys.getrecursionlimit()
+    sys.setrecursionlimit(max(limit, 2 * num_items + 100))
+    try:
+        for name, run, method in operations:
+            times = []
+            for tree in [balanced, degenerate]:
+                try:
+                    seconds = min(timeit.repeat(lambda: run(tree, method),
+                                                number=1, repeat=repeat))
+                    times.append('{:.3f}'.format(seconds * 1000))
+                except RecursionError:
+                    times.append('overflow')
+            print('{:<24} {:>10} {:>10}'.format(name, *times))
+    finally:
+        sys.setrecursionlimit(limit)
+
+
+def main():
+    """Read command-line arguments and test or benchmark binary trees."""
+    import sys
+    args = sys.argv[1:]  # Ignore script file name
+    if len(args) >= 1 and args[0] == 'benchmark':
+        num_items = int(args[1]) if len(args) >= 2 else 1000
+        benchmark_binary_search_tree(num_items)
+    else:
+        test_binary_search_tree()
+
+
 if __name__ == '__main__':
-    test_binary_search_tree()
+    main()
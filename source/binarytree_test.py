@@ -1,6 +1,8 @@
 #!python
 
-from binarytree import BinarySearchTree, BinaryTreeNode
+from binarytree import (BinarySearchTree, BinaryTreeNode,
+                        PersistentBinarySearchTree, TreeMap)
+import random
 import unittest
 
 
@@ -174,50 +176,52 @@ class BinarySearchTreeTest(unittest.TestCase):
         assert tree.root.right.left.data == 5
         assert tree.root.right.right.data == 7
 
-    def DISABLED_test_delete_with_3_items(self):
+    def test_delete_with_3_items(self):
         # Create a complete binary search tree of 3 items in level-order
         items = [2, 1, 3]
         tree = BinarySearchTree(items)
         assert tree.root.data == 2
         assert tree.root.left.data == 1
         assert tree.root.right.data == 3
-        # TODO: Test structure of tree after each deletion
-        # tree.delete(2)
-        # assert tree.root.data == ...
-        # assert tree.root.left is ...
-        # assert tree.root.right is ...
-        # tree.delete(1)
-        # assert tree.root.data == ...
-        # assert tree.root.left is ...
-        # assert tree.root.right is ...
-        # tree.delete(3)
-        # assert tree.root.data is ...
-        # assert tree.root.left is ...
-        # assert tree.root.right is ...
-
-    def DISABLED_test_delete_with_7_items(self):
+        tree.delete(2)
+        assert tree.root.data == 3
+        assert tree.root.left.data == 1
+        assert tree.root.right is None
+        assert tree.size == 2
+        tree.delete(1)
+        assert tree.root.data == 3
+        assert tree.root.left is None
+        assert tree.root.right is None
+        assert tree.size == 1
+        tree.delete(3)
+        assert tree.root is None
+        assert tree.size == 0
+        with self.assertRaises(ValueError):
+            tree.delete(3)  # Item no longer in tree
+
+    def test_delete_with_7_items(self):
         # Create a complete binary search tree of 7 items in level-order
         items = [4, 2, 6, 1, 3, 5, 7]
         tree = BinarySearchTree(items)
-        # TODO: Test structure of tree after each deletion
-        # tree.delete(4)
-        # assert tree.root.data == ...
-        # assert tree.root.left.data == ...
-        # assert tree.root.right.data == ...
-        # assert ...
-        # assert ...
-        # tree.delete(...)
-        # assert tree.root.data == ...
-        # assert tree.root.left.data == ...
-        # assert tree.root.right.data == ...
-        # assert ...
-        # assert ...
-        # tree.delete(...)
-        # assert tree.root.data == ...
-        # assert tree.root.left.data == ...
-        # assert tree.root.right.data == ...
-        # assert ...
-        # assert ...
+        tree.delete(4)  # Root node with two children is replaced by successor
+        assert tree.root.data == 5
+        assert tree.root.left.data == 2
+        assert tree.root.right.data == 6
+        assert tree.root.right.left is None
+        assert tree.root.right.right.data == 7
+        tree.delete(2)
+        assert tree.root.data == 5
+        assert tree.root.left.data == 3
+        assert tree.root.left.left.data == 1
+        assert tree.root.left.right is None
+        tree.delete(6)  # Node with one child is replaced by that child
+        assert tree.root.data == 5
+        assert tree.root.left.data == 3
+        assert tree.root.right.data == 7
+        assert tree.size == 4
+        assert tree.items_in_order() == [1, 3, 5, 7]
+        with self.assertRaises(ValueError):
+            tree.delete(4)  # Item no longer in tree
 
     def test_items_in_order_with_3_strings(self):
         # Create a complete binary search tree of 3 strings in level-order
@@ -275,6 +279,299 @@ class BinarySearchTreeTest(unittest.TestCase):
         # Ensure the level-order traversal of tree items is ordered correctly
         assert tree.items_level_order() == [4, 2, 6, 1, 3, 5, 7]
 
+    def test_items_in_order_with_morris_traversal(self):
+        items = [8, 4, 12, 2, 6, 10, 14, 1, 3, 5, 7, 9, 11, 13, 15]
+        tree = BinarySearchTree(items)
+        result = []
+        tree._traverse_in_order_morris(tree.root, result.append)
+        assert result == list(range(1, 16))
+        # Ensure all temporary threads were removed from the tree
+        assert tree.items_level_order() == items
+        assert tree.height() == 3
+
+    def test_recursive_and_iterative_traversals_match(self):
+        items = [50, 30, 70, 20, 40, 60, 80, 35, 45, 65, 10, 90, 85]
+        tree = BinarySearchTree(items)
+        for order in ['in', 'pre', 'post']:
+            recursive = []
+            iterative = []
+            getattr(tree, '_traverse_{}_order_recursive'.format(order))(
+                tree.root, recursive.append)
+            getattr(tree, '_traverse_{}_order_iterative'.format(order))(
+                tree.root, iterative.append)
+            assert recursive == iterative
+        assert tree.root.height() == tree.root._height_recursive() == 4
+
+    def test_degenerate_tree_with_many_items(self):
+        # Items inserted in order build a tree as tall as its size, which is
+        # deeper than the default recursion limit of the Python interpreter
+        items = list(range(2000))
+        tree = BinarySearchTree(items)
+        assert tree.size == 2000
+        assert tree.height() == 1999
+        assert tree.contains(1999) is True
+        assert tree.search(1234) == 1234
+        assert tree.contains(2000) is False
+        assert tree.items_in_order() == items
+        assert tree.items_pre_order() == items
+        assert tree.items_post_order() == items[::-1]
+        tree.delete(0)
+        tree.delete(1999)
+        assert tree.size == 1998
+
+    def assert_cached_heights(self, tree):
+        # Ensure every node's cached height matches its recalculated height
+        stack = [tree.root] if tree.root is not None else []
+        while stack:
+            node = stack.pop()
+            assert node.cached_height == node.height()
+            stack.extend(child for child in [node.left, node.right]
+                         if child is not None)
+
+    def test_height(self):
+        tree = BinarySearchTree()
+        assert tree.height() == -1
+        tree.insert(4)
+        assert tree.height() == 0
+        tree.insert(2)
+        assert tree.height() == 1
+        tree.insert(6)
+        assert tree.height() == 1
+        tree.insert(1)
+        assert tree.height() == 2
+        tree.insert(7)
+        tree.insert(8)
+        assert tree.height() == 3
+        tree.delete(8)
+        assert tree.height() == 2
+        tree.delete(4)  # Root node is replaced by its successor
+        assert tree.root.data == 6
+        assert tree.height() == 2
+        tree.delete(1)
+        assert tree.height() == 1
+        self.assert_cached_heights(tree)
+
+    def test_cached_heights_with_random_inserts_and_deletes(self):
+        items = list(range(200))
+        random.shuffle(items)
+        tree = BinarySearchTree(items)
+        self.assert_cached_heights(tree)
+        assert tree.height() == tree.root.height()
+        random.shuffle(items)
+        for item in items[:150]:
+            tree.delete(item)
+            assert tree.height() == tree.root.height()
+        self.assert_cached_heights(tree)
+
+    def test_shape_statistics(self):
+        # Create a complete binary search tree of 7 items in level-order
+        tree = BinarySearchTree([4, 2, 6, 1, 3, 5, 7])
+        stats = tree.shape_statistics()
+        assert stats['size'] == 7
+        assert stats['height'] == 2
+        assert stats['min_height'] == 2
+        assert stats['average_depth'] == (0 + 1 * 2 + 2 * 4) / 7
+        assert stats['balance_factors'] == {0: 7}
+        assert stats['max_imbalance'] == 0
+        # Create a degenerate tree by inserting items in sorted order
+        tree = BinarySearchTree([1, 2, 3, 4])
+        stats = tree.shape_statistics()
+        assert stats['height'] == 3
+        assert stats['min_height'] == 2
+        assert stats['average_depth'] == 1.5
+        assert stats['balance_factors'] == {-3: 1, -2: 1, -1: 1, 0: 1}
+        assert stats['max_imbalance'] == 3
+        # Empty trees have no nodes to measure
+        stats = BinarySearchTree().shape_statistics()
+        assert stats['height'] == -1
+        assert stats['balance_factors'] == {}
+        assert stats['max_imbalance'] == 0
+
+
+class PersistentBinarySearchTreeTest(unittest.TestCase):
+
+    def test_init_with_list(self):
+        tree = PersistentBinarySearchTree([2, 1, 3])
+        assert tree.root.data == 2
+        assert tree.root.left.data == 1
+        assert tree.root.right.data == 3
+        assert tree.size == 3
+        assert tree.height() == 1
+
+    def test_insert_returns_new_tree(self):
+        tree0 = PersistentBinarySearchTree()
+        tree1 = tree0.insert(4)
+        tree2 = tree1.insert(2)
+        tree3 = tree2.insert(6)
+        assert tree0.is_empty() is True
+        assert tree1.items_in_order() == [4]
+        assert tree2.items_in_order() == [2, 4]
+        assert tree3.items_in_order() == [2, 4, 6]
+        assert [tree.size for tree in [tree0, tree1, tree2, tree3]] == \
+            [0, 1, 2, 3]
+        assert [tree.height() for tree in [tree0, tree1, tree2, tree3]] == \
+            [-1, 0, 1, 1]
+
+    def test_in_order_traversal_never_threads_shared_nodes(self):
+        tree = PersistentBinarySearchTree([4, 2, 6, 1, 3, 5, 7])
+        new_tree = tree.insert(8)
+        # Leaves that the new tree shares with the old tree
+        leaves = [tree.root.left.left, tree.root.left.right,
+                  tree.root.right.left]
+        threaded = []
+
+        def visit(item):
+            threaded.extend(leaf.data for leaf in leaves
+                            if leaf.right is not None)
+        new_tree._traverse_in_order_morris(new_tree.root, visit)
+        assert threaded == []
+
+    def test_insert_shares_untouched_nodes(self):
+        items = [8, 4, 12, 2, 6, 10, 14, 1, 3, 5, 7, 9, 11, 13, 15]
+        tree = PersistentBinarySearchTree(items)
+        new_tree = tree.insert(16)
+        # Only the 4 nodes on the path from the root to 15 are copied
+        assert new_tree.root is not tree.root
+        assert new_tree.root.right is not tree.root.right
+        assert new_tree.root.right.right is not tree.root.right.right
+        assert new_tree.root.right.right.right is not \
+            tree.root.right.right.right
+        # All other subtrees are shared between both trees
+        assert new_tree.root.left is tree.root.left
+        assert new_tree.root.right.left is tree.root.right.left
+        assert new_tree.root.right.right.left is tree.root.right.right.left
+        assert new_tree.height() == 4
+        assert tree.height() == 3
+        assert tree.items_level_order() == items
+        assert 16 not in tree.items_in_order()
+
+    def test_insert_equal_item_replaces_it(self):
+        tree = PersistentBinarySearchTree([(2, 'B'), (1, 'A'), (3, 'C')])
+        new_tree = tree.insert((2, 'B'))
+        assert new_tree.size == 3
+        assert new_tree.root is not tree.root
+        assert new_tree.root.left is tree.root.left
+
+    def test_delete_returns_new_tree(self):
+        items = [4, 2, 6, 1, 3, 5, 7]
+        tree = PersistentBinarySearchTree(items)
+        tree1 = tree.delete(4)  # Root node is replaced by its successor
+        assert tree1.root.data == 5
+        assert tree1.root.left is tree.root.left
+        assert tree1.root.right.left is None
+        assert tree1.root.right.right is tree.root.right.right
+        tree2 = tree1.delete(2)
+        tree3 = tree2.delete(7)
+        assert tree3.items_in_order() == [1, 3, 5, 6]
+        assert tree3.size == 4
+        assert tree3.height() == tree3.root.height() == 2
+        # Every snapshot still holds its own items
+        assert tree.items_level_order() == items
+        assert tree1.items_in_order() == [1, 2, 3, 5, 6, 7]
+        assert tree2.items_in_order() == [1, 3, 5, 6, 7]
+        with self.assertRaises(ValueError):
+            tree3.delete(4)  # Item not in this snapshot
+
+    def test_snapshots_with_random_updates(self):
+        items = list(range(100))
+        random.shuffle(items)
+        snapshots = [PersistentBinarySearchTree()]
+        for item in items:
+            snapshots.append(snapshots[-1].insert(item))
+        for item in items[:50]:
+            snapshots.append(snapshots[-1].delete(item))
+        for index, item in enumerate(items):
+            assert snapshots[index + 1].items_in_order() == \
+                sorted(items[:index + 1])
+        assert snapshots[-1].items_in_order() == sorted(items[50:])
+        assert snapshots[-1].height() == snapshots[-1].root.height()
+
+
+class TreeMapTest(unittest.TestCase):
+
+    def test_init(self):
+        tm = TreeMap()
+        assert tm.root is None
+        assert tm.size == 0
+        assert tm.items() == []
+
+    def test_init_with_entries(self):
+        tm = TreeMap([('B', 2), ('A', 1), ('C', 3)])
+        assert tm.root.key == 'B'
+        assert tm.root.data == 2
+        assert tm.root.left.key == 'A'
+        assert tm.root.right.key == 'C'
+        assert tm.size == 3
+
+    def test_set_and_get(self):
+        tm = TreeMap()
+        tm.set('I', 1)
+        tm.set('V', 5)
+        tm.set('X', 10)
+        assert tm.get('I') == 1
+        assert tm.get('V') == 5
+        assert tm.get('X') == 10
+        assert tm.length() == 3
+        with self.assertRaises(KeyError):
+            tm.get('A')  # Key does not exist
+
+    def test_set_twice_and_get(self):
+        tm = TreeMap()
+        tm.set('I', 1)
+        tm.set('V', 4)
+        tm.set('X', 9)
+        assert tm.length() == 3
+        tm.set('V', 5)  # Update value
+        tm.set('X', 10)  # Update value
+        assert tm.get('V') == 5
+        assert tm.get('X') == 10
+        assert tm.length() == 3  # Check length is not overcounting
+
+    def test_values_are_never_compared(self):
+        # Values that do not support ordering can still be stored
+        tm = TreeMap([(2, {'b': 2}), (1, {'a': 1}), (2, {'c': 3})])
+        assert tm.items() == [(1, {'a': 1}), (2, {'c': 3})]
+
+    def test_keys_values_and_items_in_order(self):
+        tm = TreeMap([('+44', 0.07), ('+1', 0.01), ('+49', 0.08),
+                      ('+33', 0.06)])
+        assert tm.keys() == ['+1', '+33', '+44', '+49']
+        assert tm.values() == [0.01, 0.06, 0.07, 0.08]
+        assert tm.items() == [('+1', 0.01), ('+33', 0.06), ('+44', 0.07),
+                              ('+49', 0.08)]
+
+    def test_contains_and_search(self):
+        tm = TreeMap([('B', 2), ('A', 1)])
+        assert tm.contains('A') is True
+        assert tm.contains('C') is False
+        assert tm.search('B') == 2
+        assert tm.search('C') is None
+
+    def test_delete(self):
+        tm = TreeMap([(4, 'D'), (2, 'B'), (6, 'F'), (1, 'A'), (3, 'C'),
+                      (5, 'E'), (7, 'G')])
+        tm.delete(4)
+        assert tm.root.key == 5
+        assert tm.root.data == 'E'
+        tm.delete(1)
+        tm.delete(7)
+        assert tm.items() == [(2, 'B'), (3, 'C'), (5, 'E'), (6, 'F')]
+        assert tm.size == 4
+        assert tm.height() == tm.root.height() == 2
+        with self.assertRaises(KeyError):
+            tm.delete(4)  # Key no longer exists
+
+    def test_key_function(self):
+        routes = [('+44', 0.07), ('+1', 0.01), ('+33', 0.06)]
+        tm = TreeMap(routes, key=lambda route: route[0])
+        assert tm.keys() == ['+1', '+33', '+44']
+        assert tm.get('+33') == ('+33', 0.06)
+        tm.add(('+33', 0.05))  # Update value under same key
+        assert tm.get('+33') == ('+33', 0.05)
+        assert tm.size == 3
+        with self.assertRaises(TypeError):
+            TreeMap().add(('+1', 0.01))  # No key function
+
 
 if __name__ == '__main__':
     unittest.main()
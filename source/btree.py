@@ -0,0 +1,526 @@
+#!python
+
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+import os
+import pickle
+import struct
+
+
+class BTreeNode(object):
+
+    def __init__(self, is_leaf=True):
+        """Initialize this B-tree node as an empty leaf or internal node."""
+        self.is_leaf = is_leaf
+        self.keys = []
+        # Leaf nodes store values, internal nodes store child page ids
+        self.values = [] if is_leaf else None
+        self.children = None if is_leaf else []
+        # Leaf nodes link to the next leaf's page id for range scans
+        self.next = None
+
+    def __repr__(self):
+        """Return a string representation of this B-tree node."""
+        kind = 'leaf' if self.is_leaf else 'internal'
+        return 'BTreeNode({}, keys={!r})'.format(kind, self.keys)
+
+    def copy(self):
+        """Return a copy of this node with its own key, value and child lists,
+        so it can be changed without changing this node."""
+        node = BTreeNode(is_leaf=self.is_leaf)
+        node.keys = list(self.keys)
+        if self.is_leaf:
+            node.values = list(self.values)
+        else:
+            node.children = list(self.children)
+        node.next = self.next
+        return node
+
+
+class MemoryPageStore(object):
+    """Page store that keeps all B-tree nodes in memory."""
+
+    def __init__(self):
+        """Initialize this page store with no pages."""
+        self.pages = {}
+        self.page_count = 0
+        self.root = None  # Page id of the root node
+        self.size = 0  # Number of key-value entries in the tree
+        self.order = None  # Order of the tree stored in these pages
+
+    def allocate(self):
+        """Return a new page id, one greater than the last page allocated."""
+        page_id = self.page_count
+        self.page_count += 1
+        return page_id
+
+    def read(self, page_id):
+        """Return the node stored in the given page."""
+        return self.pages[page_id]
+
+    def check(self, node):
+        """Any node fits in an in-memory page."""
+
+    def write(self, page_id, node):
+        """Store the given node in the given page."""
+        self.pages[page_id] = node
+
+    def flush(self):
+        """Nothing to persist for in-memory pages."""
+
+    def close(self):
+        """Nothing to release for in-memory pages."""
+
+
+class FilePageStore(object):
+    """Page store that keeps B-tree nodes in fixed-size pages of a file, so a
+    tree can be larger than memory. Page 0 is a header holding the tree's
+    metadata and page ids count consecutive pages after it, so nodes written
+    one after another (like leaves from bulk loading) are contiguous on disk.
+    Recently used nodes are kept in a bounded cache; writes go through to the
+    file immediately."""
+
+    MAGIC = b'BTREEPG1'
+    # Header fields: magic, page size, order, root page id, page count, size
+    HEADER = struct.Struct('<8sIIqQQ')
+    # Each page starts with the byte length of its pickled node
+    LENGTH = struct.Struct('<I')
+
+    def __init__(self, path, page_size=4096, cache_size=256):
+        """Open the page file at the given path, creating it if it does not
+        exist, and read its header to restore a previously saved tree."""
+        self.path = path
+        self.cache_size = cache_size
+        self.cache = OrderedDict()  # Least recently used pages first
+        self.root = None
+        self.size = 0
+        self.order = None
+        self.page_count = 0
+        exists = os.path.exists(path) and os.path.getsize(path) > 0
+        self.file = open(path, 'r+b' if exists else 'w+b')
+        if exists:
+            self.file.seek(0)
+            header = self.file.read(self.HEADER.size)
+            magic, page_size, order, root, page_count, size = \
+                self.HEADER.unpack(header)
+            if magic != self.MAGIC:
+                self.file.close()
+                raise ValueError('Not a B-tree page file: {}'.format(path))
+            self.order = order or None
+            self.root = root if root >= 0 else None
+            self.page_count = page_count
+            self.size = size
+        self.page_size = page_size
+        if not exists:
+            self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def allocate(self):
+        """Return a new page id at the end of the page file."""
+        page_id = self.page_count
+        self.page_count += 1
+        return page_id
+
+    def _offset(self, page_id):
+        """Return the byte offset of the given page (after the header page)."""
+        return (page_id + 1) * self.page_size
+
+    def read(self, page_id):
+        """Return the node stored in the given page, from cache if possible."""
+        node = self.cache.get(page_id)
+        if node is not None:
+            self.cache.move_to_end(page_id)
+            return node
+        self.file.seek(self._offset(page_id))
+        page = self.file.read(self.page_size)
+        length, = self.LENGTH.unpack_from(page)
+        node = pickle.loads(page[self.LENGTH.size:self.LENGTH.size + length])
+        self._cache(page_id, node)
+        return node
+
+    def _encode(self, node):
+        """Return the given node serialized as a page, or raise ValueError if
+        the serialized node does not fit in one page."""
+        data = pickle.dumps(node, pickle.HIGHEST_PROTOCOL)
+        if self.LENGTH.size + len(data) > self.page_size:
+            raise ValueError('Node of {} bytes does not fit in a page of {} '
+                             'bytes; use a smaller order or larger page size'
+                             .format(len(data), self.page_size))
+        return self.LENGTH.pack(len(data)) + data
+
+    def check(self, node):
+        """Raise ValueError if the given node does not fit in one page."""
+        self._encode(node)
+
+    def write(self, page_id, node):
+        """Store the given node in the given page, or raise ValueError if the
+        serialized node does not fit in one page."""
+        page = self._encode(node)
+        self.file.seek(self._offset(page_id))
+        self.file.write(page.ljust(self.page_size, b'\0'))
+        self._cache(page_id, node)
+
+    def _cache(self, page_id, node):
+        """Remember the given page's node, evicting the least recently used."""
+        self.cache[page_id] = node
+        self.cache.move_to_end(page_id)
+        while len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+
+    def flush(self):
+        """Write this store's metadata to the header page and flush it."""
+        root = self.root if self.root is not None else -1
+        header = self.HEADER.pack(self.MAGIC, self.page_size, self.order or 0,
+                                  root, self.page_count, self.size)
+        self.file.seek(0)
+        self.file.write(header.ljust(self.page_size, b'\0'))
+        self.file.flush()
+
+    def close(self):
+        """Flush and close the page file."""
+        if not self.file.closed:
+            self.flush()
+            self.file.close()
+
+
+class BTree(object):
+    """Ordered map stored in a B+ tree: internal nodes hold only separator
+    keys and child page ids, all entries live in leaf nodes, and each leaf
+    links to the next leaf so range scans never go back up the tree.
+    Nodes are read and written through a page store, which may be in memory
+    (default) or file-backed (FilePageStore). Deleting entries never merges
+    underfull nodes, like many database B+ trees, which keeps deletes cheap;
+    bulk load a new tree to compact one after many deletes."""
+
+    DEFAULT_ORDER = 64
+
+    def __init__(self, entries=None, order=None, store=None):
+        """Initialize this B-tree of the given order (maximum number of
+        children of each node) with the given page store, which may already
+        hold a saved tree, and set the given (key, value) entries, if any."""
+        self.store = store if store is not None else MemoryPageStore()
+        if order is None:
+            order = self.store.order or self.DEFAULT_ORDER
+        elif self.store.order is not None and self.store.order != order:
+            raise ValueError('Page store holds a tree of order {}, not {}'
+                             .format(self.store.order, order))
+        if order < 3:
+            raise ValueError('B-tree order must be at least 3: {}'
+                             .format(order))
+        self.order = order
+        self.store.order = order
+        self.max_keys = order - 1
+        if entries is not None:
+            for key, value in entries:
+                self.set(key, value)
+
+    def __repr__(self):
+        """Return a string representation of this B-tree."""
+        return 'BTree(order={}, {} entries)'.format(self.order, self.size)
+
+    @property
+    def size(self):
+        """Number of key-value entries in this B-tree."""
+        return self.store.size
+
+    def length(self):
+        """Return the number of key-value entries in this B-tree."""
+        return self.store.size
+
+    def is_empty(self):
+        """Return True if this B-tree has no entries."""
+        return self.store.size == 0
+
+    def height(self):
+        """Return the number of edges from the root node to the leaf nodes,
+        or -1 if this B-tree has no nodes. All leaves are at the same depth.
+        Running time: O(log_b n) for branching factor b (the order)."""
+        if self.store.root is None:
+            return -1
+        height = 0
+        node = self.store.read(self.store.root)
+        while not node.is_leaf:
+            node = self.store.read(node.children[0])
+            height += 1
+        return height
+
+    def _find_leaf(self, key):
+        """Return the page id and node of the leaf where the given key is or
+        would be stored, or (None, None) if this B-tree has no nodes.
+        Running time: O(log_b n) node reads, each with an O(log b) bisect."""
+        page_id = self.store.root
+        if page_id is None:
+            return None, None
+        node = self.store.read(page_id)
+        while not node.is_leaf:
+            page_id = node.children[bisect_right(node.keys, key)]
+            node = self.store.read(page_id)
+        return page_id, node
+
+    def contains(self, key):
+        """Return True if this B-tree contains the given key, or False."""
+        page_id, leaf = self._find_leaf(key)
+        if leaf is None:
+            return False
+        index = bisect_left(leaf.keys, key)
+        return index < len(leaf.keys) and leaf.keys[index] == key
+
+    def get(self, key):
+        """Return the value associated with the given key, or raise KeyError.
+        Running time: O(log n) comparisons over O(log_b n) node reads."""
+        page_id, leaf = self._find_leaf(key)
+        if leaf is not None:
+            index = bisect_left(leaf.keys, key)
+            if index < len(leaf.keys) and leaf.keys[index] == key:
+                return leaf.values[index]
+        raise KeyError('Key not found: {}'.format(key))
+
+    def set(self, key, value):
+        """Insert or update the given key with its associated value. Nodes
+        that overflow are split in half and the split propagates upward.
+        Changed nodes are copies that are written only once every one of them
+        fits in a page, so a failed set leaves the tree unchanged.
+        Running time: O(log n) comparisons plus O(b) list shifting per level
+        for branching factor b (the order)."""
+        store = self.store
+        root, size = store.root, store.size
+        page_count = store.page_count
+        writes = []  # (page id, node) pairs to write once all nodes fit
+        try:
+            if root is None:
+                # Handle the case where the tree is empty
+                node = BTreeNode(is_leaf=True)
+                node.keys.append(key)
+                node.values.append(value)
+                page_id = root = store.allocate()
+                size = 1
+            else:
+                # Descend to the leaf, remembering the path of internal nodes
+                path = []
+                page_id = root
+                node = store.read(page_id)
+                while not node.is_leaf:
+                    index = bisect_right(node.keys, key)
+                    path.append((page_id, node, index))
+                    page_id = node.children[index]
+                    node = store.read(page_id)
+                node = node.copy()
+                index = bisect_left(node.keys, key)
+                if index < len(node.keys) and node.keys[index] == key:
+                    # Update the value since the key already exists
+                    node.values[index] = value
+                else:
+                    node.keys.insert(index, key)
+                    node.values.insert(index, value)
+                    size += 1
+                # Split overflowing nodes from the leaf upward
+                while len(node.keys) > self.max_keys:
+                    separator, right_id, right = self._split(node)
+                    writes.append((right_id, right))
+                    writes.append((page_id, node))
+                    if not path:
+                        # Root node was split, so grow a new root above it
+                        node = BTreeNode(is_leaf=False)
+                        node.keys.append(separator)
+                        node.children.extend([page_id, right_id])
+                        page_id = root = store.allocate()
+                        break
+                    page_id, node, index = path.pop()
+                    node = node.copy()
+                    node.keys.insert(index, separator)
+                    node.children.insert(index + 1, right_id)
+            writes.append((page_id, node))
+            for _, changed in writes:
+                store.check(changed)
+        except Exception:
+            # Give back any pages allocated for nodes that were not written
+            store.page_count = page_count
+            raise
+        for page_id, node in writes:
+            store.write(page_id, node)
+        store.root = root
+        store.size = size
+
+    def _split(self, node):
+        """Split the given overflowing node in half, keeping the left half in
+        it, and return the separator key and the page id and node of the new
+        right half. Neither node is written."""
+        right = BTreeNode(is_leaf=node.is_leaf)
+        middle = len(node.keys) // 2
+        if node.is_leaf:
+            # Leaf keeps the separator key, which is copied up to the parent
+            right.keys = node.keys[middle:]
+            right.values = node.values[middle:]
+            del node.keys[middle:]
+            del node.values[middle:]
+            separator = right.keys[0]
+        else:
+            # Internal node moves the separator key up to the parent
+            separator = node.keys[middle]
+            right.keys = node.keys[middle + 1:]
+            right.children = node.children[middle + 1:]
+            del node.keys[middle:]
+            del node.children[middle + 1:]
+        right_id = self.store.allocate()
+        if node.is_leaf:
+            right.next = node.next
+            node.next = right_id
+        return separator, right_id, right
+
+    def delete(self, key):
+        """Delete the given key and its associated value, or raise KeyError.
+        Underfull nodes are not merged (see the class docstring).
+        Running time: O(log n) comparisons plus O(b) list shifting."""
+        page_id, leaf = self._find_leaf(key)
+        if leaf is not None:
+            index = bisect_left(leaf.keys, key)
+            if index < len(leaf.keys) and leaf.keys[index] == key:
+                # Change a copy, so the stored leaf is unchanged if the
+                # write fails
+                leaf = leaf.copy()
+                del leaf.keys[index]
+                del leaf.values[index]
+                self.store.write(page_id, leaf)
+                self.store.size -= 1
+                return
+        raise KeyError('Key not found: {}'.format(key))
+
+    def scan(self, low=None, high=None):
+        """Generate (key, value) entries in order of their keys for all keys
+        in the half-open range [low, high), where None means unbounded.
+        Running time: O(log n + k) for k entries generated, because we descend
+        once to the first leaf and then follow links between leaves."""
+        if self.store.root is None:
+            return
+        if low is None:
+            # Descend along the leftmost path to the first leaf
+            node = self.store.read(self.store.root)
+            while not node.is_leaf:
+                node = self.store.read(node.children[0])
+            index = 0
+        else:
+            page_id, node = self._find_leaf(low)
+            index = bisect_left(node.keys, low)
+        while node is not None:
+            keys = node.keys
+            values = node.values
+            for index in range(index, len(keys)):
+                key = keys[index]
+                if high is not None and not key < high:
+                    return
+                yield key, values[index]
+            node = self.store.read(node.next) if node.next is not None \
+                else None
+            index = 0
+
+    def keys(self, low=None, high=None):
+        """Return a list of all keys in order, optionally in [low, high)."""
+        return [key for key, value in self.scan(low, high)]
+
+    def values(self, low=None, high=None):
+        """Return a list of all values in order of their keys, optionally for
+        keys within [low, high)."""
+        return [value for key, value in self.scan(low, high)]
+
+    def items(self, low=None, high=None):
+        """Return a list of all entries (key-value pairs) in order of their
+        keys, optionally for keys within [low, high)."""
+        return list(self.scan(low, high))
+
+    def bulk_load(self, entries, fill_factor=1.0):
+        """Build this empty B-tree bottom-up from the given (key, value)
+        entries, which must be sorted by strictly increasing keys, filling
+        each node to the given fraction of its capacity. Leaves are written to
+        consecutive pages, so range scans read contiguous pages.
+        Running time: O(n) for n entries (versus O(n log n) for n inserts)."""
+        if not self.is_empty() or self.store.root is not None:
+            raise ValueError('Cannot bulk load a B-tree that has nodes')
+        if not 0 < fill_factor <= 1:
+            raise ValueError('Fill factor must be in range (0, 1]: {}'
+                             .format(fill_factor))
+        store = self.store
+        leaf_capacity = max(1, int(self.max_keys * fill_factor))
+        node_capacity = max(2, int(self.order * fill_factor))
+        # Fill leaves in order, linking each leaf to the next one
+        level = []  # (first key, page id) of each node in the current level
+        leaf = previous = previous_id = None
+        last_key = None
+        count = 0
+        for key, value in entries:
+            if count > 0 and not last_key < key:
+                raise ValueError('Bulk load keys must be strictly increasing: '
+                                 '{!r} after {!r}'.format(key, last_key))
+            if leaf is None or len(leaf.keys) == leaf_capacity:
+                leaf = BTreeNode(is_leaf=True)
+                leaf_id = store.allocate()
+                if previous is not None:
+                    previous.next = leaf_id
+                    store.write(previous_id, previous)
+                previous, previous_id = leaf, leaf_id
+                level.append((key, leaf_id))
+            leaf.keys.append(key)
+            leaf.values.append(value)
+            last_key = key
+            count += 1
+        if previous is None:
+            return
+        store.write(previous_id, previous)
+        store.size = count
+        # Build each internal level from the level below until one node is left
+        while len(level) > 1:
+            # Spread children evenly so no node is left with a single child
+            num_nodes = -(-len(level) // node_capacity)  # Ceiling division
+            per_node, extra = divmod(len(level), num_nodes)
+            parents = []
+            start = 0
+            for i in range(num_nodes):
+                end = start + per_node + (1 if i < extra else 0)
+                group = level[start:end]
+                node = BTreeNode(is_leaf=False)
+                node.keys = [first_key for first_key, _ in group[1:]]
+                node.children = [child_id for _, child_id in group]
+                node_id = store.allocate()
+                store.write(node_id, node)
+                parents.append((group[0][0], node_id))
+                start = end
+            level = parents
+        store.root = level[0][1]
+
+    def flush(self):
+        """Persist this B-tree's metadata to its page store."""
+        self.store.flush()
+
+    def close(self):
+        """Persist this B-tree and close its page store."""
+        self.store.close()
+
+
+def test_btree():
+    entries = [(key, key * key) for key in range(1, 31)]
+    tree = BTree(order=4)
+    print('tree: {}'.format(tree))
+
+    print('\nSetting entries:')
+    for key, value in entries:
+        tree.set(key, value)
+    print('tree: {}, height: {}'.format(tree, tree.height()))
+
+    print('\nGetting entries:')
+    for key in [1, 15, 30]:
+        print('get({}): {}'.format(key, tree.get(key)))
+
+    print('\nScanning range [10, 15):')
+    print(tree.items(10, 15))
+
+    bulk = BTree(order=4)
+    bulk.bulk_load(entries)
+    print('\nBulk loaded: {}, height: {}'.format(bulk, bulk.height()))
+
+
+if __name__ == '__main__':
+    test_btree()
@@ -0,0 +1,205 @@
+#!python
+
+from btree import BTree, FilePageStore, MemoryPageStore
+import os
+import random
+import shutil
+import tempfile
+import unittest
+
+
+class BTreeTest(unittest.TestCase):
+
+    def test_init(self):
+        tree = BTree(order=4)
+        assert tree.order == 4
+        assert tree.size == 0
+        assert tree.is_empty() is True
+        assert tree.height() == -1
+        assert tree.items() == []
+
+    def test_init_with_invalid_order(self):
+        with self.assertRaises(ValueError):
+            BTree(order=2)
+
+    def test_set_and_get(self):
+        tree = BTree(order=4)
+        tree.set('I', 1)
+        tree.set('V', 5)
+        tree.set('X', 10)
+        assert tree.get('I') == 1
+        assert tree.get('V') == 5
+        assert tree.get('X') == 10
+        assert tree.length() == 3
+        with self.assertRaises(KeyError):
+            tree.get('A')  # Key does not exist
+
+    def test_set_twice_and_get(self):
+        tree = BTree([('I', 1), ('V', 4), ('X', 9)], order=3)
+        tree.set('V', 5)  # Update value
+        tree.set('X', 10)  # Update value
+        assert tree.get('V') == 5
+        assert tree.get('X') == 10
+        assert tree.length() == 3  # Check length is not overcounting
+
+    def test_set_splits_nodes(self):
+        keys = list(range(100))
+        random.shuffle(keys)
+        tree = BTree(order=4)
+        for key in keys:
+            tree.set(key, str(key))
+        assert tree.size == 100
+        assert tree.keys() == list(range(100))
+        # Every node holds at most 3 keys, so height is between log_4 and log_2
+        assert 3 <= tree.height() <= 6
+        for key in keys:
+            assert tree.contains(key) is True
+            assert tree.get(key) == str(key)
+        assert tree.contains(100) is False
+
+    def test_delete(self):
+        tree = BTree([(key, key) for key in range(20)], order=4)
+        for key in range(0, 20, 2):
+            tree.delete(key)
+        assert tree.size == 10
+        assert tree.keys() == list(range(1, 20, 2))
+        assert tree.contains(4) is False
+        with self.assertRaises(KeyError):
+            tree.delete(4)  # Key no longer exists
+        for key in range(1, 20, 2):
+            tree.delete(key)
+        assert tree.is_empty() is True
+        assert tree.items() == []
+
+    def test_failed_delete_leaves_tree_unchanged(self):
+        store = MemoryPageStore()
+        tree = BTree([(key, key) for key in range(20)], order=4, store=store)
+
+        def failing_write(page_id, node):
+            raise IOError('Disk full')
+        store.write = failing_write
+        with self.assertRaises(IOError):
+            tree.delete(7)
+        assert tree.size == 20
+        assert tree.contains(7) is True
+        assert tree.keys() == list(range(20))
+
+    def test_range_scan(self):
+        tree = BTree([(key, key * key) for key in range(0, 50, 2)], order=5)
+        assert tree.keys(10, 20) == [10, 12, 14, 16, 18]
+        assert tree.keys(11, 19) == [12, 14, 16, 18]
+        assert tree.items(44) == [(44, 1936), (46, 2116), (48, 2304)]
+        assert tree.values(None, 5) == [0, 4, 16]
+        assert tree.keys(100) == []
+        assert list(tree.scan(20, 20)) == []
+
+    def test_bulk_load(self):
+        entries = [(key, -key) for key in range(1000)]
+        tree = BTree(order=8)
+        tree.bulk_load(entries)
+        assert tree.size == 1000
+        assert tree.items() == entries
+        assert tree.height() == 3  # 143 leaves under 18, 3 and 1 nodes
+        assert tree.keys(500, 505) == [500, 501, 502, 503, 504]
+        # Bulk loaded tree still supports updates
+        tree.set(1000, -1000)
+        tree.set(-1, 1)
+        tree.delete(500)
+        assert tree.size == 1001
+        assert tree.keys(498, 503) == [498, 499, 501, 502]
+        assert tree.keys()[0] == -1
+        assert tree.get(1000) == -1000
+
+    def test_bulk_load_with_fill_factor(self):
+        tree = BTree(order=10)
+        tree.bulk_load(((key, key) for key in range(100)), fill_factor=0.5)
+        assert tree.keys() == list(range(100))
+        # Leaves are half full, leaving room for inserts without splits
+        leaf = tree.store.read(0)
+        assert len(leaf.keys) == 4
+
+    def test_bulk_load_with_unsorted_keys(self):
+        tree = BTree(order=4)
+        with self.assertRaises(ValueError):
+            tree.bulk_load([(1, 'A'), (3, 'C'), (2, 'B')])
+        with self.assertRaises(ValueError):
+            BTree([(1, 'A')]).bulk_load([(2, 'B')])  # Tree is not empty
+
+
+class FilePageStoreTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'tree.pages')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_set_and_reopen(self):
+        tree = BTree(order=16, store=FilePageStore(self.path, cache_size=4))
+        keys = list(range(500))
+        random.shuffle(keys)
+        for key in keys:
+            tree.set(key, 'value {}'.format(key))
+        tree.delete(250)
+        tree.close()
+        # Reopen the file and restore the tree and its order from the header
+        tree = BTree(store=FilePageStore(self.path))
+        assert tree.order == 16
+        assert tree.size == 499
+        assert tree.get(123) == 'value 123'
+        assert tree.contains(250) is False
+        assert tree.keys(248, 253) == [248, 249, 251, 252]
+        tree.close()
+
+    def test_bulk_load_writes_contiguous_leaves(self):
+        with FilePageStore(self.path, cache_size=2) as store:
+            tree = BTree(order=32, store=store)
+            tree.bulk_load((key, key) for key in range(1000))
+            leaf_ids = []
+            page_id = 0
+            while page_id is not None:
+                leaf_ids.append(page_id)
+                page_id = store.read(page_id).next
+            assert leaf_ids == list(range(len(leaf_ids)))
+            assert tree.items() == [(key, key) for key in range(1000)]
+
+    def test_reopen_with_different_order(self):
+        BTree([(1, 'A')], order=8, store=FilePageStore(self.path)).close()
+        store = FilePageStore(self.path)
+        with self.assertRaises(ValueError):
+            BTree(order=4, store=store)
+        store.close()
+
+    def test_node_too_large_for_page(self):
+        store = FilePageStore(self.path, page_size=64)
+        tree = BTree(order=4, store=store)
+        with self.assertRaises(ValueError):
+            tree.set(1, 'x' * 100)
+        assert tree.size == 0
+        assert tree.contains(1) is False
+        store.close()
+        # Fill a leaf until the next insert no longer fits in its page
+        path = os.path.join(self.directory, 'strings.pages')
+        store = FilePageStore(path, page_size=512)
+        tree = BTree(order=64, store=store)
+        keys = ['{:025d}'.format(n) for n in range(64)]
+        with self.assertRaises(ValueError):
+            for key in keys:
+                tree.set(key, key)
+        rejected = keys[tree.size]
+        size = tree.size
+        assert size > 0
+        assert tree.contains(rejected) is False
+        assert tree.keys() == keys[:size]
+        tree.close()
+        with FilePageStore(path) as store:
+            tree = BTree(store=store)
+            assert tree.size == size
+            assert tree.contains(rejected) is False
+            assert tree.keys() == keys[:size]
+            assert len(tree.items()) == size
+
+
+if __name__ == '__main__':
+    unittest.main()
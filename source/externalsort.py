@@ -0,0 +1,157 @@
+#!python
+
+import heapq
+import os
+import sys
+import tempfile
+
+from sorting import merge_sort
+
+# Default number of bytes of lines held in memory at once
+DEFAULT_MEMORY_LIMIT = 64 * 1024 * 1024
+# Default number of sorted runs merged together in one pass
+DEFAULT_FAN_IN = 16
+# Smallest read buffer given to each run file during a merge
+MIN_BUFFER_SIZE = 4096
+
+
+def external_sort(input_path, output_path, memory_limit=DEFAULT_MEMORY_LIMIT,
+                  fan_in=DEFAULT_FAN_IN, key=None, sort=merge_sort,
+                  temp_dir=None, encoding='utf-8'):
+    """Sort lines of the text file at input_path into the file at
+    output_path, holding about `memory_limit` bytes of lines in memory at
+    once, so files much larger than memory can be sorted. Lines are read in
+    chunks that fit in the memory limit, each chunk is sorted with the given
+    in-memory sorting function and written to a temporary run file, and then
+    runs are merged with a buffered k-way heap merge, `fan_in` runs at a
+    time, in as many passes as needed. If key is given, lines are ordered by
+    key(line), otherwise by the lines themselves. The sort is stable if the
+    given sorting function is stable (as merge sort is). Lines end only at
+    '\n' and are written back unchanged, so '\r\n' line endings are kept,
+    and a missing newline after the last line is added with the file's own
+    line ending.
+    Running time: O(n log n) comparisons for n lines, plus reading and
+    writing every line once per merge pass, which is O(log r / log fan_in)
+    passes for r = file size / memory_limit runs.
+    Memory usage: O(memory_limit) for one chunk of lines or for the read
+    buffers of `fan_in` runs being merged."""
+    if fan_in < 2:
+        raise ValueError('Fan-in must be at least 2: {}'.format(fan_in))
+    if memory_limit < 1:
+        raise ValueError('Memory limit must be positive: {}'
+                         .format(memory_limit))
+    # Split memory between one read buffer per run and one output buffer
+    buffer_size = max(MIN_BUFFER_SIZE, memory_limit // (fan_in + 1))
+    with tempfile.TemporaryDirectory(dir=temp_dir) as run_dir:
+        with open(input_path, encoding=encoding,
+                  newline='\n') as input_file:
+            runs = _write_runs(input_file, run_dir, memory_limit, key, sort,
+                               encoding)
+        # Merge groups of runs into longer runs until one pass remains
+        while len(runs) > fan_in:
+            merged_runs = []
+            for start in range(0, len(runs), fan_in):
+                group = runs[start:start + fan_in]
+                if len(group) == 1:
+                    merged_runs.append(group[0])
+                    continue
+                path = _new_run_path(run_dir)
+                _merge_runs(group, path, buffer_size, key, encoding)
+                for run in group:
+                    os.remove(run)
+                merged_runs.append(path)
+            runs = merged_runs
+        _merge_runs(runs, output_path, buffer_size, key, encoding)
+
+
+def _write_runs(input_file, run_dir, memory_limit, key, sort, encoding):
+    """Read lines from the given input file in chunks of about memory_limit
+    bytes, sort each chunk and write it to a new run file in run_dir.
+    Return the list of run file paths in the order they were written."""
+    runs = []
+    chunk = []
+    chunk_size = 0
+    newline = '\n'
+    for line in input_file:
+        if line.endswith('\r\n'):
+            newline = '\r\n'
+        elif line.endswith('\n'):
+            newline = '\n'
+        else:
+            # Only the last line can be missing its line ending
+            line += newline
+        chunk.append(line)
+        # Count the line object and its list slot, not just its characters
+        chunk_size += sys.getsizeof(line) + 8
+        if chunk_size >= memory_limit:
+            runs.append(_write_run(chunk, run_dir, key, sort, encoding))
+            chunk = []
+            chunk_size = 0
+    if chunk or not runs:
+        runs.append(_write_run(chunk, run_dir, key, sort, encoding))
+    return runs
+
+
+def _write_run(lines, run_dir, key, sort, encoding):
+    """Sort given lines with the given sorting function and write them to a
+    new run file in run_dir. Return the path of the run file."""
+    if key is None:
+        sort(lines)
+    else:
+        # Decorate each line with its key once and its index to break ties,
+        # so lines are never compared and equal keys keep their order
+        decorated = [(key(line), index, line)
+                     for index, line in enumerate(lines)]
+        sort(decorated)
+        lines = [line for _, _, line in decorated]
+    path = _new_run_path(run_dir)
+    with open(path, 'w', encoding=encoding, newline='') as run_file:
+        run_file.writelines(lines)
+    return path
+
+
+def _new_run_path(run_dir):
+    """Create a new empty run file in run_dir and return its path."""
+    descriptor, path = tempfile.mkstemp(suffix='.run', dir=run_dir)
+    os.close(descriptor)
+    return path
+
+
+def _merge_runs(runs, output_path, buffer_size, key, encoding):
+    """Merge the sorted run files at the given paths into the file at
+    output_path with a k-way heap merge, reading and writing through buffers
+    of buffer_size bytes. Ties are taken from earlier runs first, so merging
+    runs in the order they were written keeps the sort stable."""
+    run_files = []
+    try:
+        for run in runs:
+            run_files.append(open(run, encoding=encoding, newline='\n',
+                                  buffering=buffer_size))
+        with open(output_path, 'w', encoding=encoding, newline='',
+                  buffering=buffer_size) as output_file:
+            output_file.writelines(heapq.merge(*run_files, key=key))
+    finally:
+        for run_file in run_files:
+            run_file.close()
+
+
+def main():
+    """Read command-line arguments and sort a text file by lines."""
+    args = sys.argv[1:]  # Ignore script file name
+    if len(args) not in (2, 3, 4):
+        script = os.path.basename(sys.argv[0])
+        print('Usage: {} input_file output_file [memory_mb] [fan_in]'
+              .format(script))
+        print('Example: {} calls.log calls-sorted.log 256 32'.format(script))
+        return
+    memory_limit = DEFAULT_MEMORY_LIMIT
+    fan_in = DEFAULT_FAN_IN
+    if len(args) >= 3:
+        memory_limit = int(float(args[2]) * 1024 * 1024)
+    if len(args) >= 4:
+        fan_in = int(args[3])
+    external_sort(args[0], args[1], memory_limit, fan_in)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+#!python
+
+from externalsort import external_sort
+from sorting import random_ints, quick_sort
+import os
+import shutil
+import tempfile
+import unittest
+
+
+class ExternalSortTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.input_path = os.path.join(self.directory, 'input.txt')
+        self.output_path = os.path.join(self.directory, 'output.txt')
+        self.temp_dir = os.path.join(self.directory, 'runs')
+        os.mkdir(self.temp_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write_input(self, text):
+        with open(self.input_path, 'w', newline='') as input_file:
+            input_file.write(text)
+
+    def read_output(self):
+        with open(self.output_path, newline='') as output_file:
+            return output_file.read()
+
+    def test_external_sort_in_one_run(self):
+        self.write_input('cherry\napple\nbanana\n')
+        external_sort(self.input_path, self.output_path)
+        assert self.read_output() == 'apple\nbanana\ncherry\n'
+
+    def test_external_sort_on_empty_file(self):
+        self.write_input('')
+        external_sort(self.input_path, self.output_path)
+        assert self.read_output() == ''
+
+    def test_external_sort_adds_missing_final_newline(self):
+        self.write_input('b\nc\na')
+        external_sort(self.input_path, self.output_path)
+        assert self.read_output() == 'a\nb\nc\n'
+
+    def test_external_sort_keeps_line_endings(self):
+        self.write_input('c\r\nb\ra\r\n\n')
+        external_sort(self.input_path, self.output_path)
+        # A bare carriage return does not end a line
+        assert self.read_output() == '\nb\ra\r\nc\r\n'
+        self.write_input('b\r\nc\r\na')
+        external_sort(self.input_path, self.output_path, memory_limit=50,
+                      fan_in=2)
+        assert self.read_output() == 'a\r\nb\r\nc\r\n'
+
+    def test_external_sort_with_many_runs_and_merge_passes(self):
+        lines = ['{:05d}\n'.format(number)
+                 for number in random_ints(2000, 0, 99999)]
+        self.write_input(''.join(lines))
+        # A tiny memory limit spills many runs and a fan-in of 3 forces
+        # several merge passes
+        external_sort(self.input_path, self.output_path, memory_limit=2000,
+                      fan_in=3, temp_dir=self.temp_dir)
+        assert self.read_output() == ''.join(sorted(lines))
+        # All run files were removed
+        assert os.listdir(self.temp_dir) == []
+
+    def test_external_sort_with_key_is_stable(self):
+        # Sort call records by cost, keeping equal costs in input order
+        lines = ['call{},{}\n'.format(index, cost) for index, cost
+                 in enumerate(random_ints(500, 1, 20))]
+        self.write_input(''.join(lines))
+
+        def cost(line):
+            return int(line.split(',')[1])
+        external_sort(self.input_path, self.output_path, memory_limit=1500,
+                      fan_in=4, key=cost)
+        assert self.read_output() == ''.join(sorted(lines, key=cost))
+
+    def test_external_sort_with_other_sort_function(self):
+        lines = ['{}\n'.format(number) for number in random_ints(300, 1, 50)]
+        self.write_input(''.join(lines))
+        external_sort(self.input_path, self.output_path, memory_limit=1000,
+                      sort=quick_sort)
+        assert self.read_output() == ''.join(sorted(lines))
+
+    def test_external_sort_with_invalid_arguments(self):
+        self.write_input('a\n')
+        with self.assertRaises(ValueError):
+            external_sort(self.input_path, self.output_path, fan_in=1)
+        with self.assertRaises(ValueError):
+            external_sort(self.input_path, self.output_path, memory_limit=0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,216 @@
+#!python
+
+from array import array
+import multiprocessing
+from multiprocessing.shared_memory import SharedMemory
+import os
+
+from parallelsort import chunk_bounds, shared_typecode
+from search import linear_search
+
+# Number of values each worker scans between checks for an earlier match
+SEARCH_BLOCK_SIZE = 1 << 18
+
+
+class SharedArray(object):
+    """Array of 64-bit integers or floats copied once into shared memory, so
+    it can be searched many times by worker processes without pickling it.
+    Use it as a context manager or call close to free its shared memory."""
+
+    def __init__(self, items):
+        """Initialize this shared array with a copy of the given integers
+        that fit in 64 bits or floats. Raise ValueError for other items.
+        Running time: O(n) to copy n items.
+        Memory usage: O(n) shared memory for 8 bytes per item."""
+        items = list(items)
+        typecode = shared_typecode(items) if items else 'q'
+        if typecode is None:
+            raise ValueError('Shared arrays can only hold 64-bit integers or '
+                             'floats')
+        self.typecode = typecode
+        self.count = len(items)
+        self.shared = SharedMemory(create=True, size=8 * max(1, self.count))
+        if items:
+            view = self.shared.buf.cast(typecode)
+            view[:self.count] = array(typecode, items)
+            view.release()
+
+    def __repr__(self):
+        """Return a string representation of this shared array."""
+        return 'SharedArray({!r}, {} items)'.format(self.typecode,
+                                                    self.count)
+
+    def __len__(self):
+        """Return the number of items in this shared array."""
+        return self.count
+
+    def __enter__(self):
+        """Return this shared array to use in a with statement."""
+        return self
+
+    def __exit__(self, *exc_info):
+        """Free this shared array's shared memory."""
+        self.close()
+
+    def close(self):
+        """Free this shared array's shared memory. It cannot be searched
+        after it is closed."""
+        if self.shared is not None:
+            self.shared.close()
+            self.shared.unlink()
+            self.shared = None
+
+    def search(self, item, workers=None, min_chunk_size=100000):
+        """Return the first (lowest) index of the given item in this shared
+        array or None if it is not found, scanning one chunk of the array in
+        each of the given number of worker processes (by default, one per
+        CPU). Workers check for matches found by workers scanning earlier
+        chunks between blocks of `SEARCH_BLOCK_SIZE` values and stop as soon
+        as one is found, and the result is returned as soon as it is known.
+        No more than one worker is used per `min_chunk_size` items, and if
+        only one worker would be used, the array is searched in this process.
+        Running time: O(n/p) per worker for n items and p workers, with each
+        value compared in native code rather than a Python loop.
+        Memory usage: O(p) for worker processes and their results."""
+        if self.shared is None:
+            raise ValueError('Shared array is closed')
+        if workers is None:
+            workers = os.cpu_count() or 1
+        workers = min(workers, self.count // max(min_chunk_size, 1))
+        if workers <= 1:
+            view = self.shared.buf.cast(self.typecode)[:self.count]
+            try:
+                return linear_search(view, item)
+            finally:
+                view.release()
+        return self._search_in_workers(item, workers)
+
+    def _search_in_workers(self, item, workers):
+        """Return the first index of the given item in this shared array or
+        None, searching it in the given number of worker processes."""
+        # Each worker writes the first index it finds into its own slot, so
+        # no lock is needed, and workers read earlier workers' slots
+        found_shared = SharedMemory(create=True, size=8 * workers)
+        found = found_shared.buf.cast('q')
+        for worker in range(workers):
+            found[worker] = -1
+        context = multiprocessing.get_context()
+        processes = [context.Process(
+            target=_search_shared_range,
+            args=(self.shared.name, self.typecode, found_shared.name, worker,
+                  start, end, item))
+            for worker, (start, end) in
+            enumerate(chunk_bounds(self.count, workers))]
+        try:
+            for process in processes:
+                process.start()
+            # Wait for workers in order: the first one that found the item
+            # after all earlier ones found nothing has the lowest index, and
+            # later workers stop at their next check of earlier results
+            for worker, process in enumerate(processes):
+                process.join()
+                if process.exitcode:
+                    raise RuntimeError('Search worker process failed with '
+                                       'exit code {}'.format(process.exitcode))
+                if found[worker] >= 0:
+                    return found[worker]  # found
+            return None  # not found
+        finally:
+            # Cancel workers still searching later chunks, if any are left
+            for worker in range(workers):
+                if found[worker] < 0:
+                    found[worker] = self.count
+            for process in processes:
+                if process.pid is not None:
+                    process.join()
+            found.release()
+            found_shared.close()
+            found_shared.unlink()
+
+
+def _search_shared_range(name, typecode, found_name, worker, start, end,
+                         item):
+    """Search range `[start...end-1]` of the shared memory array with the
+    given name and typecode for the given item, one block at a time, and
+    write the first index found into this worker's slot of the shared found
+    array with the given name. Stop early if any earlier worker's slot shows
+    it found the item. This runs in a worker process."""
+    shared = SharedMemory(name=name)
+    found_shared = SharedMemory(name=found_name)
+    view = shared.buf.cast(typecode)
+    found = found_shared.buf.cast('q')
+    try:
+        for block_start in range(start, end, SEARCH_BLOCK_SIZE):
+            # Stop if any worker searching lower indexes found the item
+            for earlier in range(worker):
+                if found[earlier] >= 0:
+                    return
+            block = view[block_start:min(block_start + SEARCH_BLOCK_SIZE,
+                                         end)]
+            try:
+                index = linear_search(block, item)
+            finally:
+                block.release()
+            if index is not None:
+                found[worker] = block_start + index
+                return
+    finally:
+        view.release()
+        found.release()
+        shared.close()
+        found_shared.close()
+
+
+def parallel_search(items, item, workers=None, min_chunk_size=100000):
+    """Return the first index of the given item in the given 64-bit integers
+    or floats, or None if it is not found, by copying items into a shared
+    array and searching it with multiple worker processes. Copying takes
+    about as long as one linear search, so to search the same items more
+    than once, create a SharedArray and call its search method instead."""
+    with SharedArray(items) as shared:
+        return shared.search(item, workers, min_chunk_size)
+
+
+def benchmark_parallel_search(num_items=10000000, max_workers=None,
+                              repeat=3):
+    """Print the time taken to search a shared array of integers for an item
+    near its middle, its last item and a missing item using 1, 2, 4, ...
+    worker processes, with the best of `repeat` runs of each."""
+    import time
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    print('Searching {} integers with up to {} workers on {} CPUs:'.format(
+        num_items, max_workers, os.cpu_count()))
+    targets = [('middle', num_items // 2), ('last', num_items - 1),
+               ('missing', -1)]
+    with SharedArray(range(num_items)) as shared:
+        workers = 1
+        while workers <= max_workers:
+            for label, target in targets:
+                best = None
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    index = shared.search(target, workers, min_chunk_size=1)
+                    seconds = time.perf_counter() - start
+                    best = seconds if best is None else min(best, seconds)
+                assert index == (target if target >= 0 else None)
+                print('    {:<8} {:>3} workers  {:.3f} s'.format(
+                    label, workers, best))
+            workers *= 2
+
+
+def main():
+    """Read command-line arguments and benchmark parallel searching."""
+    import sys
+    args = sys.argv[1:]  # Ignore script file name
+    try:
+        num_items = int(args[0]) if len(args) >= 1 else 10000000
+        max_workers = int(args[1]) if len(args) >= 2 else None
+    except ValueError:
+        print('Usage: {} [num_items] [max_workers]'.format(sys.argv[0]))
+        return
+    benchmark_parallel_search(num_items, max_workers)
+
+
+if __name__ == '__main__':
+    main()
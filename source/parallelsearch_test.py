@@ -0,0 +1,65 @@
+#!python
+
+from parallelsearch import SharedArray, parallel_search
+import parallelsearch
+import random
+import unittest
+
+
+class ParallelSearchTest(unittest.TestCase):
+
+    def test_parallel_search_on_small_lists_searches_in_this_process(self):
+        assert parallel_search([3, 1, 2], 1, workers=4) == 1
+        assert parallel_search([3, 1, 2], 4, workers=4) is None
+        assert parallel_search([], 4, workers=4) is None
+
+    def test_parallel_search_finds_lowest_index(self):
+        items = [random.randrange(100) for _ in range(1000)]
+        for workers in range(2, 6):
+            for item in [items[0], items[-1], items[500], 7, 100, -1]:
+                expected = items.index(item) if item in items else None
+                assert parallel_search(items, item, workers,
+                                       min_chunk_size=1) == expected
+
+    def test_parallel_search_prefers_earlier_chunks(self):
+        # every chunk contains the item, so only the first one's counts
+        items = [0] * 400
+        for index in range(0, 400, 50):
+            items[index + 30] = 9
+        assert parallel_search(items, 9, 4, min_chunk_size=1) == 30
+
+    def test_parallel_search_on_floats(self):
+        items = [random.uniform(-1, 1) for _ in range(500)]
+        assert parallel_search(items, items[321], 3, min_chunk_size=1) == 321
+        assert parallel_search(items, 2.0, 3, min_chunk_size=1) is None
+
+    def test_workers_search_in_blocks(self):
+        block_size = parallelsearch.SEARCH_BLOCK_SIZE
+        parallelsearch.SEARCH_BLOCK_SIZE = 16
+        try:
+            items = list(range(1000))
+            for item in [0, 15, 16, 17, 499, 999]:
+                assert parallel_search(items, item, 3,
+                                       min_chunk_size=1) == item
+        finally:
+            parallelsearch.SEARCH_BLOCK_SIZE = block_size
+
+    def test_shared_array_searched_many_times(self):
+        with SharedArray(range(0, 2000, 2)) as shared:
+            assert len(shared) == 1000
+            assert shared.search(1000, 4, min_chunk_size=1) == 500
+            assert shared.search(1998, 4, min_chunk_size=1) == 999
+            assert shared.search(1001, 4, min_chunk_size=1) is None
+            assert shared.search(1000, 1) == 500
+        with self.assertRaises(ValueError):
+            shared.search(1000)
+
+    def test_shared_array_with_unsupported_items(self):
+        with self.assertRaises(ValueError):
+            SharedArray(['Alex', 'Brian'])
+        with self.assertRaises(ValueError):
+            SharedArray([2 ** 70])
+
+
+if __name__ == '__main__':
+    unittest.main()
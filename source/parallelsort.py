@@ -0,0 +1,257 @@
+#!python
+
+from array import array
+from bisect import bisect_right
+import heapq
+import multiprocessing
+from multiprocessing.shared_memory import SharedMemory
+import os
+import random
+
+from sorting import is_sorted, quick_sort, random_ints
+
+# Signed 64-bit integer range that fits in shared memory arrays
+INT64_MIN = -2 ** 63
+INT64_MAX = 2 ** 63 - 1
+
+
+def parallel_sort(items, workers=None, method='merge', sort=quick_sort,
+                  min_chunk_size=10000):
+    """Sort given items in place using multiple worker processes, each of
+    which sorts one chunk of items with the given single-core sorting
+    function from the sorting module. With method 'merge', items are split
+    into equal chunks and the sorted chunks are combined with a k-way heap
+    merge. With method 'sample', a random sample of items picks splitters
+    that partition items into one bucket per worker, so the sorted buckets
+    are simply concatenated with no merge.
+    Integers that fit in 64 bits and floats are copied once into a shared
+    memory array that workers sort in place, so no items are pickled. Other
+    items are pickled through a pipe to and from each worker.
+    No more than one worker is used per `min_chunk_size` items, and if only
+    one worker would be used, items are sorted in this process instead.
+    Running time: O((n/p) log(n/p)) per worker for p workers, plus O(n log p)
+    in this process to merge chunks or partition buckets.
+    Memory usage: O(n) for the shared memory array (or pickled chunks)."""
+    if method not in ('merge', 'sample'):
+        raise ValueError('Unknown parallel sort method: {!r}'.format(method))
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = min(workers, len(items) // max(min_chunk_size, 1))
+    if workers <= 1:
+        sort(items)
+        return
+    typecode = shared_typecode(items)
+    if method == 'merge':
+        _parallel_merge_sort(items, workers, sort, typecode)
+    else:
+        _parallel_sample_sort(items, workers, sort, typecode)
+
+
+def shared_typecode(items):
+    """Return the array typecode of a shared memory array that can hold all
+    given items ('q' for 64-bit integers or 'd' for floats), or None."""
+    kinds = set(map(type, items))
+    if kinds == {int} and INT64_MIN <= min(items) and max(items) <= INT64_MAX:
+        return 'q'
+    if kinds == {float}:
+        return 'd'
+    return None
+
+
+def chunk_bounds(count, chunks):
+    """Return a list of (start, end) index ranges that split `count` items
+    into the given number of chunks of nearly equal size."""
+    size, extra = divmod(count, chunks)
+    bounds = []
+    start = 0
+    for chunk in range(chunks):
+        end = start + size + (1 if chunk < extra else 0)
+        bounds.append((start, end))
+        start = end
+    return bounds
+
+
+def _sort_shared_range(name, typecode, start, end, sort):
+    """Sort items in range `[start...end-1]` of the shared memory array with
+    the given name and typecode in place with the given sorting function.
+    This runs in a worker process."""
+    shared = SharedMemory(name=name)
+    view = shared.buf.cast(typecode)
+    try:
+        chunk = view[start:end].tolist()
+        sort(chunk)
+        view[start:end] = array(typecode, chunk)
+    finally:
+        view.release()
+        shared.close()
+
+
+def _sort_piped_chunk(connection, sort):
+    """Receive a chunk of items from the given pipe connection, sort it with
+    the given sorting function and send it back. This runs in a worker
+    process."""
+    chunk = connection.recv()
+    sort(chunk)
+    connection.send(chunk)
+    connection.close()
+
+
+def _run_workers(processes):
+    """Start the given worker processes, wait for all of them to finish, and
+    raise RuntimeError if any of them failed."""
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    failed = [process.exitcode for process in processes if process.exitcode]
+    if failed:
+        raise RuntimeError('Sorting worker processes failed with exit codes '
+                           '{}'.format(failed))
+
+
+def _sort_ranges(items, bounds, sort, typecode):
+    """Sort each range of the given items (in place) in its own worker
+    process and return a list of the sorted ranges' items. If a typecode is
+    given, items are placed in a shared memory array and the sorted ranges
+    are memoryviews of it, which the caller must release with the returned
+    cleanup function, otherwise ranges are pickled to and from workers."""
+    context = multiprocessing.get_context()
+    if typecode is not None:
+        shared = SharedMemory(create=True, size=max(1, 8 * len(items)))
+        view = shared.buf.cast(typecode)
+        view[:len(items)] = array(typecode, items)
+        try:
+            _run_workers([context.Process(
+                target=_sort_shared_range,
+                args=(shared.name, typecode, start, end, sort))
+                for start, end in bounds])
+        except Exception:
+            view.release()
+            shared.close()
+            shared.unlink()
+            raise
+        ranges = [view[start:end] for start, end in bounds]
+
+        def cleanup():
+            for sorted_range in ranges:
+                sorted_range.release()
+            view.release()
+            shared.close()
+            shared.unlink()
+        return ranges, cleanup
+    connections = []
+    processes = []
+    for start, end in bounds:
+        parent_end, child_end = context.Pipe()
+        process = context.Process(target=_sort_piped_chunk,
+                                  args=(child_end, sort))
+        process.start()
+        # Close this process's copy of the child's end so that receiving
+        # from a worker that died raises EOFError instead of blocking
+        child_end.close()
+        connections.append(parent_end)
+        processes.append(process)
+    try:
+        for connection, (start, end) in zip(connections, bounds):
+            connection.send(items[start:end])
+        ranges = [connection.recv() for connection in connections]
+    except (EOFError, OSError):
+        raise RuntimeError('Sorting worker process failed')
+    finally:
+        for connection in connections:
+            connection.close()
+        for process in processes:
+            process.join()
+    return ranges, lambda: None
+
+
+def _parallel_merge_sort(items, workers, sort, typecode):
+    """Sort given items in place by sorting equal chunks in parallel worker
+    processes and combining sorted chunks with a k-way heap merge."""
+    bounds = chunk_bounds(len(items), workers)
+    ranges, cleanup = _sort_ranges(items, bounds, sort, typecode)
+    try:
+        # Merge sorted ranges back into the given list, holding only one
+        # item from each range in the heap at a time
+        for index, item in enumerate(heapq.merge(*ranges)):
+            items[index] = item
+    finally:
+        cleanup()
+
+
+def _parallel_sample_sort(items, workers, sort, typecode, oversampling=32):
+    """Sort given items in place by choosing `workers - 1` splitters from a
+    sorted random sample of items, partitioning items into buckets between
+    splitters, and sorting buckets in parallel worker processes. Taking
+    `oversampling` sample items per bucket keeps bucket sizes close to equal
+    for any distribution except when many items are equal to a splitter."""
+    count = len(items)
+    sample = random.sample(items, min(count, workers * oversampling))
+    sample.sort()
+    splitters = [sample[len(sample) * bucket // workers]
+                 for bucket in range(1, workers)]
+    # Count items in each bucket and convert counts to bucket boundaries
+    buckets = [bisect_right(splitters, item) for item in items]
+    counts = [0] * workers
+    for bucket in buckets:
+        counts[bucket] += 1
+    bounds = []
+    start = 0
+    for size in counts:
+        bounds.append((start, start + size))
+        start += size
+    # Place items into their buckets in a copy of the list
+    partitioned = [None] * count
+    positions = [start for start, end in bounds]
+    for item, bucket in zip(items, buckets):
+        partitioned[positions[bucket]] = item
+        positions[bucket] += 1
+    del buckets, positions
+    ranges, cleanup = _sort_ranges(partitioned, bounds, sort, typecode)
+    try:
+        # Sorted buckets are already in order, so concatenate them
+        index = 0
+        for sorted_range in ranges:
+            items[index:index + len(sorted_range)] = \
+                sorted_range.tolist() if typecode else sorted_range
+            index += len(sorted_range)
+    finally:
+        cleanup()
+
+
+def benchmark_parallel_sort(num_items=1000000, max_workers=None):
+    """Print the time taken to sort random integers with parallel merge sort
+    and parallel sample sort using 1, 2, 4, ... worker processes."""
+    import time
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    items = random_ints(num_items, 1, num_items)
+    print('Sorting {} random integers:'.format(num_items))
+    workers = 1
+    while workers <= max_workers:
+        for method in ['merge', 'sample']:
+            copy = list(items)
+            start = time.perf_counter()
+            parallel_sort(copy, workers, method)
+            seconds = time.perf_counter() - start
+            assert is_sorted(copy)
+            print('    {:<8} {:>3} workers  {:.3f} s'.format(
+                method, workers, seconds))
+        workers *= 2
+
+
+def main():
+    """Read command-line arguments and benchmark parallel sorting."""
+    import sys
+    args = sys.argv[1:]  # Ignore script file name
+    try:
+        num_items = int(args[0]) if len(args) >= 1 else 1000000
+        max_workers = int(args[1]) if len(args) >= 2 else None
+    except ValueError:
+        print('Usage: {} [num_items] [max_workers]'.format(sys.argv[0]))
+        return
+    benchmark_parallel_sort(num_items, max_workers)
+
+
+if __name__ == '__main__':
+    main()
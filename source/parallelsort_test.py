@@ -0,0 +1,75 @@
+#!python
+
+from parallelsort import parallel_sort
+from sorting import is_sorted, merge_sort, random_ints
+import random
+import unittest
+
+
+class ParallelSortTest(unittest.TestCase):
+
+    def test_parallel_sort_on_small_lists_sorts_in_this_process(self):
+        items = [3, 1, 2]
+        parallel_sort(items, workers=4)
+        assert items == [1, 2, 3]
+        items = []
+        parallel_sort(items, workers=4)
+        assert items == []
+
+    def test_parallel_merge_sort_on_integers(self):
+        for workers in range(2, 6):
+            items = random_ints(1000, -500, 500)
+            expected = sorted(items)
+            parallel_sort(items, workers, 'merge', min_chunk_size=1)
+            assert items == expected
+
+    def test_parallel_sample_sort_on_integers(self):
+        for workers in range(2, 6):
+            items = random_ints(1000, -500, 500)
+            expected = sorted(items)
+            parallel_sort(items, workers, 'sample', min_chunk_size=1)
+            assert items == expected
+
+    def test_parallel_sort_on_floats(self):
+        for method in ['merge', 'sample']:
+            items = [random.uniform(-1, 1) for _ in range(500)]
+            expected = sorted(items)
+            parallel_sort(items, 3, method, min_chunk_size=1)
+            assert items == expected
+
+    def test_parallel_sort_on_integers_too_large_to_share(self):
+        for method in ['merge', 'sample']:
+            items = [random.randrange(2 ** 70) for _ in range(300)]
+            expected = sorted(items)
+            parallel_sort(items, 3, method, min_chunk_size=1)
+            assert items == expected
+
+    def test_parallel_sort_on_strings(self):
+        for method in ['merge', 'sample']:
+            items = [str(number) for number in random_ints(300, 0, 1000)]
+            expected = sorted(items)
+            parallel_sort(items, 3, method, merge_sort, min_chunk_size=1)
+            assert items == expected
+
+    def test_parallel_sample_sort_with_many_duplicates(self):
+        items = [7] * 400 + random_ints(100, 1, 10)
+        expected = sorted(items)
+        parallel_sort(items, 4, 'sample', min_chunk_size=1)
+        assert items == expected
+
+    def test_parallel_sort_on_sorted_and_reversed_lists(self):
+        for method in ['merge', 'sample']:
+            items = list(range(400))
+            parallel_sort(items, 4, method, min_chunk_size=1)
+            assert is_sorted(items)
+            items.reverse()
+            parallel_sort(items, 4, method, min_chunk_size=1)
+            assert items == list(range(400))
+
+    def test_parallel_sort_with_unknown_method(self):
+        with self.assertRaises(ValueError):
+            parallel_sort([2, 1], 2, 'bogus')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,28 @@
 #!python
 
+from array import array
+import re
+import struct
+
+# NumPy is optional: linear search scans NumPy arrays with vectorized
+# comparisons, and search indexes can store items in NumPy arrays and look up
+# batches of queries with vectorized operations if it is installed
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Number of NumPy array values compared with an item at once by linear search
+SCAN_CHUNK_SIZE = 1 << 16
+# Struct format codes of buffer values that linear search scans natively
+_SCAN_FORMATS = 'bBhHiIlLqQnNefd?c'
+
+
+def _is_numpy_array(items):
+    """Return True if given items are a NumPy array (if NumPy is installed)."""
+    return numpy is not None and isinstance(items, numpy.ndarray)
+
+
 def linear_search(array, item):
     """return the first index of item in array or None if item is not found"""
     # implement linear_search_iterative and linear_search_recursive below, then
@@ -9,6 +32,11 @@ def linear_search(array, item):
 
 
 def linear_search_iterative(array, item):
+    # scan NumPy arrays and buffers of numbers (such as array.array,
+    # memoryview, bytearray or mmap) with native code instead of a loop
+    matches = _scan(array, item)
+    if matches is not None:
+        return next(matches, None)
     # loop over all array values until item is found
     for index, value in enumerate(array):
         if item == value:
@@ -16,11 +44,109 @@ def linear_search_iterative(array, item):
     return None  # not found
 
 
+def find_all(array, item):
+    """return a list of the index of every value in array equal to item;
+    NumPy arrays and buffers of numbers (such as array.array, memoryview,
+    bytearray or mmap) are scanned with native code instead of a loop
+    running time: O(n) comparisons for n values"""
+    matches = _scan(array, item)
+    if matches is not None:
+        return list(matches)
+    return [index for index, value in enumerate(array) if value == item]
+
+
+def _scan(array, item):
+    """return an iterator over the index of each value equal to item in the
+    given NumPy array or one-dimensional buffer of numbers, which scans it in
+    native code, or None if array is neither, so it must be looped over"""
+    if _is_numpy_array(array):
+        return _scan_numpy(array.reshape(-1), item)
+    if isinstance(array, (list, tuple, str)):
+        return None  # common sequences that are not buffers
+    try:
+        view = memoryview(array)
+    except TypeError:
+        return None  # not a buffer
+    patterns = _item_patterns(view.format, item) if view.ndim == 1 else None
+    if patterns is None:
+        view.release()
+        return None
+    return _scan_buffer(view, patterns)
+
+
+def _scan_numpy(values, item):
+    """yield the index of each value in given NumPy array equal to item,
+    comparing one chunk at a time so a search can stop at the first match
+    without comparing every value"""
+    for start in range(0, len(values), SCAN_CHUNK_SIZE):
+        chunk = values[start:start + SCAN_CHUNK_SIZE]
+        for index in numpy.flatnonzero(chunk == item):
+            yield start + int(index)
+
+
+def _item_patterns(format, item):
+    """return a list of the byte strings that item is stored as in a buffer
+    of values of the given struct format (two for zero, which can be stored
+    as 0.0 or -0.0, and none if no value can be equal to item), or None if
+    values of that format cannot be compared with item by their bytes"""
+    code = format.lstrip('@=<>!')
+    if len(code) != 1 or code not in _SCAN_FORMATS:
+        return None
+    if isinstance(item, float) and code not in 'efd?':
+        if not item.is_integer():
+            return []  # integers cannot equal a fraction (or inf or NaN)
+        item = int(item)
+    try:
+        packed = struct.pack(format, item)
+    except struct.error:
+        if isinstance(item, int) and code not in 'c?':
+            return []  # integer is out of this format's range
+        return None
+    # item must survive packing unchanged, unlike NaN or a float that is
+    # rounded to fit in fewer bits
+    value = struct.unpack(format, packed)[0]
+    if value != item:
+        return []
+    if code in 'efd' and value == 0:
+        return [packed, struct.pack(format, -value)]
+    return [packed]
+
+
+def _scan_buffer(view, patterns):
+    """yield the index of each value in given one-dimensional memoryview that
+    is stored as one of the given byte strings, searching its bytes with a
+    native regular expression scan that does not copy contiguous buffers"""
+    itemsize = view.itemsize
+    data = view.cast('B') if view.c_contiguous else view.tobytes()
+    try:
+        if not patterns:
+            return
+        regex = re.compile(b'|'.join(map(re.escape, patterns)))
+        position = 0
+        while True:
+            match = regex.search(data, position)
+            if match is None:
+                return
+            start = match.start()
+            if start % itemsize == 0:
+                yield start // itemsize
+            # continue from the start of the next value, skipping matches
+            # that straddle two values
+            position = (start // itemsize + 1) * itemsize
+    finally:
+        if isinstance(data, memoryview):
+            data.release()
+        view.release()
+
+
 def linear_search_recursive(array, item, index=0):
-    # TODO: implement linear search recursively here
-    pass
-    # once implemented, change linear_search to call linear_search_recursive
-    # to verify that your recursive implementation passes all tests
+    # check if we have looked at every value (base case)
+    if index >= len(array):
+        return None  # not found
+    if array[index] == item:
+        return index  # found
+    # look for item in the rest of the array
+    return linear_search_recursive(array, item, index + 1)
 
 
 def binary_search(array, item):
@@ -31,15 +157,356 @@ def binary_search(array, item):
     # return binary_search_recursive(array, item)
 
 
-def binary_search_iterative(array, item):
-    # TODO: implement binary search iteratively here
-    pass
-    # once implemented, change binary_search to call binary_search_iterative
-    # to verify that your iterative implementation passes all tests
+def bisect_left(array, item, lo=0, hi=None, key=None):
+    """return the first index in sorted array[lo:hi] where item could be
+    inserted to keep it sorted, which is before any values equal to item;
+    if key is given, item is compared with key(value) for each value
+    running time: O(log n) comparisons for n = hi - lo values"""
+    if lo < 0:
+        raise ValueError('lo must be non-negative')
+    if hi is None:
+        hi = len(array)
+    # narrow range [lo...hi] until it holds one index, comparing item with
+    # its middle value (repeating the loop without key saves a call each)
+    if key is None:
+        while lo < hi:
+            middle = (lo + hi) // 2
+            if array[middle] < item:
+                lo = middle + 1
+            else:
+                hi = middle
+    else:
+        while lo < hi:
+            middle = (lo + hi) // 2
+            if key(array[middle]) < item:
+                lo = middle + 1
+            else:
+                hi = middle
+    return lo
+
+
+def bisect_right(array, item, lo=0, hi=None, key=None):
+    """return the last index in sorted array[lo:hi] where item could be
+    inserted to keep it sorted, which is after any values equal to item;
+    if key is given, item is compared with key(value) for each value
+    running time: O(log n) comparisons for n = hi - lo values"""
+    if lo < 0:
+        raise ValueError('lo must be non-negative')
+    if hi is None:
+        hi = len(array)
+    if key is None:
+        while lo < hi:
+            middle = (lo + hi) // 2
+            if item < array[middle]:
+                hi = middle
+            else:
+                lo = middle + 1
+    else:
+        while lo < hi:
+            middle = (lo + hi) // 2
+            if item < key(array[middle]):
+                hi = middle
+            else:
+                lo = middle + 1
+    return lo
+
+
+def binary_search_iterative(array, item, lo=0, hi=None, key=None):
+    """return the first index of item in sorted array[lo:hi] or None if item
+    is not found; if key is given, find the first value whose key(value) is
+    equal to item
+    running time: O(log n) comparisons for n = hi - lo values"""
+    if hi is None:
+        hi = len(array)
+    index = bisect_left(array, item, lo, hi, key)
+    if index < hi:
+        value = array[index] if key is None else key(array[index])
+        if value == item:
+            return index  # found
+    return None  # not found
 
 
 def binary_search_recursive(array, item, left=None, right=None):
-    # TODO: implement binary search recursively here
-    pass
-    # once implemented, change binary_search to call binary_search_recursive
-    # to verify that your recursive implementation passes all tests
+    """return an index of item in sorted array[left...right] (inclusive) or
+    None if item is not found
+    running time: O(log n) comparisons and recursive calls"""
+    if left is None:
+        left = 0
+    if right is None:
+        right = len(array) - 1
+    # check if range is empty (base case)
+    if left > right:
+        return None  # not found
+    middle = (left + right) // 2
+    if array[middle] < item:
+        # item can only be in right half
+        return binary_search_recursive(array, item, middle + 1, right)
+    if item < array[middle]:
+        # item can only be in left half
+        return binary_search_recursive(array, item, left, middle - 1)
+    return middle  # found
+
+
+def interpolation_search(array, item, lo=0, hi=None):
+    """return an index of item in sorted array[lo:hi] of numbers or None if
+    item is not found, by probing where item would be if values were evenly
+    spread between the lowest and highest value in the range; if a probe
+    does not halve the range, the next probe is its middle (like binary
+    search), so uneven values cannot make it much slower than binary search
+    running time: O(log log n) probes for n uniformly distributed numbers,
+    O(log n) probes in the worst case"""
+    if hi is None:
+        hi = len(array)
+    hi -= 1  # search inclusive range [lo...hi]
+    interpolate = True
+    while lo <= hi and array[lo] <= item <= array[hi]:
+        low_value = array[lo]
+        high_value = array[hi]
+        if low_value == high_value:
+            return lo  # all values in range are equal to item
+        size = hi - lo
+        if interpolate:
+            # probe where item would be if values were evenly spread
+            probe = lo + int((item - low_value) * size //
+                             (high_value - low_value))
+        else:
+            probe = (lo + hi) // 2
+        value = array[probe]
+        if value < item:
+            lo = probe + 1
+        elif item < value:
+            hi = probe - 1
+        else:
+            return probe  # found
+        # bisect next time if this probe did not halve the range
+        interpolate = hi - lo <= size // 2
+    return None  # not found
+
+
+# marker for values past the end of a sequence of unknown length
+_END = object()
+
+
+def _value_at(array, index, key):
+    """return key(array[index]) (or array[index] if key is None) or _END if
+    index is past the end of array"""
+    try:
+        value = array[index]
+    except IndexError:
+        return _END
+    return value if key is None else key(value)
+
+
+def exponential_search(array, item, lo=0, key=None):
+    """return the first index of item in sorted array[lo:] or None if item is
+    not found, by checking indexes lo, lo+1, lo+3, lo+7, ... until one is
+    past item (galloping), then binary searching between the last two; the
+    length of array is never used, so it works on sequences of unknown or
+    unbounded length that raise IndexError past their end; if key is given,
+    find the first value whose key(value) is equal to item
+    running time: O(log i) comparisons if item is at index lo + i"""
+    # gallop until a value is not less than item or is past the end
+    bound = 1
+    while True:
+        value = _value_at(array, lo + bound - 1, key)
+        if value is _END or not value < item:
+            break
+        bound *= 2
+    # item is in range [lo + bound/2...lo + bound - 1] if it is in array
+    left = lo + bound // 2
+    right = lo + bound - 1
+    while left < right:
+        middle = (left + right) // 2
+        value = _value_at(array, middle, key)
+        if value is not _END and value < item:
+            left = middle + 1
+        else:
+            right = middle
+    value = _value_at(array, left, key)
+    if value is not _END and value == item:
+        return left  # found
+    return None  # not found
+
+
+def _gallop_left(array, item, lo, hi, key):
+    """return bisect_left(array, item, lo, hi, key) by galloping from lo, so
+    it takes O(log i) comparisons if the result is lo + i"""
+    bound = 1
+    while lo + bound - 1 < hi:
+        value = array[lo + bound - 1]
+        if key is not None:
+            value = key(value)
+        if not value < item:
+            break
+        bound *= 2
+    return bisect_left(array, item, lo + bound // 2,
+                       min(lo + bound - 1, hi), key)
+
+
+def search_many(sorted_array, queries, key=None):
+    """return a list of the first index of each query in sorted array (or
+    None if a query is not found) in the same order as queries; queries are
+    looked up in sorted order, so each search gallops forward from where the
+    previous one ended instead of searching the whole array again; if key is
+    given, find values whose key(value) is equal to each query
+    running time: O(m log m + m log(n/m)) comparisons for m queries and n
+    values, which is O(n) to look up every value of a sorted array"""
+    queries = list(queries)
+    results = [None] * len(queries)
+    count = len(sorted_array)
+    position = 0
+    for index in sorted(range(len(queries)), key=queries.__getitem__):
+        query = queries[index]
+        position = _gallop_left(sorted_array, query, position, count, key)
+        if position < count:
+            value = sorted_array[position]
+            if key is not None:
+                value = key(value)
+            if value == query:
+                results[index] = position
+    return results
+
+
+class EytzingerIndex(object):
+    """Read-only search index over sorted items stored in Eytzinger order:
+    the order of a breadth-first traversal of a complete binary search tree,
+    with the root at index 1 and the children of index k at 2k and 2k+1.
+    The first levels of the tree visited by every lookup sit together at the
+    front of the layout, and the descendants of index k at each depth are
+    contiguous, so lookups touch far fewer cache lines than binary search
+    over a large sorted array. Each lookup step moves to a child with no
+    branch: k = 2k + (layout[k] < item)."""
+
+    def __init__(self, sorted_items, typecode=None, use_numpy=False):
+        """Initialize this index with the given sorted items, stored in a
+        list, or in an array with the given typecode (such as 'q' or 'd'),
+        or in a NumPy array if use_numpy is True (with a dtype of the given
+        typecode, if any). Raise ValueError if items are not sorted.
+        Running time: O(n) to check order and lay out n items.
+        Memory usage: O(n) for the layout and the sorted index of each item
+        in it."""
+        sorted_items = list(sorted_items)
+        count = len(sorted_items)
+        for index in range(1, count):
+            if sorted_items[index] < sorted_items[index - 1]:
+                raise ValueError('Items are not sorted at index {}'
+                                 .format(index))
+        if use_numpy and numpy is None:
+            raise ValueError('NumPy is not installed')
+        # Find the sorted index of the item at each layout index by visiting
+        # layout indexes in order (an in-order traversal of the implicit
+        # tree), with the item count at unused index 0 so a lookup that
+        # finds no item at least as large returns the count
+        ranks = [count] * (count + 1)
+        rank = 0
+        stack = []
+        node = 1
+        while stack or node <= count:
+            # Descend to the leftmost node not yet visited
+            while node <= count:
+                stack.append(node)
+                node *= 2
+            node = stack.pop()
+            ranks[node] = rank
+            rank += 1
+            # Visit the right subtree of this node next
+            node = 2 * node + 1
+        # Store items in layout order, repeating the first (or a zero) at
+        # unused index 0 so typed arrays can hold every slot
+        layout = [sorted_items[0] if count else 0]
+        layout.extend(sorted_items[ranks[node]]
+                      for node in range(1, count + 1))
+        if use_numpy:
+            self.layout = numpy.array(layout, dtype=typecode)
+            self.ranks = numpy.array(ranks, dtype=numpy.int64)
+        elif typecode is not None:
+            self.layout = array(typecode, layout)
+            self.ranks = array('q', ranks)
+        else:
+            self.layout = layout
+            self.ranks = ranks
+        # Single lookups read NumPy arrays through memoryviews, which return
+        # Python numbers instead of slower NumPy scalars
+        self._layout_view = self.layout
+        self._ranks_view = self.ranks
+        if use_numpy:
+            self._ranks_view = memoryview(self.ranks)
+            if self.layout.dtype.kind in 'iuf':
+                self._layout_view = memoryview(self.layout)
+            else:
+                self._layout_view = self.layout.tolist()
+        self.count = count
+
+    def __repr__(self):
+        """Return a string representation of this search index."""
+        return 'EytzingerIndex({} items)'.format(self.count)
+
+    def __len__(self):
+        """Return the number of items in this search index."""
+        return self.count
+
+    def __contains__(self, item):
+        """Return True if this search index contains the given item.
+        Running time: O(log n) comparisons."""
+        node = self._lower_bound_node(item)
+        return node != 0 and self._layout_view[node] == item
+
+    def _lower_bound_node(self, item):
+        """Return the layout index of the first item not less than the given
+        item, or 0 if every item is less than the given item."""
+        layout = self._layout_view
+        count = self.count
+        node = 1
+        # Descend to a child below the leaves, going right past each item
+        # less than the given item
+        while node <= count:
+            node = 2 * node + (layout[node] < item)
+        # The last item passed on the left is the answer: undo the trailing
+        # right moves (one bits) and the left move (zero bit) before them
+        return node >> ((~node & (node + 1)).bit_length())
+
+    def lower_bound(self, item):
+        """Return the first sorted index where the given item could be
+        inserted to keep items sorted, before any items equal to it, like
+        bisect_left. Running time: O(log n) comparisons."""
+        return self._ranks_view[self._lower_bound_node(item)]
+
+    def upper_bound(self, item):
+        """Return the last sorted index where the given item could be
+        inserted to keep items sorted, after any items equal to it, like
+        bisect_right. Running time: O(log n) comparisons."""
+        layout = self._layout_view
+        count = self.count
+        node = 1
+        while node <= count:
+            node = 2 * node + (layout[node] <= item)
+        return self._ranks_view[node >> ((~node & (node + 1)).bit_length())]
+
+    def search(self, item):
+        """Return the first sorted index of the given item or None if it is
+        not found. Running time: O(log n) comparisons."""
+        node = self._lower_bound_node(item)
+        if node != 0 and self._layout_view[node] == item:
+            return self._ranks_view[node]  # found
+        return None  # not found
+
+    def lower_bounds(self, queries):
+        """Return the lower bound of each of the given queries. If this index
+        is stored in a NumPy array, all queries descend one tree level at a
+        time with vectorized operations and a NumPy array is returned,
+        otherwise a list is returned.
+        Running time: O(m log n) comparisons for m queries."""
+        if not _is_numpy_array(self.layout):
+            return [self.lower_bound(query) for query in queries]
+        queries = numpy.asarray(queries)
+        nodes = numpy.ones(len(queries), dtype=numpy.int64)
+        for _ in range(self.count.bit_length()):
+            # Queries that are already below the leaves stay where they are
+            active = nodes <= self.count
+            less = self.layout[numpy.where(active, nodes, 0)] < queries
+            nodes = numpy.where(active, 2 * nodes + less, nodes)
+        # Shift off trailing one bits and the zero bit before them; the
+        # lowest zero bit of each node is a power of two below 2^63
+        lowest_zero = ~nodes & (nodes + 1)
+        shifts = numpy.log2(lowest_zero).astype(numpy.int64) + 1
+        return self.ranks[nodes >> shifts]
@@ -1,7 +1,18 @@
 #!python
 
-from search import linear_search, binary_search
+from search import linear_search, linear_search_recursive, find_all, \
+    binary_search, binary_search_iterative, binary_search_recursive, \
+    bisect_left, bisect_right, interpolation_search, exponential_search, \
+    search_many, EytzingerIndex
+from array import array
+import bisect
+import mmap
+import random
 import unittest
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
 
 class SearchTest(unittest.TestCase):
@@ -43,6 +54,293 @@ class SearchTest(unittest.TestCase):
         assert binary_search(names, 'Jeremy') is None
         assert binary_search(names, 'nobody') is None
 
+    def test_linear_search_recursive(self):
+        names = ['Winnie', 'Kojin', 'Brian', 'Nabil', 'Julia', 'Alex', 'Nick']
+        for index, name in enumerate(names):
+            assert linear_search_recursive(names, name) == index
+        assert linear_search_recursive(names, 'Jeremy') is None
+        assert linear_search_recursive([], 'Jeremy') is None
+
+    def test_binary_search_recursive(self):
+        names = ['Alex', 'Brian', 'Julia', 'Kojin', 'Nabil', 'Nick', 'Winnie']
+        for index, name in enumerate(names):
+            assert binary_search_recursive(names, name) == index
+        assert binary_search_recursive(names, 'Jeremy') is None
+        assert binary_search_recursive(names, 'nobody') is None
+        assert binary_search_recursive([], 'nobody') is None
+
+    def test_bisect_matches_standard_library(self):
+        # bisect functions should agree with the bisect module, including
+        # for items that are missing, duplicated or outside the range
+        rand = random.Random(0)
+        for count in range(20):
+            array = sorted(rand.randint(0, 10) for _ in range(count))
+            for item in range(-1, 12):
+                assert bisect_left(array, item) == \
+                    bisect.bisect_left(array, item)
+                assert bisect_right(array, item) == \
+                    bisect.bisect_right(array, item)
+                lo, hi = count // 4, count - count // 4
+                assert bisect_left(array, item, lo, hi) == \
+                    bisect.bisect_left(array, item, lo, hi)
+                assert bisect_right(array, item, lo, hi) == \
+                    bisect.bisect_right(array, item, lo, hi)
+        with self.assertRaises(ValueError):
+            bisect_left([1, 2, 3], 2, -1)
+
+    def test_bisect_and_binary_search_with_key(self):
+        # key applies to array values but not to the item searched for
+        people = [('Alex', 19), ('Brian', 22), ('Julia', 22), ('Nick', 30)]
+
+        def age(person):
+            return person[1]
+        assert bisect_left(people, 22, key=age) == 1
+        assert bisect_right(people, 22, key=age) == 3
+        assert binary_search_iterative(people, 22, key=age) == 1
+        assert binary_search_iterative(people, 30, key=age) == 3
+        assert binary_search_iterative(people, 25, key=age) is None
+
+    def test_binary_search_iterative_finds_first_duplicate_in_range(self):
+        array = [1, 2, 2, 2, 3, 5, 5, 8]
+        assert binary_search_iterative(array, 2) == 1
+        assert binary_search_iterative(array, 5) == 5
+        assert binary_search_iterative(array, 2, lo=2) == 2
+        assert binary_search_iterative(array, 5, hi=5) is None
+        assert binary_search_iterative(array, 8, 0, 7) is None
+
+    def test_interpolation_search(self):
+        rand = random.Random(1)
+        array = sorted(rand.sample(range(100000), 1000))
+        for index, item in enumerate(array):
+            assert interpolation_search(array, item) == index
+        missing = set(range(-5, 100005)) - set(array)
+        for item in rand.sample(sorted(missing), 200):
+            assert interpolation_search(array, item) is None
+        # uneven and repeated values still find an index of item
+        array = [1, 1, 1, 2, 1000, 10 ** 9, 10 ** 9 + 1]
+        for item in array:
+            assert array[interpolation_search(array, item)] == item
+        assert interpolation_search(array, 3) is None
+        assert interpolation_search([0.5, 1.5, 2.25, 7.0], 2.25) == 2
+        assert interpolation_search([], 1) is None
+
+    def test_exponential_search(self):
+        array = [1, 3, 3, 4, 7, 9, 12, 15, 20]
+        for item in range(0, 22):
+            expected = array.index(item) if item in array else None
+            assert exponential_search(array, item) == expected
+        assert exponential_search(array, 3, lo=2) == 2
+        assert exponential_search(array, 1, lo=1) is None
+        assert exponential_search([], 1) is None
+
+    def test_exponential_search_on_sequence_of_unknown_length(self):
+        class Squares(object):
+            """Sorted sequence of squares that only supports indexing."""
+            def __init__(self, count):
+                self.count = count
+
+            def __getitem__(self, index):
+                if index >= self.count:
+                    raise IndexError(index)
+                return index * index
+
+        squares = Squares(1000)
+        assert exponential_search(squares, 0) == 0
+        assert exponential_search(squares, 144) == 12
+        assert exponential_search(squares, 999 * 999) == 999
+        assert exponential_search(squares, 145) is None
+        assert exponential_search(squares, 1000 * 1000) is None
+        people = [('Alex', 19), ('Brian', 22), ('Nick', 30)]
+        assert exponential_search(people, 30, key=lambda p: p[1]) == 2
+
+    def test_search_many(self):
+        rand = random.Random(2)
+        array = sorted(rand.randint(0, 500) for _ in range(300))
+        queries = [rand.randint(-10, 510) for _ in range(400)]
+        expected = [binary_search_iterative(array, query)
+                    for query in queries]
+        assert search_many(array, queries) == expected
+        assert search_many(array, iter(queries)) == expected
+        assert search_many(array, []) == []
+        assert search_many([], [1, 2]) == [None, None]
+        people = [('Alex', 19), ('Brian', 22), ('Julia', 22), ('Nick', 30)]
+        assert search_many(people, [30, 22, 20],
+                           key=lambda p: p[1]) == [3, 1, None]
+
+
+def assert_matches_bisect(index, items, queries):
+    assert len(index) == len(items)
+    for query in queries:
+        assert index.lower_bound(query) == bisect.bisect_left(items, query)
+        assert index.upper_bound(query) == \
+            bisect.bisect_right(items, query)
+        assert (query in index) == (query in items)
+        expected = items.index(query) if query in items else None
+        assert index.search(query) == expected
+
+
+class EytzingerIndexTest(unittest.TestCase):
+
+    def test_layout_is_breadth_first_order(self):
+        index = EytzingerIndex([1, 2, 3, 4, 5, 6, 7])
+        # root is the middle item, then each level from left to right
+        assert index.layout[1:] == [4, 2, 6, 1, 3, 5, 7]
+        assert index.ranks[1:] == [3, 1, 5, 0, 2, 4, 6]
+
+    def test_lookups_match_bisect_for_every_size(self):
+        rand = random.Random(0)
+        for count in range(40):
+            items = sorted(rand.randint(0, 30) for _ in range(count))
+            index = EytzingerIndex(items)
+            assert_matches_bisect(index, items, range(-1, 32))
+
+    def test_lookups_with_strings(self):
+        names = ['Alex', 'Brian', 'Julia', 'Kojin', 'Nabil', 'Nick', 'Winnie']
+        index = EytzingerIndex(names)
+        assert_matches_bisect(index, names, names + ['Jeremy', 'Zed'])
+
+    def test_lookups_with_typed_array(self):
+        rand = random.Random(1)
+        items = sorted(rand.randint(-1000, 1000) for _ in range(500))
+        index = EytzingerIndex(items, 'q')
+        assert index.layout.typecode == 'q'
+        assert_matches_bisect(index, items, range(-1002, 1002, 7))
+        floats = [0.5, 1.25, 1.25, 3.0]
+        index = EytzingerIndex(floats, 'd')
+        assert_matches_bisect(index, floats, [0.0, 1.25, 2.0, 3.0, 4.0])
+
+    def test_empty_index(self):
+        for typecode in [None, 'q']:
+            index = EytzingerIndex([], typecode)
+            assert len(index) == 0
+            assert 1 not in index
+            assert index.lower_bound(1) == 0
+            assert index.upper_bound(1) == 0
+            assert index.search(1) is None
+            assert index.lower_bounds([1, 2]) == [0, 0]
+
+    def test_unsorted_items_raise_error(self):
+        with self.assertRaises(ValueError):
+            EytzingerIndex([1, 3, 2])
+
+    def test_lower_bounds(self):
+        items = [2, 4, 4, 8, 16]
+        index = EytzingerIndex(items)
+        queries = [0, 4, 5, 16, 17]
+        assert index.lower_bounds(queries) == [0, 1, 3, 4, 5]
+
+
+@unittest.skipIf(numpy is None, 'NumPy is not installed')
+class EytzingerIndexNumPyTest(unittest.TestCase):
+
+    def test_lookups_with_numpy_array(self):
+        rand = random.Random(2)
+        for count in [0, 1, 2, 7, 8, 100, 1000]:
+            items = sorted(rand.randint(0, 2000) for _ in range(count))
+            index = EytzingerIndex(items, 'q', use_numpy=True)
+            assert isinstance(index.layout, numpy.ndarray)
+            assert_matches_bisect(index, items, range(-1, 2002, 13))
+            queries = numpy.array([rand.randint(-5, 2005)
+                                   for _ in range(300)])
+            expected = numpy.searchsorted(numpy.array(items, dtype=int),
+                                          queries, side='left')
+            assert numpy.array_equal(index.lower_bounds(queries), expected)
+
+    def test_lookups_with_numpy_float_array(self):
+        items = [0.5, 1.25, 1.25, 3.0]
+        index = EytzingerIndex(items, use_numpy=True)
+        assert_matches_bisect(index, items, [0.0, 1.25, 2.0, 3.0, 4.0])
+        bounds = index.lower_bounds(numpy.array([0.0, 1.25, 2.0, 4.0]))
+        assert bounds.tolist() == [0, 1, 3, 4]
+
+
+class BufferSearchTest(unittest.TestCase):
+
+    def test_find_all_with_list(self):
+        names = ['Alex', 'Brian', 'Alex', 'Julia', 'Alex']
+        assert find_all(names, 'Alex') == [0, 2, 4]
+        assert find_all(names, 'Julia') == [3]
+        assert find_all(names, 'Jeremy') == []
+        assert find_all([], 'Jeremy') == []
+
+    def test_search_int_array(self):
+        values = array('q', [5, -1, 0, 7, 256, 7, -2 ** 63])
+        assert linear_search(values, 7) == 3
+        assert find_all(values, 7) == [3, 5]
+        assert linear_search(values, -2 ** 63) == 6
+        # equal floats are found, fractions and huge numbers are not
+        assert linear_search(values, 256.0) == 4
+        assert linear_search(values, 7.5) is None
+        assert linear_search(values, 2 ** 70) is None
+        assert linear_search(values, 'Alex') is None
+        assert find_all(values, 1) == []
+
+    def test_search_skips_bytes_that_straddle_values(self):
+        # bytes of 256 and 1 in two values (little-endian 00 01 00 00 and
+        # 01 00 00 00) contain the bytes of 1 across their boundary
+        values = array('i', [256, 1, 3])
+        assert find_all(values, 1) == [1]
+        assert find_all(values, 65536) == []
+
+    def test_search_float_array(self):
+        values = array('d', [1.5, -0.0, float('nan'), 0.0, 3.0])
+        # negative zero is equal to zero, but NaN is never equal to itself
+        assert find_all(values, 0) == [1, 3]
+        assert find_all(values, -0.0) == [1, 3]
+        assert find_all(values, float('nan')) == []
+        assert linear_search(values, 3) == 4
+        assert linear_search(array('f', [0.1, 0.5]), 0.5) == 1
+
+    def test_search_byte_buffers(self):
+        data = bytearray(b'call-log')
+        assert linear_search(data, ord('l')) == 2
+        assert find_all(data, ord('l')) == [2, 3, 5]
+        assert find_all(b'call-log', ord('-')) == [4]
+        assert find_all(memoryview(b'abcb').cast('c'), b'b') == [1, 3]
+        with mmap.mmap(-1, 4096) as mapped:
+            mapped[100] = 7
+            mapped[4095] = 7
+            assert linear_search(mapped, 7) == 100
+            assert find_all(mapped, 7) == [100, 4095]
+            assert linear_search(mapped, 0) == 0
+
+    def test_search_memoryview_slices(self):
+        values = memoryview(array('i', range(10)))
+        assert find_all(values[::2], 4) == [2]
+        assert find_all(values[::2], 5) == []
+        assert linear_search(values[3:], 9) == 6
+
+    def test_search_results_match_loop(self):
+        rand = random.Random(3)
+        for typecode in 'bBhiIqQd':
+            values = array(typecode, [rand.randint(0, 100)
+                                      for _ in range(500)])
+            for item in [0, 1, 50, 100, 101, -1]:
+                expected = [index for index, value in enumerate(values)
+                            if value == item]
+                assert find_all(values, item) == expected
+                assert linear_search(values, item) == \
+                    (expected[0] if expected else None)
+
+
+@unittest.skipIf(numpy is None, 'NumPy is not installed')
+class NumPyBufferSearchTest(unittest.TestCase):
+
+    def test_search_numpy_array(self):
+        values = numpy.arange(200000) % 1000
+        assert linear_search(values, 999) == 999
+        assert find_all(values, 999)[:3] == [999, 1999, 2999]
+        assert len(find_all(values, 0)) == 200
+        assert linear_search(values, -1) is None
+        assert find_all(values, -1) == []
+
+    def test_search_numpy_array_views(self):
+        values = numpy.array([[1, 2], [2, 1]])
+        # indexes of multidimensional arrays are in flattened order
+        assert find_all(values, 2) == [1, 2]
+        assert linear_search(values[:, 1], 1) == 1
+        assert find_all(numpy.array([0.5, numpy.nan, 0.5]), 0.5) == [0, 2]
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -1,123 +1,1435 @@
 #!python
 
+from array import array
+from bisect import bisect_left, bisect_right
+import logging
+import math
 
-def is_sorted(items):
-    """Return a boolean indicating whether given items are in sorted order.
-    TODO: Running time: ??? Why and under what conditions?
-    TODO: Memory usage: ??? Why and under what conditions?"""
-    # TODO: Check that all adjacent items are in order, return early if not
+# NumPy is optional: counting, bucket and radix sorts and is_sorted use
+# vectorized operations on NumPy arrays if it is installed
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
+# Ranges this small are sorted with insertion sort by quick sort (introsort)
+INSERTION_SORT_CUTOFF = 16
+# Ranges this large choose quick sort pivots with the ninther method
+NINTHER_CUTOFF = 40
+# Consecutive wins by one run that switch tim sort merges to galloping mode
+MIN_GALLOP = 7
+# Number of items and adjacent pairs the sort dispatcher samples from input
+DISPATCH_SAMPLE_SIZE = 256
 
-def bubble_sort(items):
+# Logs which algorithm the sort dispatcher chooses and why (at DEBUG level)
+logger = logging.getLogger(__name__)
+
+# Every sorting function below accepts `key` and `reverse` arguments like
+# Python's sorted: items are ordered by key(item) instead of by themselves,
+# and in descending instead of ascending order if reverse is True. Keys are
+# computed exactly once per item. Each sorting function has a `stable`
+# attribute that is True if items with equal keys keep their original order
+# (also when reverse is True, like sorted). A sorting function that is not
+# stable but whose vectorized NumPy path is has a `numpy_stable` attribute.
+
+
+class _KeyedItem(object):
+    """Item decorated with its sort key, which compares only by key, so any
+    comparison sort orders decorated items by key with the same stability
+    it has on plain items, and items themselves are never compared."""
+    __slots__ = ('key', 'item')
+
+    def __init__(self, key, item):
+        self.key = key
+        self.item = item
+
+    def __lt__(self, other):
+        return self.key < other.key
+
+
+class _KeyedString(str):
+    """String sort key that carries the item it was computed from, so string
+    radix sorts can index its characters like any other string."""
+    __slots__ = ('item',)
+
+
+def _is_numpy_array(items):
+    """Return True if given items are a NumPy array (if NumPy is installed)."""
+    return numpy is not None and isinstance(items, numpy.ndarray)
+
+
+def _reverse(items):
+    """Reverse the order of given items (a list or NumPy array) in place."""
+    if _is_numpy_array(items):
+        items[:] = items[::-1]
+    else:
+        items.reverse()
+
+
+def _sort_reversed(sort, items, *args):
+    """Sort given items in place in descending order with the given sorting
+    function (called with extra args) by reversing items, sorting them in
+    ascending order and reversing them again. Items with equal keys end up
+    in their original order if the sorting function is stable."""
+    _reverse(items)
+    sort(items, *args)
+    _reverse(items)
+
+
+def _sort_decorated(sort, items, key, reverse, *args):
+    """Sort given items in place with the given comparison sorting function
+    (called with extra args) by key(item) if key is given, computing each key
+    once, and in descending order if reverse is True.
+    Memory usage: O(n) for the decorated items if key is given."""
+    if key is None:
+        _sort_reversed(sort, items, *args)
+        return
+    decorated = [_KeyedItem(key(item), item) for item in items]
+    if reverse:
+        _sort_reversed(sort, decorated, *args)
+    else:
+        sort(decorated, *args)
+    items[:] = [keyed.item for keyed in decorated]
+
+
+def is_sorted(items, key=None, reverse=False):
+    """Return a boolean indicating whether given items are in sorted order
+    (by key(item) if key is given, and in descending order if reverse is
+    True).
+    Running time: O(n) in the worst case if items are sorted because every
+    adjacent pair is compared, O(1) in the best case if the first pair is
+    out of order because we return early.
+    Memory usage: O(1) because only loop indexes are stored, or O(n) for a
+    list of keys if key is given or reverse is True."""
+    if key is None and _is_numpy_array(items):
+        # Compare all adjacent items at once
+        if reverse:
+            return not numpy.any(items[:-1] < items[1:])
+        return not numpy.any(items[1:] < items[:-1])
+    if key is not None:
+        items = list(map(key, items))
+    if reverse:
+        items = items[::-1]
+    # Check that all adjacent items are in order, return early if not
+    for index in range(len(items) - 1):
+        if items[index + 1] < items[index]:
+            return False
+    return True
+
+
+def bubble_sort(items, key=None, reverse=False):
     """Sort given items by swapping adjacent items that are out of order, and
     repeating until all items are in sorted order.
-    TODO: Running time: ??? Why and under what conditions?
-    TODO: Memory usage: ??? Why and under what conditions?"""
-    # TODO: Repeat until all items are in sorted order
-    # TODO: Swap adjacent items that are out of order
+    Running time: O(n^2) in the worst case if items are in reverse order
+    because each pass moves one item into place, O(n) in the best case if
+    items are already sorted because one pass makes no swaps.
+    Memory usage: O(1) because items are swapped in place."""
+    if key is not None or reverse:
+        _sort_decorated(bubble_sort, items, key, reverse)
+        return
+    # Repeat until all items are in sorted order
+    end = len(items) - 1
+    swapped = True
+    while swapped:
+        swapped = False
+        # Swap adjacent items that are out of order
+        for index in range(end):
+            if items[index + 1] < items[index]:
+                items[index], items[index + 1] = items[index + 1], items[index]
+                swapped = True
+        # Largest unsorted item has bubbled up to the end of the range
+        end -= 1
+
 
+bubble_sort.stable = True
 
-def selection_sort(items):
+
+def selection_sort(items, key=None, reverse=False):
     """Sort given items by finding minimum item, swapping it with first
     unsorted item, and repeating until all items are in sorted order.
-    TODO: Running time: ??? Why and under what conditions?
-    TODO: Memory usage: ??? Why and under what conditions?"""
-    # TODO: Repeat until all items are in sorted order
-    # TODO: Find minimum item in unsorted items
-    # TODO: Swap it with first unsorted item
+    Running time: O(n^2) in the best and worst case because every pass scans
+    all unsorted items to find the minimum item.
+    Memory usage: O(1) because items are swapped in place."""
+    if key is not None or reverse:
+        _sort_decorated(selection_sort, items, key, reverse)
+        return
+    # Repeat until all items are in sorted order
+    for start in range(len(items) - 1):
+        # Find minimum item in unsorted items
+        min_index = start
+        for index in range(start + 1, len(items)):
+            if items[index] < items[min_index]:
+                min_index = index
+        # Swap it with first unsorted item
+        items[start], items[min_index] = items[min_index], items[start]
+
+
+selection_sort.stable = False
 
 
-def insertion_sort(items):
+def insertion_sort(items, key=None, reverse=False):
     """Sort given items by taking first unsorted item, inserting it in sorted
     order in front of items, and repeating until all items are in order.
-    TODO: Running time: ??? Why and under what conditions?
-    TODO: Memory usage: ??? Why and under what conditions?"""
-    # TODO: Repeat until all items are in sorted order
-    # TODO: Take first unsorted item
-    # TODO: Insert it in sorted order in front of items
+    Running time: O(n^2) in the worst case if items are in reverse order
+    because each item is shifted past all sorted items, O(n) in the best
+    case if items are already sorted because no items are shifted.
+    Memory usage: O(1) because items are shifted in place."""
+    if key is not None or reverse:
+        _sort_decorated(insertion_sort, items, key, reverse)
+        return
+    _insertion_sort_range(items, 0, len(items) - 1)
+
+
+insertion_sort.stable = True
+
+
+def _insertion_sort_range(items, low, high):
+    """Sort given items in range `[low...high]` in place with insertion sort.
+    Running time: O(m^2) in the worst case for m = high - low + 1 items."""
+    # Repeat until all items are in sorted order
+    for index in range(low + 1, high + 1):
+        # Take first unsorted item
+        item = items[index]
+        # Insert it in sorted order in front of items by shifting larger items
+        position = index
+        while position > low and item < items[position - 1]:
+            items[position] = items[position - 1]
+            position -= 1
+        items[position] = item
 
 
 def merge(items1, items2):
     """Merge given lists of items, each assumed to already be in sorted order,
     and return a new list containing all items in sorted order.
-    TODO: Running time: ??? Why and under what conditions?
-    TODO: Memory usage: ??? Why and under what conditions?"""
-    # TODO: Repeat until one list is empty
-    # TODO: Find minimum item in both lists and append it to new list
-    # TODO: Append remaining items in non-empty list to new list
+    Running time: O(n1 + n2) because each item is appended once and each
+    comparison appends one item.
+    Memory usage: O(n1 + n2) for the new list."""
+    merged = []
+    index1 = index2 = 0
+    # Repeat until one list is empty
+    while index1 < len(items1) and index2 < len(items2):
+        # Find minimum item in both lists and append it to new list
+        # (taking from the first list when items are equal keeps it stable)
+        if items2[index2] < items1[index1]:
+            merged.append(items2[index2])
+            index2 += 1
+        else:
+            merged.append(items1[index1])
+            index1 += 1
+    # Append remaining items in non-empty list to new list
+    merged.extend(items1[index1:])
+    merged.extend(items2[index2:])
+    return merged
 
 
-def split_sort_merge(items):
+def split_sort_merge(items, key=None, reverse=False):
     """Sort given items by splitting list into two approximately equal halves,
     sorting each with an iterative sorting algorithm, and merging results into
     a list in sorted order.
-    TODO: Running time: ??? Why and under what conditions?
-    TODO: Memory usage: ??? Why and under what conditions?"""
-    # TODO: Split items list into approximately equal halves
-    # TODO: Sort each half using any other sorting algorithm
-    # TODO: Merge sorted halves into one list in sorted order
+    Running time: O(n^2) in the worst case because each half is sorted with
+    insertion sort, O(n) in the best case if items are already sorted.
+    Memory usage: O(n) for the scratch buffer used to merge the halves."""
+    if key is not None or reverse:
+        _sort_decorated(split_sort_merge, items, key, reverse)
+        return
+    # Split items list into approximately equal halves
+    middle = len(items) // 2
+    # Sort each half using any other sorting algorithm
+    _insertion_sort_range(items, 0, middle - 1)
+    _insertion_sort_range(items, middle, len(items) - 1)
+    # Merge sorted halves into one list in sorted order
+    buffer = [None] * (len(items) // 2)
+    _merge_ranges(items, buffer, 0, middle, len(items))
 
 
-def merge_sort(items):
-    """Sort given items by splitting list into two approximately equal halves,
-    sorting each recursively, and merging results into a list in sorted order.
-    TODO: Running time: ??? Why and under what conditions?
-    TODO: Memory usage: ??? Why and under what conditions?"""
-    # TODO: Check if list is so small it's already sorted (base case)
-    # TODO: Split items list into approximately equal halves
-    # TODO: Sort each half by recursively calling merge sort
-    # TODO: Merge sorted halves into one list in sorted order
+split_sort_merge.stable = True
 
 
-def partition(items, low, high):
+def merge_sort(items, bottom_up=False, key=None, reverse=False):
+    """Sort given items in place by splitting list into two approximately
+    equal halves, sorting each recursively, and merging results into a list
+    in sorted order. Halves are ranges of indexes in the given list, not new
+    lists, and every merge copies the smaller half into one scratch buffer
+    allocated up front, so sorting allocates no other lists. Ranges with at
+    most INSERTION_SORT_CUTOFF items are sorted with insertion sort, and
+    halves that are already in order are not merged. If `bottom_up` is True,
+    sort without recursion by merging ranges of doubling widths instead.
+    Running time: O(n log n) in the worst case because log n levels of
+    merges each move all n items, O(n) in the best case if items are already
+    sorted because no halves need merging.
+    Memory usage: O(n) for a scratch buffer of n/2 items (versus O(n log n)
+    total allocation for splitting into new lists at every level)."""
+    if key is not None or reverse:
+        _sort_decorated(merge_sort, items, key, reverse, bottom_up)
+        return
+    count = len(items)
+    if count < 2:
+        return
+    # Allocate one scratch buffer that is large enough for every merge
+    buffer = [None] * (count // 2)
+    if bottom_up:
+        _merge_sort_bottom_up(items, buffer)
+    else:
+        _merge_sort_range(items, buffer, 0, count)
+
+
+merge_sort.stable = True
+
+
+def _merge_sort_range(items, buffer, low, high):
+    """Sort given items in range `[low...high-1]` in place with recursive
+    merge sort, using the given scratch buffer for merging."""
+    # Check if range is so small that insertion sort is faster (base case)
+    if high - low <= INSERTION_SORT_CUTOFF:
+        _insertion_sort_range(items, low, high - 1)
+        return
+    # Split range into approximately equal halves
+    middle = (low + high) // 2
+    # Sort each half by recursively calling merge sort
+    _merge_sort_range(items, buffer, low, middle)
+    _merge_sort_range(items, buffer, middle, high)
+    # Merge sorted halves in place
+    _merge_ranges(items, buffer, low, middle, high)
+
+
+def _merge_sort_bottom_up(items, buffer):
+    """Sort given items in place with iterative merge sort, using the given
+    scratch buffer for merging: sort small blocks with insertion sort, then
+    merge pairs of adjacent sorted ranges of doubling widths."""
+    count = len(items)
+    width = INSERTION_SORT_CUTOFF
+    for low in range(0, count, width):
+        _insertion_sort_range(items, low, min(low + width, count) - 1)
+    while width < count:
+        for low in range(0, count - width, 2 * width):
+            _merge_ranges(items, buffer, low, low + width,
+                          min(low + 2 * width, count))
+        width *= 2
+
+
+def _merge_ranges(items, buffer, low, middle, high):
+    """Stably merge the adjacent sorted ranges `[low...middle-1]` and
+    `[middle...high-1]` of given items in place. The smaller range is copied
+    into the given scratch buffer (which must hold at least that many items)
+    and merged from the front (if it is the left range) or from the back (if
+    it is the right range), so no other memory is allocated.
+    Running time: O(high - low), or O(1) if the ranges are already in order."""
+    # Check if the ranges are already in order, so there is nothing to merge
+    if low == middle or middle == high or \
+            not items[middle] < items[middle - 1]:
+        return
+    if middle - low <= high - middle:
+        # Copy the left range into the buffer and merge from the front
+        length = middle - low
+        for index in range(length):
+            buffer[index] = items[low + index]
+        i, j, k = 0, middle, low
+        while i < length and j < high:
+            if items[j] < buffer[i]:
+                items[k] = items[j]
+                j += 1
+            else:
+                items[k] = buffer[i]
+                i += 1
+            k += 1
+        # Copy any remaining left items (right items are already in place)
+        while i < length:
+            items[k] = buffer[i]
+            i += 1
+            k += 1
+    else:
+        # Copy the right range into the buffer and merge from the back
+        length = high - middle
+        for index in range(length):
+            buffer[index] = items[middle + index]
+        i, j, k = middle - 1, length - 1, high - 1
+        while i >= low and j >= 0:
+            if buffer[j] < items[i]:
+                items[k] = items[i]
+                i -= 1
+            else:
+                items[k] = buffer[j]
+                j -= 1
+            k -= 1
+        # Copy any remaining right items (left items are already in place)
+        while j >= 0:
+            items[k] = buffer[j]
+            j -= 1
+            k -= 1
+
+
+def tim_sort(items, key=None, reverse=False):
+    """Sort given items in place with an adaptive, stable natural merge sort
+    like Python's own timsort: find runs of items already in ascending (or
+    strictly descending, which are reversed) order, extend short runs to a
+    minimum length with binary insertion sort, and merge runs pairwise in an
+    order that keeps merges balanced. Merges gallop (search exponentially)
+    through one run when it keeps winning, and copy only the left run into
+    a single scratch buffer that is reused by every merge.
+    Best case running time: O(n) if items are sorted or reverse sorted (or
+    made of a few runs) because runs are found in one pass and few merges
+    are needed.
+    Worst case running time: O(n log n) on random items.
+    Memory usage: O(n) for the scratch buffer in the worst case, but it only
+    grows as large as the left run of the largest merge (after trimming)."""
+    if key is not None or reverse:
+        _sort_decorated(tim_sort, items, key, reverse)
+        return
+    count = len(items)
+    if count < 2:
+        return
+    min_run = _min_run_length(count)
+    runs = []  # Stack of (start index, length) of pending runs
+    buffer = []  # Scratch buffer reused by all merges
+    low = 0
+    while low < count:
+        # Find next natural run, extending it with binary insertion if short
+        run_length = _count_run(items, low, count)
+        if run_length < min_run:
+            forced_length = min(min_run, count - low)
+            _binary_insertion_sort(items, low, low + forced_length,
+                                   low + run_length)
+            run_length = forced_length
+        runs.append((low, run_length))
+        _merge_collapse(items, runs, buffer)
+        low += run_length
+    # Merge all remaining runs from the top of the stack down
+    while len(runs) > 1:
+        _merge_at(items, runs, len(runs) - 2, buffer)
+
+
+tim_sort.stable = True
+
+
+def _min_run_length(count):
+    """Return the minimum run length for tim sort of `count` items: a number
+    between 32 and 64 such that `count` divided by it is close to, but no
+    more than, a power of 2, so runs merge in balanced pairs."""
+    remainder = 0
+    while count >= 64:
+        remainder |= count & 1
+        count >>= 1
+    return count + remainder
+
+
+def _count_run(items, low, high):
+    """Return the length of the run of given items starting at index `low`
+    (and ending before index `high`) that is in ascending order, or in
+    strictly descending order, in which case the run is reversed in place.
+    Descending runs must be strict so reversing them keeps sorting stable."""
+    end = low + 1
+    if end == high:
+        return 1
+    if items[end] < items[low]:
+        # Strictly descending run
+        while end + 1 < high and items[end + 1] < items[end]:
+            end += 1
+        end += 1
+        items[low:end] = items[low:end][::-1]
+    else:
+        # Ascending (non-descending) run
+        while end + 1 < high and not items[end + 1] < items[end]:
+            end += 1
+        end += 1
+    return end - low
+
+
+def _binary_insertion_sort(items, low, high, start):
+    """Sort given items in range `[low...high-1]` in place by inserting each
+    item from index `start` on into the sorted range in front of it, using
+    binary search to find its position after equal items (keeping sorting
+    stable). Running time: O(m log m) comparisons and O(m^2) moves for m
+    items, but moves are fast slice assignments."""
+    for index in range(start, high):
+        item = items[index]
+        position = bisect_right(items, item, low, index)
+        items[position + 1:index + 1] = items[position:index]
+        items[position] = item
+
+
+def _gallop_left(key, items, start, end):
+    """Return the first index in sorted range `[start...end-1]` of given items
+    whose item is not less than `key` (like bisect_left), probing indexes
+    start, start+1, start+3, start+7, ... before binary searching, so
+    positions near the start are found in few comparisons."""
+    bound = 1
+    while start + bound - 1 < end and items[start + bound - 1] < key:
+        bound *= 2
+    return bisect_left(items, key, start + bound // 2,
+                       min(start + bound - 1, end))
+
+
+def _gallop_right(key, items, start, end):
+    """Return the first index in sorted range `[start...end-1]` of given items
+    whose item is greater than `key` (like bisect_right), probing indexes
+    exponentially from the start like _gallop_left."""
+    bound = 1
+    while start + bound - 1 < end and not key < items[start + bound - 1]:
+        bound *= 2
+    return bisect_right(items, key, start + bound // 2,
+                        min(start + bound - 1, end))
+
+
+def _merge_collapse(items, runs, buffer):
+    """Merge runs on top of the given stack until the lengths of the top
+    three runs A, B, C satisfy A > B + C and B > C, so run lengths grow at
+    least as fast as the Fibonacci numbers and the stack stays short."""
+    while len(runs) > 1:
+        n = len(runs) - 2
+        if (n > 0 and runs[n - 1][1] <= runs[n][1] + runs[n + 1][1]) or \
+                (n > 1 and runs[n - 2][1] <= runs[n - 1][1] + runs[n][1]):
+            if runs[n - 1][1] < runs[n + 1][1]:
+                n -= 1
+        elif runs[n][1] > runs[n + 1][1]:
+            break
+        _merge_at(items, runs, n, buffer)
+
+
+def _merge_at(items, runs, n, buffer):
+    """Merge the adjacent runs at indexes `n` and `n+1` of the given stack of
+    runs and replace them with the merged run."""
+    start1, length1 = runs[n]
+    start2, length2 = runs[n + 1]
+    runs[n] = (start1, length1 + length2)
+    del runs[n + 1]
+    # Items in the left run that are not greater than the right run's first
+    # item are already in their final positions
+    skip = _gallop_right(items[start2], items, start1, start2) - start1
+    start1 += skip
+    length1 -= skip
+    if length1 == 0:
+        return
+    # Items in the right run not less than the left run's last item are too
+    length2 = _gallop_left(items[start2 - 1], items, start2,
+                           start2 + length2) - start2
+    if length2 == 0:
+        return
+    _merge_low(items, buffer, start1, length1, start2, length2)
+
+
+def _merge_low(items, buffer, start1, length1, start2, length2):
+    """Stably merge the adjacent sorted runs of given items starting at
+    indexes `start1` and `start2` by copying the left run into the given
+    scratch buffer and merging from the front. Each merge starts comparing
+    items one at a time and switches to galloping mode when one run wins
+    MIN_GALLOP times in a row, then copies whole slices found by galloping
+    until galloping stops paying off."""
+    # Copy the left run into the scratch buffer, growing it if needed
+    if len(buffer) < length1:
+        buffer.extend([None] * (length1 - len(buffer)))
+    buffer[:length1] = items[start1:start1 + length1]
+    i, end1 = 0, length1  # Index into left run in buffer
+    j, end2 = start2, start2 + length2  # Index into right run in items
+    k = start1  # Index of next merged item in items
+    while i < end1 and j < end2:
+        # Merge one item at a time, counting consecutive wins of each run
+        wins1 = wins2 = 0
+        while i < end1 and j < end2:
+            if items[j] < buffer[i]:
+                items[k] = items[j]
+                j += 1
+                wins1, wins2 = 0, wins2 + 1
+            else:
+                items[k] = buffer[i]
+                i += 1
+                wins1, wins2 = wins1 + 1, 0
+            k += 1
+            if wins1 >= MIN_GALLOP or wins2 >= MIN_GALLOP:
+                break
+        # Gallop while either run keeps contributing long stretches of items
+        while i < end1 and j < end2:
+            # Copy left run items that are not greater than next right item
+            count1 = _gallop_right(items[j], buffer, i, end1) - i
+            items[k:k + count1] = buffer[i:i + count1]
+            i += count1
+            k += count1
+            if i == end1:
+                break
+            # Copy right run items that are less than next left item
+            count2 = _gallop_left(buffer[i], items, j, end2) - j
+            items[k:k + count2] = items[j:j + count2]
+            j += count2
+            k += count2
+            if count1 < MIN_GALLOP and count2 < MIN_GALLOP:
+                break
+    # Copy any remaining left run items (right run items are already placed)
+    items[k:k + end1 - i] = buffer[i:end1]
+
+
+def _median_of_three(items, i, j, k):
+    """Return whichever index of `i`, `j` and `k` holds the median item."""
+    a, b, c = items[i], items[j], items[k]
+    if a < b:
+        if b < c:
+            return j
+        return k if a < c else i
+    if a < c:
+        return i
+    return k if b < c else j
+
+
+def choose_pivot(items, low, high):
+    """Return the index of a pivot item for partitioning given items in range
+    `[low...high]`: the median of the first, middle and last items, or for
+    ranges larger than NINTHER_CUTOFF the ninther (median of the medians of
+    three evenly spaced groups of three items). Both avoid the worst case of
+    choosing the first or last item on sorted or reverse sorted items.
+    Running time: O(1) because at most 12 comparisons are made."""
+    middle = low + (high - low) // 2
+    if high - low + 1 > NINTHER_CUTOFF:
+        step = (high - low + 1) // 8
+        first = _median_of_three(items, low, low + step, low + 2 * step)
+        second = _median_of_three(items, middle - step, middle, middle + step)
+        third = _median_of_three(items, high - 2 * step, high - step, high)
+        return _median_of_three(items, first, second, third)
+    return _median_of_three(items, low, middle, high)
+
+
+def partition(items, low, high, pivot_index=None):
     """Return index `p` after in-place partitioning given items in range
-    `[low...high]` by choosing a pivot (TODO: document your method here) from
-    that range, moving pivot into index `p`, items less than pivot into range
-    `[low...p-1]`, and items greater than pivot into range `[p+1...high]`.
-    TODO: Running time: ??? Why and under what conditions?
-    TODO: Memory usage: ??? Why and under what conditions?"""
-    # TODO: Choose a pivot any way and document your method in docstring above
-    # TODO: Loop through all items in range [low...high]
-    # TODO: Move items less than pivot into front of range [low...p-1]
-    # TODO: Move items greater than pivot into back of range [p+1...high]
-    # TODO: Move pivot item into final position [p] and return index p
-
-
-def quick_sort(items, low=None, high=None):
+    `[low...high]` by choosing a pivot (median of three, or ninther for large
+    ranges; see choose_pivot) from that range, moving pivot into index `p`,
+    items less than pivot into range `[low...p-1]`, and items greater than
+    pivot into range `[p+1...high]`. Items equal to pivot may be on either
+    side (use partition_three_way to group them together). If `pivot_index`
+    is given, partition around the item at that index instead.
+    Running time: O(n) for n = high - low + 1 items because each item is
+    compared with the pivot once.
+    Memory usage: O(1) because items are swapped in place."""
+    # Choose a pivot and move it out of the way to the end of the range
+    if pivot_index is None:
+        pivot_index = choose_pivot(items, low, high)
+    items[pivot_index], items[high] = items[high], items[pivot_index]
+    pivot = items[high]
+    # Loop through all items in range [low...high-1]
+    p = low
+    for index in range(low, high):
+        # Move items less than pivot into front of range [low...p-1]
+        if items[index] < pivot:
+            items[index], items[p] = items[p], items[index]
+            p += 1
+    # Items greater than or equal to pivot are now in back of range [p...high]
+    # Move pivot item into final position [p] and return index p
+    items[p], items[high] = items[high], items[p]
+    return p
+
+
+def partition_three_way(items, low, high, pivot_index=None):
+    """Return indexes `(lt, gt)` after in-place partitioning given items in
+    range `[low...high]` around a pivot (see choose_pivot) into items less
+    than pivot in range `[low...lt-1]`, items equal to pivot in range
+    `[lt...gt]` and items greater than pivot in range `[gt+1...high]`
+    (Dijkstra's Dutch national flag partitioning). Grouping all items equal
+    to pivot keeps quick sort O(n log n) on items with many duplicates.
+    If `pivot_index` is given, partition around the item at that index.
+    Running time: O(n) for n = high - low + 1 items because each item is
+    compared with the pivot at most twice.
+    Memory usage: O(1) because items are swapped in place."""
+    if pivot_index is None:
+        pivot_index = choose_pivot(items, low, high)
+    pivot = items[pivot_index]
+    lt = low  # Next position for an item less than pivot
+    gt = high  # Next position for an item greater than pivot
+    index = low
+    while index <= gt:
+        item = items[index]
+        if item < pivot:
+            items[index], items[lt] = items[lt], item
+            lt += 1
+            index += 1
+        elif pivot < item:
+            items[index], items[gt] = items[gt], item
+            gt -= 1
+        else:
+            index += 1
+    return lt, gt
+
+
+def quick_sort(items, low=None, high=None, key=None, reverse=False):
     """Sort given items in place by partitioning items in range `[low...high]`
     around a pivot item and recursively sorting each remaining sublist range.
-    TODO: Best case running time: ??? Why and under what conditions?
-    TODO: Worst case running time: ??? Why and under what conditions?
-    TODO: Memory usage: ??? Why and under what conditions?"""
-    # TODO: Check if high and low range bounds have default values (not given)
-    # TODO: Check if list or range is so small it's already sorted (base case)
-    # TODO: Partition items in-place around a pivot and get index of pivot
-    # TODO: Sort each sublist range by recursively calling quick sort
-
-
-def counting_sort(numbers):
-    """Sort given numbers (integers) by counting occurrences of each number,
-    then looping over counts and copying that many numbers into output list.
-    TODO: Running time: ??? Why and under what conditions?
-    TODO: Memory usage: ??? Why and under what conditions?"""
-    # TODO: Find range of given numbers (minimum and maximum integer values)
-    # TODO: Create list of counts with a slot for each number in input range
-    # TODO: Loop over given numbers and increment each number's count
-    # TODO: Loop over counts and append that many numbers into output list
-    # FIXME: Improve this to mutate input instead of creating new output list
-
-
-def bucket_sort(numbers, num_buckets=10):
-    """Sort given numbers by distributing into buckets representing subranges,
-    sorting each bucket, and combining contents of all buckets in sorted order.
-    TODO: Running time: ??? Why and under what conditions?
-    TODO: Memory usage: ??? Why and under what conditions?"""
-    # TODO: Find range of given numbers (minimum and maximum integer values)
-    # TODO: Create list of buckets to store numbers in subranges of input range
-    # TODO: Loop over given numbers and place each item in appropriate bucket
-    # TODO: Sort each bucket using any sorting algorithm (recursive or another)
-    # TODO: Loop over buckets and append each bucket's numbers into output list
-    # FIXME: Improve this to mutate input instead of creating new output list
+    This is introsort: pivots are chosen by median of three or ninther,
+    items equal to the pivot are grouped by three-way partitioning, small
+    ranges are finished with insertion sort, and if partitioning goes deeper
+    than 2*log2(n) levels the range is heap sorted instead. Only the smaller
+    side of each partition is sorted recursively and the larger side is
+    sorted in a loop, so recursion depth is at most log2(n).
+    Best case running time: O(n) if all items are equal, because one
+    three-way partition puts every item in its final position.
+    Worst case running time: O(n log n) because heap sort takes over on
+    inputs that make partitioning unbalanced.
+    Memory usage: O(log n) for the call stack of the smaller sides."""
+    # Check if high and low range bounds have default values (not given)
+    if low is None:
+        low = 0
+    if high is None:
+        high = len(items) - 1
+    if key is not None or reverse:
+        # Sort a copy of the range by key and write it back into the range
+        sublist = items[low:high + 1]
+        _sort_decorated(quick_sort, sublist, key, reverse)
+        items[low:high + 1] = sublist
+        return
+    # Check if list or range is so small it's already sorted (base case)
+    if high <= low:
+        return
+    depth_limit = 2 * int(math.log2(high - low + 1))
+    _introsort(items, low, high, depth_limit)
+
+
+quick_sort.stable = False
+
+
+def _introsort(items, low, high, depth_limit):
+    """Sort given items in range `[low...high]` in place with quick sort,
+    switching to heap sort after partitioning `depth_limit` more levels."""
+    while high - low + 1 > INSERTION_SORT_CUTOFF:
+        # Check if partitioning has degenerated and if so use heap sort
+        if depth_limit == 0:
+            _heap_sort_range(items, low, high)
+            return
+        depth_limit -= 1
+        # Partition items in-place around a pivot and get range of pivot items
+        lt, gt = partition_three_way(items, low, high)
+        # Sort smaller sublist range recursively and larger one by looping
+        if lt - low < high - gt:
+            _introsort(items, low, lt - 1, depth_limit)
+            low = gt + 1
+        else:
+            _introsort(items, gt + 1, high, depth_limit)
+            high = lt - 1
+    # Range is so small that insertion sort is fastest
+    _insertion_sort_range(items, low, high)
+
+
+def heap_sort(items, key=None, reverse=False):
+    """Sort given items in place by building a max-heap of all items, then
+    repeatedly swapping the maximum item to the end of the unsorted range.
+    Running time: O(n log n) in the best and worst case because each of n
+    items is sifted down a heap of height log n.
+    Memory usage: O(1) because the heap is stored in the items list."""
+    if key is not None or reverse:
+        _sort_decorated(heap_sort, items, key, reverse)
+        return
+    _heap_sort_range(items, 0, len(items) - 1)
+
+
+heap_sort.stable = False
+
+
+def _heap_sort_range(items, low, high):
+    """Sort given items in range `[low...high]` in place with heap sort."""
+    count = high - low + 1
+    # Build a max-heap by sifting down every parent node from the last one
+    for start in range(count // 2 - 1, -1, -1):
+        _sift_down(items, low, start, count)
+    # Swap the maximum item to the end and restore the heap in front of it
+    for end in range(count - 1, 0, -1):
+        items[low], items[low + end] = items[low + end], items[low]
+        _sift_down(items, low, 0, end)
+
+
+def _sift_down(items, offset, start, count):
+    """Sift the item at heap index `start` down the max-heap of `count` items
+    stored from index `offset` of given items until it is not less than its
+    children. Running time: O(log count) for the height of the heap."""
+    item = items[offset + start]
+    parent = start
+    child = 2 * parent + 1
+    while child < count:
+        # Choose the larger child
+        if child + 1 < count and items[offset + child] < \
+                items[offset + child + 1]:
+            child += 1
+        if not item < items[offset + child]:
+            break
+        # Move the larger child up and continue sifting down from its place
+        items[offset + parent] = items[offset + child]
+        parent = child
+        child = 2 * parent + 1
+    items[offset + parent] = item
+
+
+def nth_element(items, n, key=None):
+    """Rearrange given items in place so that the item at index `n` is the
+    item that would be there if items were sorted, items before it are not
+    greater than it and items after it are not less than it (like C++'s
+    std::nth_element). If key is given, items are ordered by key(item).
+    This is introselect: quick select partitions around pivots chosen like
+    quick sort's and continues only into the side that holds index `n`, and
+    if that goes deeper than 2*log2(n) levels, pivots are chosen by median
+    of medians instead, which guarantees linear time.
+    Best case running time: O(n) if all items are equal, because one
+    three-way partition puts every item in its final position.
+    Worst case running time: O(n) because median of medians pivots take
+    over on inputs that make partitioning unbalanced.
+    Memory usage: O(1) if key is not given because items are swapped in
+    place, plus O(log n) for the call stack of median of medians."""
+    if not 0 <= n < len(items):
+        raise IndexError('Index {} is out of range for {} items'.format(
+            n, len(items)))
+    if key is not None:
+        _sort_decorated(nth_element, items, key, False, n)
+        return
+    depth_limit = 2 * int(math.log2(len(items)))
+    _select(items, 0, len(items) - 1, n, depth_limit)
+
+
+def _select(items, low, high, n, depth_limit):
+    """Rearrange given items in range `[low...high]` in place so the item at
+    index `n` is in sorted position, switching from pivots chosen like quick
+    sort's to median of medians pivots after `depth_limit` partitions."""
+    while low < high:
+        if depth_limit == 0:
+            pivot_index = _median_of_medians(items, low, high)
+        else:
+            depth_limit -= 1
+            pivot_index = None  # Let partition choose a pivot
+        # Partition range around the pivot and get range of pivot items
+        lt, gt = partition_three_way(items, low, high, pivot_index)
+        # Continue into the side that holds index n, if it is not a pivot
+        if n < lt:
+            high = lt - 1
+        elif n > gt:
+            low = gt + 1
+        else:
+            return
+
+
+def _median_of_medians(items, low, high):
+    """Return the index of an item in range `[low...high]` of given items that
+    is greater than and less than at least 3/10 of items in the range: the
+    median of the medians of groups of five items, which are moved to the
+    front of the range, found recursively with _select.
+    Running time: O(m) for m = high - low + 1 items."""
+    count = high - low + 1
+    if count <= 5:
+        _insertion_sort_range(items, low, high)
+        return (low + high) // 2
+    # Sort each group of five items and move its median to the front
+    groups = 0
+    for start in range(low, high + 1, 5):
+        end = min(start + 4, high)
+        _insertion_sort_range(items, start, end)
+        median = (start + end) // 2
+        items[low + groups], items[median] = items[median], items[low + groups]
+        groups += 1
+    # Select the median of the medians with median of medians pivots
+    middle = low + (groups - 1) // 2
+    _select(items, low, low + groups - 1, middle, 0)
+    return middle
+
+
+def quickselect(items, k, key=None):
+    """Return the `k`th smallest item (counting from 0) of given items, which
+    are rearranged in place around it (see nth_element). If key is given,
+    return the item with the `k`th smallest key.
+    Running time: O(n) in the worst case (see nth_element).
+    Memory usage: O(log n) for the call stack of median of medians, plus
+    O(n) for decorated items if key is given."""
+    nth_element(items, k, key)
+    return items[k]
+
+
+def partial_sort(items, k, key=None):
+    """Rearrange given items in place so the `k` smallest items are in sorted
+    order in range `[0...k-1]` and the other items follow in no particular
+    order, by selecting the `k`th smallest item with nth_element and then
+    sorting the items in front of it with quick sort. If key is given, items
+    are ordered by key(item).
+    Running time: O(n + k log k) in the worst case because selection is
+    linear and only k items are sorted.
+    Memory usage: O(log n) for the call stack, plus O(n) for decorated items
+    if key is given."""
+    k = min(k, len(items))
+    if k <= 0:
+        return
+    if key is not None:
+        _sort_decorated(partial_sort, items, key, False, k)
+        return
+    nth_element(items, k - 1)
+    quick_sort(items, 0, k - 2)
+
+
+def top_k(iterable, k, key=None):
+    """Return a list of the `k` smallest items from the given iterable (or all
+    of them if it has fewer items) in sorted order, reading items one at a
+    time: keep the smallest items seen so far in a max-heap of at most k
+    items and replace its maximum whenever a smaller item arrives, then heap
+    sort the heap. If key is given, items are ordered by key(item), which is
+    computed once per item. Of items that are equal to the kth smallest
+    item, the ones that arrived first are kept.
+    Running time: O(n log k) for n items because each item is compared with
+    the heap's maximum and at most sifted down a heap of height log k.
+    Memory usage: O(k) for the heap, so it works on streams of any length."""
+    if k <= 0:
+        return []
+    heap = []
+    for item in iterable:
+        if key is not None:
+            item = _KeyedItem(key(item), item)
+        if len(heap) < k:
+            heap.append(item)
+            if len(heap) == k:
+                # Build a max-heap by sifting down every parent node
+                for start in range(k // 2 - 1, -1, -1):
+                    _sift_down(heap, 0, start, k)
+        elif item < heap[0]:
+            # Replace the maximum item and restore the heap
+            heap[0] = item
+            _sift_down(heap, 0, 0, k)
+    heap_sort(heap)
+    if key is not None:
+        heap = [keyed.item for keyed in heap]
+    return heap
+
+
+def counting_sort(numbers, stable=False, key=None, reverse=False):
+    """Sort given numbers (integers) in place by counting occurrences of each
+    number in a compact array of counts, then looping over counts and writing
+    that many copies of each number back into the given list. If `stable` is
+    True, or if any number is not a plain int (like a bool or IntEnum member,
+    which compare equal to ints but are distinct objects), instead turn
+    counts into starting positions with prefix sums and move each number to
+    the next position for its value, keeping equal numbers in their original
+    order, at the cost of copying the list. If key is given, items of any
+    type are sorted stably by their integer keys.
+    A NumPy array of integers is sorted with vectorized operations instead.
+    Running time: O(n + k) for n numbers in a range of k values because each
+    number is counted once and each count is read once.
+    Memory usage: O(k) for an array of k 8-byte counts (no Python objects),
+    plus O(n) for the copy of the list (and the keys) if `stable` is True or
+    key is given."""
+    if reverse:
+        _sort_reversed(counting_sort, numbers, stable, key)
+        return
+    if _is_numpy_array(numbers):
+        _counting_sort_numpy(numbers, key)
+        return
+    if len(numbers) < 2:
+        return
+    # Compute each item's key once, or use numbers as their own keys
+    keys = numbers if key is None else [key(item) for item in numbers]
+    # Find range of given numbers (minimum and maximum integer values)
+    minimum = min(keys)
+    maximum = max(keys)
+    # Create array of zero counts with a slot for each number in input range
+    counts = array('Q', bytes(8 * (maximum - minimum + 1)))
+    # Loop over given numbers and increment each number's count
+    for number in keys:
+        counts[number - minimum] += 1
+    if stable or key is not None or \
+            not all(type(number) is int for number in numbers):
+        # Convert counts into starting positions of each number (prefix sums)
+        total = 0
+        for offset, count in enumerate(counts):
+            counts[offset] = total
+            total += count
+        # Move each item to the next position for its key, in order
+        items = list(numbers)
+        if key is None:
+            keys = items
+        for item, number in zip(items, keys):
+            offset = number - minimum
+            numbers[counts[offset]] = item
+            counts[offset] += 1
+        return
+    # Loop over counts and write that many numbers back into the given list
+    index = 0
+    for offset, count in enumerate(counts):
+        if count:
+            _fill(numbers, index, minimum + offset, count)
+            index += count
+
+
+# Without `stable` or key, equal plain ints are rewritten as interchangeable
+# copies; any other numbers are moved, so their original objects are kept
+counting_sort.stable = True
+
+
+def _counting_sort_numpy(numbers, key):
+    """Sort given NumPy array of integers in place with counting sort using
+    vectorized operations: count numbers with bincount and write each count
+    of copies with repeat, or if key is given, stably move items in order of
+    their integer keys with a stable argsort (which for small integer types
+    NumPy itself does with a counting radix sort)."""
+    keys = _numpy_integer_keys(counting_sort, numbers, key)
+    if len(numbers) < 2:
+        return
+    if key is None:
+        minimum = numbers.min()
+        counts = numpy.bincount(_numpy_offsets(numbers).astype(numpy.intp))
+        offsets = numpy.repeat(numpy.arange(len(counts), dtype=numpy.uint64),
+                               counts)
+        numbers[:] = _numpy_from_offsets(offsets, minimum, numbers.dtype)
+        return
+    numbers[:] = numbers[numpy.argsort(keys, kind='stable')]
+
+
+def _numpy_integer_keys(sort, numbers, key):
+    """Return a NumPy array of the integer keys of given NumPy array (the
+    array itself if key is None), or raise TypeError if they are not
+    integers, which the given integer sorting function cannot sort."""
+    if key is None:
+        keys = numbers
+    elif len(numbers) == 0:
+        keys = numpy.array([], dtype=numpy.int64)  # No keys to check
+    else:
+        keys = numpy.array([key(item) for item in numbers])
+    if keys.dtype.kind not in 'iu':
+        raise TypeError('{} can only sort integers, not {}'.format(
+            sort.__name__, keys.dtype))
+    return keys
+
+
+def _numpy_offsets(numbers):
+    """Return a NumPy array of the unsigned 64-bit offsets of given NumPy
+    array of integers from their minimum, which are exact for any integer
+    type because 64-bit subtraction wraps around."""
+    minimum = numbers.min()
+    if numbers.dtype.kind == 'u':
+        return numbers.astype(numpy.uint64) - numpy.uint64(minimum)
+    offsets = numbers.astype(numpy.int64) - numpy.int64(minimum)
+    return offsets.view(numpy.uint64)
+
+
+def _numpy_from_offsets(offsets, minimum, dtype):
+    """Return a NumPy array of the given integer type holding the given
+    unsigned 64-bit offsets (see _numpy_offsets) added to `minimum`."""
+    if dtype.kind == 'u':
+        return (offsets + numpy.uint64(minimum)).astype(dtype)
+    return (offsets.view(numpy.int64) + numpy.int64(minimum)).astype(dtype)
+
+
+def _fill(items, start, item, count, chunk_size=4096):
+    """Overwrite `count` items of the given list from index `start` with the
+    given item, using slice assignment of chunks of at most `chunk_size`
+    items so large counts never allocate a list as long as the count."""
+    chunk = [item] * min(count, chunk_size)
+    end = start + count
+    while start + len(chunk) <= end:
+        items[start:start + len(chunk)] = chunk
+        start += len(chunk)
+    items[start:end] = chunk[:end - start]
+
+
+def bucket_sort(numbers, num_buckets=None, key=None, reverse=False):
+    """Sort given numbers in place by distributing into buckets representing
+    subranges, sorting each bucket, and combining contents of all buckets in
+    sorted order. Buckets are ranges of the given list: bucket sizes are
+    counted and turned into bucket boundaries with prefix sums, then numbers
+    are swapped into their buckets along permutation cycles (like American
+    flag sort), and each bucket range is sorted with insertion sort (if it is
+    small) or quick sort. If `num_buckets` is not given, it is chosen from
+    the data: one bucket per number, but no more buckets than distinct
+    values in the range of integers (so each bucket holds equal numbers).
+    If key is given, items of any type are sorted by their number keys.
+    A NumPy array is sorted with vectorized operations instead.
+    Running time: O(n) on average for n numbers spread uniformly over their
+    range because buckets hold O(1) numbers each, O(n log n) in the worst
+    case if most numbers fall into one bucket.
+    Memory usage: O(b) for b buckets because only counts and boundaries
+    are stored in addition to the given list, plus O(n) for decorated items
+    if key is given."""
+    if reverse:
+        _sort_reversed(bucket_sort, numbers, num_buckets, key)
+        return
+    if _is_numpy_array(numbers):
+        _bucket_sort_numpy(numbers, num_buckets, key)
+        return
+    if key is not None:
+        # Sort items decorated with their keys, then undecorate them
+        decorated = [_KeyedItem(key(item), item) for item in numbers]
+        _bucket_sort(decorated, num_buckets, True)
+        numbers[:] = [keyed.item for keyed in decorated]
+        return
+    _bucket_sort(numbers, num_buckets, False)
+
+
+bucket_sort.stable = False
+bucket_sort.numpy_stable = True  # NumPy arrays are ordered with a lexsort
+
+
+def _bucket_sort(numbers, num_buckets, keyed):
+    """Sort given numbers in place with bucket sort, or if `keyed` is True,
+    sort given decorated items (see _KeyedItem) by their number keys."""
+    count = len(numbers)
+    if count < 2:
+        return
+    # Find range of given numbers (minimum and maximum values)
+    if keyed:
+        minimum = min(item.key for item in numbers)
+        maximum = max(item.key for item in numbers)
+    else:
+        minimum = min(numbers)
+        maximum = max(numbers)
+    if minimum == maximum:
+        return  # All numbers are equal
+    if num_buckets is None:
+        num_buckets = count
+        if isinstance(minimum, int) and isinstance(maximum, int):
+            num_buckets = min(count, maximum - minimum + 1)
+    scale = num_buckets / (maximum - minimum)
+    last = num_buckets - 1
+
+    if keyed:
+        def bucket_index(item):
+            return min(int((item.key - minimum) * scale), last)
+    else:
+        def bucket_index(number):
+            return min(int((number - minimum) * scale), last)
+
+    # Count how many numbers fall into each bucket's subrange
+    ends = array('Q', bytes(8 * num_buckets))
+    for number in numbers:
+        ends[bucket_index(number)] += 1
+    # Convert counts into end positions of each bucket (prefix sums)
+    total = 0
+    for index in range(num_buckets):
+        total += ends[index]
+        ends[index] = total
+    # Swap numbers into their buckets, filling each bucket from its start
+    starts = array('Q', [0]) + ends[:-1]
+    next_free = array('Q', starts)
+    for bucket in range(num_buckets):
+        while next_free[bucket] < ends[bucket]:
+            number = numbers[next_free[bucket]]
+            target = bucket_index(number)
+            # Follow the cycle of displaced numbers back to this bucket
+            while target != bucket:
+                position = next_free[target]
+                next_free[target] += 1
+                numbers[position], number = number, numbers[position]
+                target = bucket_index(number)
+            numbers[next_free[bucket]] = number
+            next_free[bucket] += 1
+    # Sort each bucket range using insertion sort or quick sort
+    for bucket in range(num_buckets):
+        low, high = starts[bucket], ends[bucket] - 1
+        if high - low < INSERTION_SORT_CUTOFF:
+            _insertion_sort_range(numbers, low, high)
+        else:
+            quick_sort(numbers, low, high)
+
+
+def _bucket_sort_numpy(numbers, num_buckets, key):
+    """Sort given NumPy array in place with bucket sort using vectorized
+    operations: compute every number's bucket index at once, then order
+    numbers by bucket and by value within each bucket with one lexsort, and
+    move them into place with a single gather."""
+    count = len(numbers)
+    if count < 2:
+        return
+    if key is None:
+        keys = numbers
+    else:
+        keys = numpy.array([key(item) for item in numbers])
+    minimum = keys.min()
+    maximum = keys.max()
+    if minimum == maximum:
+        return  # All numbers are equal
+    if num_buckets is None:
+        num_buckets = count
+        if keys.dtype.kind in 'iu':
+            num_buckets = min(count, int(maximum) - int(minimum) + 1)
+    scale = num_buckets / (float(maximum) - float(minimum))
+    buckets = ((keys.astype(numpy.float64) - float(minimum)) * scale)
+    buckets = numpy.minimum(buckets.astype(numpy.intp), num_buckets - 1)
+    # Sort by bucket index first (lexsort's last key) and then by key
+    numbers[:] = numbers[numpy.lexsort((keys, buckets))]
+
+
+def radix_sort_lsd(numbers, digit_bits=None, key=None, reverse=False):
+    """Sort given numbers (integers, which may be negative) in place with
+    least significant digit first radix sort: stably distribute numbers by
+    each digit of `digit_bits` bits, from the lowest digit to the highest,
+    with a counting pass and prefix sums per digit. Numbers are sorted by
+    their offset from the minimum number, so negative numbers need no
+    special handling and small ranges of large numbers need few passes.
+    If `digit_bits` is not given, use 16-bit digits for 2^16 or more numbers
+    (so each pass counts into 2^16 slots) and 8-bit digits otherwise.
+    If key is given, items of any type are sorted stably by integer keys.
+    A NumPy array is sorted with one vectorized stable pass per digit.
+    Running time: O(d * (n + 2^b)) for n numbers with d digits of b bits in
+    their range, which is O(n) for 64-bit numbers and a fixed digit width.
+    Memory usage: O(n) for the offsets from the minimum and a buffer that
+    they are distributed into, plus O(2^b) for an array of digit counts."""
+    if reverse:
+        _sort_reversed(radix_sort_lsd, numbers, digit_bits, key)
+        return
+    if _is_numpy_array(numbers):
+        _radix_sort_lsd_numpy(numbers, digit_bits, key)
+        return
+    count = len(numbers)
+    if count < 2:
+        return
+    if digit_bits is None:
+        digit_bits = 16 if count >= 1 << 16 else 8
+    if key is None:
+        minimum = min(numbers)
+        # Equal integers are interchangeable, so sort offsets from the minimum
+        keys = [number - minimum for number in numbers]
+        shift = 0
+    else:
+        items = list(numbers)
+        keys = [key(item) for item in items]
+        minimum = min(keys)
+        # Append each item's index to its key's offset as its lowest bits,
+        # which are already in order, so sorting starts above them and the
+        # items can be found from the sorted keys
+        index_bits = (count - 1).bit_length()
+        keys = [(number - minimum) << index_bits | index
+                for index, number in enumerate(keys)]
+        shift = index_bits
+    max_key = max(keys)
+    radix = 1 << digit_bits
+    mask = radix - 1
+    target = [0] * count
+    while max_key >> shift:
+        # Count keys with each digit value
+        counts = array('Q', bytes(8 * radix))
+        for value in keys:
+            counts[(value >> shift) & mask] += 1
+        # Skip this digit if all keys have the same value for it
+        if count not in counts:
+            # Convert counts into starting positions of each digit value
+            total = 0
+            for digit in range(radix):
+                counts[digit], total = total, total + counts[digit]
+            # Distribute keys by this digit, keeping earlier digits' order
+            for value in keys:
+                digit = (value >> shift) & mask
+                target[counts[digit]] = value
+                counts[digit] += 1
+            keys, target = target, keys
+        shift += digit_bits
+    # Write numbers back into the given list in sorted order
+    del target
+    if key is None:
+        for index, value in enumerate(keys):
+            numbers[index] = value + minimum
+    else:
+        index_mask = (1 << index_bits) - 1
+        for index, value in enumerate(keys):
+            numbers[index] = items[value & index_mask]
+
+
+radix_sort_lsd.stable = True
+
+
+def _radix_sort_lsd_numpy(numbers, digit_bits, key):
+    """Sort given NumPy array of integers (or items with integer keys) in
+    place with LSD radix sort using vectorized operations: extract every
+    offset's digit at once, then stably reorder offsets by digit with a
+    stable argsort, which NumPy does with a counting radix sort for 8- and
+    16-bit digit types, and track the permutation to move items once."""
+    keys = _numpy_integer_keys(radix_sort_lsd, numbers, key)
+    count = len(numbers)
+    if count < 2:
+        return
+    if digit_bits is None:
+        digit_bits = 16 if count >= 1 << 16 else 8
+    offsets = _numpy_offsets(keys)
+    # Use the smallest unsigned type that holds a digit
+    for digit_type in [numpy.uint8, numpy.uint16, numpy.uint32, numpy.uint64]:
+        if digit_bits <= 8 * numpy.dtype(digit_type).itemsize:
+            break
+    mask = numpy.uint64((1 << digit_bits) - 1)
+    max_offset = int(offsets.max())
+    order = numpy.arange(count)
+    shift = 0
+    while max_offset >> shift:
+        digits = (offsets >> numpy.uint64(shift)) & mask
+        permutation = numpy.argsort(digits.astype(digit_type), kind='stable')
+        offsets = offsets[permutation]
+        order = order[permutation]
+        shift += digit_bits
+    numbers[:] = numbers[order]
+
+
+def radix_sort_msd(strings, key=None, reverse=False):
+    """Sort given strings in place with most significant digit first radix
+    sort: distribute strings by their first character, then recursively
+    distribute each group of strings with the same first character by their
+    next character, and so on. Strings that end before a position are put
+    before all longer strings, so shorter prefixes come first. Groups with
+    at most INSERTION_SORT_CUTOFF strings are sorted with insertion sort,
+    which is faster than distributing them. Groups are kept on an explicit
+    stack, so long common prefixes do not exceed the recursion limit.
+    If key is given, items of any type are sorted stably by string keys.
+    Running time: O(n * L) for n strings of length L in the worst case, but
+    only the characters needed to tell strings apart are examined, which is
+    O(n log_r n) for r distinct characters on random strings.
+    Memory usage: O(n) for a buffer that strings are distributed into."""
+    if reverse:
+        _sort_reversed(radix_sort_msd, strings, key)
+        return
+    if key is not None:
+        # Sort keys that carry their items, then replace keys with items
+        keys = []
+        for item in strings:
+            string = _KeyedString(key(item))
+            string.item = item
+            keys.append(string)
+        radix_sort_msd(keys)
+        strings[:] = [string.item for string in keys]
+        return
+    count = len(strings)
+    if count < 2:
+        return
+    buffer = [None] * count
+    stack = [(0, count, 0)]  # Ranges [low...high-1] to sort from depth on
+    while stack:
+        low, high, depth = stack.pop()
+        # Check if range is so small that insertion sort is faster
+        if high - low <= INSERTION_SORT_CUTOFF:
+            _insertion_sort_range(strings, low, high - 1)
+            continue
+        # Count strings with each character at this depth (code point + 1),
+        # or that have ended (0) so they come first
+        counts = {}
+        for index in range(low, high):
+            string = strings[index]
+            digit = ord(string[depth]) + 1 if depth < len(string) else 0
+            counts[digit] = counts.get(digit, 0) + 1
+        # Convert counts into starting positions of each character
+        starts = {}
+        total = low
+        for digit in sorted(counts):
+            starts[digit] = total
+            total += counts[digit]
+            # Sort strings in each group with more characters to compare
+            if digit != 0 and counts[digit] > 1:
+                stack.append((starts[digit], total, depth + 1))
+        # Distribute strings by character into the buffer and copy them back
+        for index in range(low, high):
+            string = strings[index]
+            digit = ord(string[depth]) + 1 if depth < len(string) else 0
+            buffer[starts[digit]] = string
+            starts[digit] += 1
+        strings[low:high] = buffer[low:high]
+
+
+radix_sort_msd.stable = True
+
+
+def choose_sort(items, stable=False):
+    """Return the name of the sorting function in SORTS that is expected to
+    sort given items fastest, and a string giving the reason, by sampling
+    evenly spaced items and adjacent pairs of items:
+    - at most INSERTION_SORT_CUTOFF items: insertion sort
+    - NumPy arrays of numbers: vectorized LSD radix sort (of integers) or
+      bucket sort (of floats)
+    - almost all sampled pairs in order (or all in reverse order): tim sort,
+      which merges natural runs in linear time
+    - integers in a range no larger than twice their count: counting sort
+    - integers with few duplicates in a range of at most four radix digits:
+      LSD radix sort
+    - otherwise: quick sort (introsort), whose three-way partitioning is
+      fastest on items with many duplicates too.
+    If `stable` is True, merge sort replaces choices that are not stable.
+    Running time: O(n) to check that all items are integers and find their
+    range, otherwise O(1) for the sample."""
+    count = len(items)
+    name, reason = _choose_sort(items, count)
+    if stable and not _is_stable(SORTS[name], items):
+        name, reason = 'merge_sort', reason + ', stable'
+    return name, reason
+
+
+def _is_stable(sort, items):
+    """Return True if the given sorting function keeps given items with equal
+    keys in their original order: it is stable, or items are a NumPy array of
+    numbers and its vectorized NumPy path is stable."""
+    if sort.stable:
+        return True
+    return _is_numpy_array(items) and items.dtype.kind in 'iuf' and \
+        getattr(sort, 'numpy_stable', False)
+
+
+def _choose_sort(items, count):
+    """Return the name of a sorting function and the reason for choosing it
+    for given items (see choose_sort), ignoring stability."""
+    if count <= INSERTION_SORT_CUTOFF:
+        return 'insertion_sort', '{} items'.format(count)
+    if _is_numpy_array(items) and items.dtype.kind in 'iuf':
+        # Vectorized sorts are much faster than any loop over items
+        if items.dtype.kind == 'f':
+            return 'bucket_sort', 'NumPy array of floats'
+        return 'radix_sort_lsd', 'NumPy array of integers'
+    # Estimate presortedness from the fraction of sampled pairs out of order
+    step = max(1, (count - 1) // DISPATCH_SAMPLE_SIZE)
+    pairs = range(0, count - 1, step)
+    descents = sum(1 for index in pairs if items[index + 1] < items[index])
+    if descents <= 0.05 * len(pairs) or descents >= 0.95 * len(pairs):
+        return 'tim_sort', '{} of {} sampled pairs out of order'.format(
+            descents, len(pairs))
+    # Estimate the fraction of duplicates from distinct sampled items
+    sample = items[::max(1, count // DISPATCH_SAMPLE_SIZE)]
+    try:
+        duplicates = 1 - len(set(sample)) / len(sample)
+    except TypeError:  # Items are not hashable
+        duplicates = 0
+    if all(type(item) is int for item in sample) and \
+            all(type(item) is int for item in items):
+        value_range = max(items) - min(items) + 1
+        if value_range <= 2 * count:
+            return 'counting_sort', 'integers in range of {}'.format(
+                value_range)
+        digit_bits = 16 if count >= 1 << 16 else 8
+        if duplicates <= 0.5 and \
+                value_range.bit_length() <= 4 * digit_bits:
+            return 'radix_sort_lsd', 'integers in range of {}'.format(
+                value_range)
+    if duplicates > 0.5:
+        return 'quick_sort', '{:.0%} sampled duplicates'.format(duplicates)
+    return 'quick_sort', 'unsorted items'
+
+
+def sort(items, key=None, reverse=False, algorithm=None, stable=False):
+    """Sort given items in place with the sorting function that choose_sort
+    expects to be fastest for them (by key(item) if key is given, and in
+    descending order if reverse is True), and log the choice and reason at
+    DEBUG level. If `algorithm` is given (a sorting function or its name in
+    SORTS), sort with it instead. If `stable` is True, only choose sorting
+    functions that keep items with equal keys in their original order, and
+    raise ValueError if the given sorting function does not.
+    Keys are computed once per item and choose_sort samples the keys.
+    Running time: O(n) to sample and check items, plus the running time of
+    the chosen sorting function."""
+    if algorithm is not None:
+        if not callable(algorithm):
+            algorithm = SORTS[algorithm]
+        if stable and not _is_stable(algorithm, items):
+            raise ValueError('{} is not a stable sort'
+                             .format(algorithm.__name__))
+        logger.debug('Sorting %d items with %s (given)', len(items),
+                     algorithm.__name__)
+        algorithm(items, key=key, reverse=reverse)
+        return
+    keys = items if key is None else [key(item) for item in items]
+    name, reason = choose_sort(keys, stable)
+    logger.debug('Sorting %d items with %s (%s)', len(items), name, reason)
+    algorithm = SORTS[name]
+    if key is None:
+        algorithm(items, reverse=reverse)
+        return
+    # Sort items decorated with their keys, which were computed for sampling
+    decorated = [_KeyedItem(number, item) for number, item in zip(keys, items)]
+    if algorithm in (counting_sort, bucket_sort, radix_sort_lsd,
+                     radix_sort_msd):
+        # These sorts need keys that are numbers or strings themselves
+        algorithm(decorated, key=_decorated_key, reverse=reverse)
+    elif reverse:
+        _sort_reversed(algorithm, decorated)
+    else:
+        algorithm(decorated)
+    items[:] = [keyed.item for keyed in decorated]
+
+
+def _decorated_key(keyed):
+    """Return the key of the given decorated item (see _KeyedItem)."""
+    return keyed.key
 
 
 def random_ints(count=20, min=1, max=50):
@@ -127,63 +1439,510 @@ def random_ints(count=20, min=1, max=50):
     return [random.randint(min, max) for _ in range(count)]
 
 
-def test_sorting(sort=bubble_sort, num_items=20, max_value=50):
-    """Test sorting algorithms with a small list of random items."""
-    # Create a list of items randomly sampled from range [1...max_value]
-    items = random_ints(num_items, 1, max_value)
-    print('Initial items: {!r}'.format(items))
-    print('Sorted order?  {!r}'.format(is_sorted(items)))
+class _OperationCounts(object):
+    """Counts of operations made by the sorting function being measured by
+    count_operations, which the proxy items and list below increment."""
+    comparisons = 0
+    writes = 0
+    swaps = 0
 
-    # Change this sort variable to the sorting algorithm you want to test
-    # sort = bubble_sort
-    print('Sorting items with {}(items)'.format(sort.__name__))
-    sort(items)
-    print('Sorted items:  {!r}'.format(items))
-    print('Sorted order?  {!r}'.format(is_sorted(items)))
 
+class _CountingInt(int):
+    """Integer that counts comparisons with it in _OperationCounts, and is
+    still an integer, so sorts that do arithmetic on numbers work on it."""
+    __slots__ = ()
 
-def main():
-    """Read command-line arguments and test sorting algorithms."""
-    import sys
-    args = sys.argv[1:]  # Ignore script file name
-
-    if len(args) == 0:
-        script = sys.argv[0]  # Get script file name
-        print('Usage: {} sort num max'.format(script))
-        print('Test sorting algorithm `sort` with a list of `num` integers')
-        print('    randomly sampled from the range [1...`max`] (inclusive)')
-        print('\nExample: {} bubble_sort 10 20'.format(script))
-        print('Initial items: [3, 15, 4, 7, 20, 6, 18, 11, 9, 7]')
-        print('Sorting items with bubble_sort(items)')
-        print('Sorted items:  [3, 4, 6, 7, 7, 9, 11, 15, 18, 20]')
-        return
-
-    # Get sort function by name
-    if len(args) >= 1:
-        sort_name = args[0]
-        # Terrible hack abusing globals
-        if sort_name in globals():
-            sort_function = globals()[sort_name]
+    def __lt__(self, other):
+        _OperationCounts.comparisons += 1
+        return int.__lt__(self, other)
+
+    def __gt__(self, other):
+        _OperationCounts.comparisons += 1
+        return int.__gt__(self, other)
+
+
+class _CountingFloat(float):
+    """Float that counts comparisons with it in _OperationCounts."""
+    __slots__ = ()
+
+    def __lt__(self, other):
+        _OperationCounts.comparisons += 1
+        return float.__lt__(self, other)
+
+    def __gt__(self, other):
+        _OperationCounts.comparisons += 1
+        return float.__gt__(self, other)
+
+
+class _CountingStr(str):
+    """String that counts comparisons with it in _OperationCounts, and is
+    still a string, so radix sorts can index its characters."""
+    __slots__ = ()
+
+    def __lt__(self, other):
+        _OperationCounts.comparisons += 1
+        return str.__lt__(self, other)
+
+    def __gt__(self, other):
+        _OperationCounts.comparisons += 1
+        return str.__gt__(self, other)
+
+
+class _CountingItem(object):
+    """Proxy for an item of any other type that counts comparisons with it
+    in _OperationCounts and compares the items it wraps."""
+    __slots__ = ('item',)
+
+    def __init__(self, item):
+        self.item = item
+
+    def __lt__(self, other):
+        _OperationCounts.comparisons += 1
+        return self.item < other.item
+
+    def __gt__(self, other):
+        _OperationCounts.comparisons += 1
+        return self.item > other.item
+
+
+class _CountingList(list):
+    """List that counts writes of items into it in _OperationCounts, and
+    counts a pair of writes that exchange two items (like `items[i],
+    items[j] = items[j], items[i]`) as a swap."""
+
+    def __init__(self, items):
+        list.__init__(self, items)
+        self.last_write = None  # (Written item, overwritten item) or None
+
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            value = list(value)
+            _OperationCounts.writes += len(value)
+            self.last_write = None
         else:
-            # Don't explode, just warn user and show list of sorting functions
-            print('Sorting function {!r} does not exist'.format(sort_name))
-            print('Available sorting functions:')
-            for name in globals():
-                if name.find('sort') >= 0:
-                    print('    {}'.format(name))
+            _OperationCounts.writes += 1
+            old_value = list.__getitem__(self, index)
+            last_write = self.last_write
+            if last_write is not None and value is last_write[1] and \
+                    old_value is last_write[0]:
+                # This write finishes exchanging two items
+                _OperationCounts.swaps += 1
+                self.last_write = None
+            else:
+                self.last_write = (value, old_value)
+        list.__setitem__(self, index, value)
+
+    def reverse(self):
+        _OperationCounts.writes += len(self)
+        self.last_write = None
+        list.reverse(self)
+
+
+# Proxy types for items of plain types, by the type of item they replace
+_COUNTING_TYPES = {int: _CountingInt, float: _CountingFloat,
+                   str: _CountingStr}
+
+
+def _counting_proxy(item):
+    """Return a proxy for the given item that counts comparisons with it."""
+    proxy = _COUNTING_TYPES.get(type(item), _CountingItem)
+    return proxy(item)
+
+
+def _without_proxy(item):
+    """Return the item that the given proxy replaces (or the given item if it
+    is not a proxy, like numbers that counting sort writes itself)."""
+    if type(item) is _CountingItem:
+        return item.item
+    for plain_type, proxy in _COUNTING_TYPES.items():
+        if type(item) is proxy:
+            return plain_type(item)
+    return item
+
+
+class SortStats(object):
+    """Counts of operations made by a sorting function, measured by
+    count_operations: comparisons between items, writes of items into the
+    list (including both writes of each swap), swaps of two items, maximum
+    depth of nested calls of functions in this module (which is recursion
+    depth plus helper calls) and peak bytes allocated while sorting."""
+
+    def __init__(self, comparisons=0, writes=0, swaps=0, max_depth=0,
+                 peak_bytes=0):
+        self.comparisons = comparisons
+        self.writes = writes
+        self.swaps = swaps
+        self.max_depth = max_depth
+        self.peak_bytes = peak_bytes
+
+    def __repr__(self):
+        """Return a string representation of these operation counts."""
+        return ('SortStats(comparisons={}, writes={}, swaps={}, '
+                'max_depth={}, peak_bytes={})'.format(
+                    self.comparisons, self.writes, self.swaps,
+                    self.max_depth, self.peak_bytes))
+
+    def as_dict(self):
+        """Return a dict of these operation counts by name."""
+        return {'comparisons': self.comparisons, 'writes': self.writes,
+                'swaps': self.swaps, 'max_depth': self.max_depth,
+                'peak_bytes': self.peak_bytes}
+
+
+def count_operations(sort, items, *args, **kwargs):
+    """Sort given list of items in place with the given sorting function
+    (called with any other given arguments) and return a SortStats of the
+    operations it made. Comparisons are counted by proxy items (subclasses
+    of int, float and str, or wrappers of other items) that are sorted in a
+    proxy list which counts writes and swaps (if a key function is given,
+    the keys it returns are proxies instead), call depth is measured with a
+    profiling hook (sys.setprofile) and peak memory with tracemalloc in a
+    separate run on a plain copy of items. Sorting functions themselves have
+    no instrumentation, so they run at full speed when they are not measured.
+    Running time: many times slower than the sorting function on its own."""
+    import sys
+    import tracemalloc
+    stats = SortStats()
+    # Measure peak memory allocated while sorting a plain copy of items
+    copy = list(items)
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    before = tracemalloc.get_traced_memory()[0]
+    sort(copy, *args, **kwargs)
+    stats.peak_bytes = max(0, tracemalloc.get_traced_memory()[1] - before)
+    if not was_tracing:
+        tracemalloc.stop()
+    del copy
+    key = kwargs.get('key')
+    if key is not None:
+        # Compare proxies for the keys of items, which are compared instead
+
+        def counting_key(item):
+            return _counting_proxy(key(item))
+        kwargs = dict(kwargs, key=counting_key)
+        proxies = _CountingList(items)
+        skipped_codes = _PROXY_CODES | {counting_key.__code__}
+    elif len(set(map(type, items))) <= 1:
+        proxies = _CountingList(map(_counting_proxy, items))
+        skipped_codes = _PROXY_CODES
+    else:
+        # Wrap items of mixed types, so they compare as they would unwrapped
+        proxies = _CountingList(map(_CountingItem, items))
+        skipped_codes = _PROXY_CODES
+    # Count nested calls of functions in this module, except proxy methods
+    module_file = count_operations.__code__.co_filename
+    depth = [0, 0]  # Current and maximum depth
+
+    def profile(frame, event, arg):
+        if frame.f_code.co_filename != module_file or \
+                frame.f_code in skipped_codes:
             return
+        if event == 'call':
+            depth[0] += 1
+            if depth[0] > depth[1]:
+                depth[1] = depth[0]
+        elif event == 'return':
+            depth[0] -= 1
 
-    # Get num_items and max_value, but don't explode if input is not an integer
+    _OperationCounts.comparisons = 0
+    _OperationCounts.writes = 0
+    _OperationCounts.swaps = 0
+    previous_profile = sys.getprofile()
+    sys.setprofile(profile)
     try:
-        num_items = int(args[1]) if len(args) >= 2 else 20
-        max_value = int(args[2]) if len(args) >= 3 else 50
-        # print('Num items: {}, max value: {}'.format(num_items, max_value))
-    except ValueError:
-        print('Integer required for `num` and `max` command-line arguments')
-        return
+        sort(proxies, *args, **kwargs)
+    finally:
+        sys.setprofile(previous_profile)
+    stats.comparisons = _OperationCounts.comparisons
+    stats.writes = _OperationCounts.writes
+    stats.swaps = _OperationCounts.swaps
+    stats.max_depth = depth[1]
+    # Write sorted items back into the given list without their proxies
+    items[:] = map(_without_proxy, proxies)
+    return stats
+
+
+# Code of proxy and comparison methods, whose calls are not counted in call
+# depth because they are not part of the sorting algorithm
+_PROXY_CODES = {method.__code__ for proxy in [
+    _CountingInt, _CountingFloat, _CountingStr, _CountingItem, _CountingList]
+    for method in vars(proxy).values() if hasattr(method, '__code__')} | \
+    {_counting_proxy.__code__, _without_proxy.__code__,
+     _KeyedItem.__init__.__code__, _KeyedItem.__lt__.__code__}
+
+
+# Public sorting functions that the dispatcher and benchmark can run, by name
+SORTS = {sort.__name__: sort for sort in [
+    bubble_sort, selection_sort, insertion_sort, split_sort_merge,
+    merge_sort, tim_sort, quick_sort, heap_sort, counting_sort, bucket_sort,
+    radix_sort_lsd, radix_sort_msd]}
+
+
+def copying_merge_sort(items):
+    """Sort given items in place with a textbook merge sort that splits them
+    into new lists and merges halves into new lists at every level, which
+    the benchmark runs as a baseline for merge_sort's single scratch buffer.
+    Running time: O(n log n) in all cases.
+    Memory usage: O(n log n) total allocation for new lists at every level."""
+    def sorted_copy(items):
+        if len(items) <= 1:
+            return items
+        middle = len(items) // 2
+        return merge(sorted_copy(items[:middle]), sorted_copy(items[middle:]))
+    items[:] = sorted_copy(items)
+
+
+def bottom_up_merge_sort(items):
+    """Sort given items in place with merge_sort without recursion."""
+    merge_sort(items, bottom_up=True)
+
+
+def radix_sort_lsd_8_bits(numbers):
+    """Sort given integers in place with radix_sort_lsd using 8-bit digits."""
+    radix_sort_lsd(numbers, digit_bits=8)
+
+
+def radix_sort_lsd_16_bits(numbers):
+    """Sort given integers in place with radix_sort_lsd using 16-bit digits."""
+    radix_sort_lsd(numbers, digit_bits=16)
+
 
-    # Test sort function
-    test_sorting(sort_function, num_items, max_value)
+# Sorting functions that only the benchmark runs, as baselines for sorting
+# functions in SORTS, by name
+BASELINE_SORTS = {sort.__name__: sort for sort in [
+    copying_merge_sort, bottom_up_merge_sort, radix_sort_lsd_8_bits,
+    radix_sort_lsd_16_bits]}
+# Every sorting function that the benchmark can run, by name
+BENCHMARK_SORTS = dict(SORTS, **BASELINE_SORTS)
+# Sorting functions that take O(n^2) time on most inputs, which the benchmark
+# skips for lists longer than its quadratic limit
+QUADRATIC_SORTS = {'bubble_sort', 'selection_sort', 'insertion_sort',
+                   'split_sort_merge'}
+# Sorting functions that allocate a count for every integer in the range of
+# items, which the benchmark skips for distributions in WIDE_DISTRIBUTIONS
+RANGE_SORTS = {'counting_sort'}
+# Fields of each benchmark result, in the order they are written
+BENCHMARK_FIELDS = ['algorithm', 'distribution', 'size', 'seconds',
+                    'comparisons', 'writes', 'swaps', 'max_depth',
+                    'peak_bytes']
+
+
+def _random_items(count, generator):
+    """Return `count` integers sampled at random from range [0...count-1]."""
+    return [generator.randrange(count) for _ in range(count)]
+
+
+def _sorted_items(count, generator):
+    """Return integers in range [0...count-1] in ascending order."""
+    return list(range(count))
+
+
+def _reversed_items(count, generator):
+    """Return integers in range [0...count-1] in descending order."""
+    return list(range(count - 1, -1, -1))
+
+
+def _few_unique_items(count, generator):
+    """Return `count` integers sampled at random from range [0...9]."""
+    return [generator.randrange(10) for _ in range(count)]
+
+
+def _organ_pipe_items(count, generator):
+    """Return `count` integers that ascend to the middle and then descend."""
+    half = count // 2
+    return list(range(half)) + list(range(count - half - 1, -1, -1))
+
+
+def _nearly_sorted_items(count, generator):
+    """Return integers in range [0...count-1] in ascending order except for
+    one random pair of items swapped per 100 items (at least one pair)."""
+    items = list(range(count))
+    if count > 1:
+        for _ in range(max(1, count // 100)):
+            i = generator.randrange(count)
+            j = generator.randrange(count)
+            items[i], items[j] = items[j], items[i]
+    return items
+
+
+def _wide_items(count, generator):
+    """Return `count` random 64-bit integers (like call ids), which take
+    eight 8-bit digits for radix sort."""
+    return [generator.getrandbits(64) for _ in range(count)]
+
+
+def _phone_number_items(count, generator):
+    """Return `count` random E.164 phone numbers as integers: a country code
+    followed by a ten-digit subscriber number."""
+    return [int('{}{}'.format(generator.choice(['1', '44', '49', '33']),
+                              generator.randint(10 ** 9, 10 ** 10 - 1)))
+            for _ in range(count)]
+
+
+# Functions that return a list of integers of a given size, by name
+DISTRIBUTIONS = {
+    'random': _random_items,
+    'sorted': _sorted_items,
+    'reversed': _reversed_items,
+    'few_unique': _few_unique_items,
+    'organ_pipe': _organ_pipe_items,
+    'nearly_sorted': _nearly_sorted_items,
+    'wide': _wide_items,
+    'phone_numbers': _phone_number_items,
+}
+# Distributions of integers in ranges far larger than their size
+WIDE_DISTRIBUTIONS = {'wide', 'phone_numbers'}
+
+
+def _phone_number_string(number):
+    """Return the given phone number integer as an E.164 string like
+    '+4915123456789'."""
+    return '+{}'.format(number)
+
+
+# Functions that turn integers from a distribution into the strings that
+# radix sort by characters is given, instead of zero-padded digits
+STRING_FORMATS = {'phone_numbers': _phone_number_string}
+
+
+def benchmark_sort(sort, items, repeat=1):
+    """Sort copies of given items with the given sorting function and return
+    a dict with the fastest time in seconds out of `repeat` runs, and the
+    counts of operations measured by count_operations (comparisons, writes,
+    swaps, maximum call depth and peak bytes allocated). Counting slows
+    sorting down, so operations are measured in separate runs.
+    Raise RuntimeError if the sorting function does not sort the items."""
+    import time
+    seconds = None
+    for _ in range(max(1, repeat)):
+        copy = list(items)
+        start = time.perf_counter()
+        sort(copy)
+        elapsed = time.perf_counter() - start
+        if seconds is None or elapsed < seconds:
+            seconds = elapsed
+    if not is_sorted(copy):
+        raise RuntimeError('{} did not sort items'.format(sort.__name__))
+    result = {'seconds': seconds}
+    result.update(count_operations(sort, list(items)).as_dict())
+    return result
+
+
+def run_benchmarks(sorts=None, sizes=(1000,), distributions=None, repeat=1,
+                   seed=0, quadratic_limit=5000):
+    """Benchmark the given sorting functions (names in BENCHMARK_SORTS, or
+    all of them) on lists of integers of the given sizes from the given
+    distributions (names in DISTRIBUTIONS, or all of them) and return a list
+    of results, which are dicts with the keys in BENCHMARK_FIELDS (see
+    benchmark_sort).
+    Lists are generated from the given random seed, so results of runs with
+    the same arguments are comparable. Sorts in QUADRATIC_SORTS are skipped
+    for sizes above `quadratic_limit`, and sorts in RANGE_SORTS for
+    distributions in WIDE_DISTRIBUTIONS. Radix sort by characters is given
+    the integers as strings formatted by STRING_FORMATS for their
+    distribution, or else as zero-padded strings, which are in the same
+    order."""
+    import random
+    if sorts is None:
+        sorts = list(BENCHMARK_SORTS)
+    if distributions is None:
+        distributions = list(DISTRIBUTIONS)
+    results = []
+    for size in sizes:
+        for distribution in distributions:
+            generator = random.Random('{}-{}-{}'.format(seed, distribution,
+                                                        size))
+            items = DISTRIBUTIONS[distribution](size, generator)
+            if distribution in STRING_FORMATS:
+                strings = list(map(STRING_FORMATS[distribution], items))
+            else:
+                width = len(str(max(items, default=0)))
+                strings = ['{:0{}d}'.format(item, width) for item in items]
+            for name in sorts:
+                if name in QUADRATIC_SORTS and size > quadratic_limit:
+                    continue
+                if name in RANGE_SORTS and distribution in WIDE_DISTRIBUTIONS:
+                    continue
+                sort = BENCHMARK_SORTS[name]
+                result = {'algorithm': name, 'distribution': distribution,
+                          'size': size}
+                result.update(benchmark_sort(
+                    sort, strings if sort is radix_sort_msd else items,
+                    repeat))
+                results.append(result)
+    return results
+
+
+def write_benchmark_results(results, output, format='table'):
+    """Write the given benchmark results (see run_benchmarks) to the given
+    file object in the given format: 'csv', 'json' or a 'table' of text."""
+    if format == 'csv':
+        import csv
+        writer = csv.DictWriter(output, BENCHMARK_FIELDS)
+        writer.writeheader()
+        writer.writerows(results)
+    elif format == 'json':
+        import json
+        json.dump(results, output, indent=2)
+        output.write('\n')
+    elif format == 'table':
+        row = ('{:<22} {:<14} {:>9} {:>10} {:>12} {:>12} {:>10} {:>9} '
+               '{:>12}\n')
+        output.write(row.format(*BENCHMARK_FIELDS))
+        for result in results:
+            output.write(row.format(
+                result['algorithm'], result['distribution'], result['size'],
+                '{:.6f}'.format(result['seconds']), result['comparisons'],
+                result['writes'], result['swaps'], result['max_depth'],
+                result['peak_bytes']))
+    else:
+        raise ValueError('Unknown benchmark format: {!r}'.format(format))
+
+
+def main():
+    """Read command-line arguments and benchmark sorting algorithms."""
+    import argparse
+    import sys
+    parser = argparse.ArgumentParser(
+        description='Benchmark sorting algorithms on lists of integers and '
+                    'report time, comparisons, writes, swaps, call depth '
+                    'and peak memory.')
+    parser.add_argument('sorts', nargs='*', metavar='sort',
+                        help='sorting functions to benchmark (default: all):'
+                             ' {}'.format(', '.join(BENCHMARK_SORTS)))
+    parser.add_argument('-n', '--sizes', nargs='+', type=int, default=[1000],
+                        help='list sizes (default: 1000)')
+    parser.add_argument('-d', '--distributions', nargs='+',
+                        choices=list(DISTRIBUTIONS),
+                        help='input distributions (default: all)')
+    parser.add_argument('-r', '--repeat', type=int, default=3,
+                        help='timed runs per benchmark, fastest is reported '
+                             '(default: 3)')
+    parser.add_argument('-f', '--format', choices=['table', 'csv', 'json'],
+                        default='table', help='output format (default: '
+                                              'table)')
+    parser.add_argument('-o', '--output',
+                        help='file to write results to (default: stdout)')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='random seed for input lists (default: 0)')
+    parser.add_argument('--quadratic-limit', type=int, default=5000,
+                        help='largest size to run O(n^2) sorts on '
+                             '(default: 5000)')
+    args = parser.parse_args()
+    unknown = [name for name in args.sorts if name not in BENCHMARK_SORTS]
+    if unknown:
+        parser.error('unknown sorting functions: {}'.format(
+            ', '.join(unknown)))
+    results = run_benchmarks(args.sorts or None, args.sizes,
+                             args.distributions, args.repeat, args.seed,
+                             args.quadratic_limit)
+    if args.output:
+        with open(args.output, 'w', newline='') as output:
+            write_benchmark_results(results, output, args.format)
+    else:
+        write_benchmark_results(results, sys.stdout, args.format)
 
 
 if __name__ == '__main__':
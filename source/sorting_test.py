@@ -1,14 +1,56 @@
 #!python
 
 from sorting import (is_sorted, bubble_sort, selection_sort, insertion_sort,
-                     merge_sort, random_ints)
+                     merge, split_sort_merge, merge_sort, quick_sort,
+                     heap_sort, tim_sort, partition, partition_three_way,
+                     counting_sort, bucket_sort, radix_sort_lsd,
+                     radix_sort_msd, random_ints, SORTS, DISTRIBUTIONS,
+                     BENCHMARK_FIELDS, benchmark_sort, run_benchmarks,
+                     write_benchmark_results, nth_element, quickselect,
+                     partial_sort, top_k, _select, count_operations,
+                     SortStats, choose_sort, BENCHMARK_SORTS,
+                     copying_merge_sort, STRING_FORMATS)
+import sorting
+import csv
+import enum
+import io
+import json
+import random
+import tracemalloc
 import unittest
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
 
 # Change this variable to the sort function you want to test
 sort = bubble_sort
 
 
+class Level(enum.IntEnum):
+    LOW = 0
+    HIGH = 1
+
+
+class Record(object):
+    """Item that compares only its key, so items with equal keys can be told
+    apart by their tag to check if a sorting algorithm is stable. Every
+    comparison is counted in the class attribute `comparisons`."""
+    comparisons = 0
+
+    def __init__(self, key, tag):
+        self.key = key
+        self.tag = tag
+
+    def __lt__(self, other):
+        Record.comparisons += 1
+        return self.key < other.key
+
+    def __repr__(self):
+        return 'Record({!r}, {!r})'.format(self.key, self.tag)
+
+
 class IsSortedTest(unittest.TestCase):
 
     def test_is_sorted_on_sorted_integers(self):
@@ -188,5 +230,726 @@ class StringSortTest(unittest.TestCase):
         assert items == sorted_items
 
 
+class QuickSortTest(unittest.TestCase):
+
+    def test_partition(self):
+        items = [5, 9, 1, 7, 3, 8, 2, 6, 4]
+        p = partition(items, 0, len(items) - 1)
+        assert items[p] == 4  # Median of first, middle and last: 5, 3, 4
+        assert all(item < items[p] for item in items[:p])
+        assert all(item >= items[p] for item in items[p + 1:])
+        assert sorted(items) == list(range(1, 10))
+
+    def test_partition_three_way(self):
+        items = [3, 5, 3, 1, 3, 7, 3, 2, 3]
+        lt, gt = partition_three_way(items, 0, len(items) - 1)
+        assert items[lt:gt + 1] == [3, 3, 3, 3, 3]
+        assert sorted(items[:lt]) == [1, 2]
+        assert sorted(items[gt + 1:]) == [5, 7]
+
+    def test_quick_sort_range(self):
+        items = [9, 8, 7, 6, 5, 4, 3, 2, 1]
+        quick_sort(items, 2, 6)
+        assert items == [9, 8, 3, 4, 5, 6, 7, 2, 1]
+
+    def test_quick_sort_on_adversarial_inputs(self):
+        # Inputs that make naive pivot choices take quadratic time or
+        # recurse once per item, which would exceed the recursion limit
+        size = 20000
+        inputs = [
+            list(range(size)),  # Sorted
+            list(range(size, 0, -1)),  # Reverse sorted
+            [7] * size,  # All duplicates
+            [item % 3 for item in range(size)],  # Few unique items
+            list(range(size // 2)) + list(range(size // 2, 0, -1)),  # Organ
+            random_ints(size, 1, size),
+        ]
+        for items in inputs:
+            sorted_items = sorted(items)
+            quick_sort(items)
+            assert items == sorted_items
+
+    def test_heap_sort(self):
+        for items in [[], [3], [5, 3], random_ints(100, 1, 20),
+                      'one fish two fish red fish blue fish'.split()]:
+            sorted_items = sorted(items)
+            heap_sort(items)
+            assert items == sorted_items
+
+
+class MergeSortTest(unittest.TestCase):
+
+    def test_merge(self):
+        assert merge([], []) == []
+        assert merge([1, 3, 5], []) == [1, 3, 5]
+        assert merge([], [2, 4]) == [2, 4]
+        assert merge([1, 3, 5], [2, 4, 6, 8]) == [1, 2, 3, 4, 5, 6, 8]
+        assert merge(['A', 'C'], ['B']) == ['A', 'B', 'C']
+
+    def test_split_sort_merge(self):
+        for items in [[], [3], [5, 3], random_ints(51, 1, 20)]:
+            sorted_items = sorted(items)
+            split_sort_merge(items)
+            assert items == sorted_items
+
+    def test_merge_sort_top_down_and_bottom_up(self):
+        for bottom_up in [False, True]:
+            for size in [0, 1, 2, 15, 16, 17, 33, 100, 1000, 4097]:
+                inputs = [random_ints(size, 1, size + 1),
+                          list(range(size)), list(range(size, 0, -1))]
+                for items in inputs:
+                    sorted_items = sorted(items)
+                    merge_sort(items, bottom_up=bottom_up)
+                    assert items == sorted_items
+
+    def test_merge_sort_is_stable(self):
+        for bottom_up in [False, True]:
+            items = [Record(random.randint(1, 10), tag) for tag in range(500)]
+            merge_sort(items, bottom_up=bottom_up)
+            pairs = [(item.key, item.tag) for item in items]
+            assert pairs == sorted(pairs)
+
+    def test_merge_sort_allocates_one_buffer(self):
+        size = 5000
+        for bottom_up in [False, True]:
+            items = random_ints(size, 1, size)
+            tracemalloc.start()
+            merge_sort(items, bottom_up=bottom_up)
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            # Peak is the scratch buffer of size/2 references (8 bytes each
+            # on 64-bit builds), far less than one copy of the whole list
+            assert peak < size * 8 * 0.6
+            assert is_sorted(items)
+
+
+class CountingBucketSortTest(unittest.TestCase):
+
+    def test_counting_sort_mutates_input(self):
+        for stable in [False, True]:
+            for items in [[], [3], [5, 3], [3, 3, 3], random_ints(100, 1, 10),
+                          random_ints(100, -50, 50), random_ints(50, 1, 1000)]:
+                sorted_items = sorted(items)
+                result = counting_sort(items, stable=stable)
+                assert result is None  # Sorted in place, no output list
+                assert items == sorted_items
+
+    def test_counting_sort_stable(self):
+        # Distinct but equal integer objects keep their original order
+        items = [10 ** 20 + key for key in random_ints(100, 1, 5)]
+        originals = list(items)
+        counting_sort(items, stable=True)
+        assert items == sorted(originals)
+        for key in range(1, 6):
+            equal = [item for item in originals if item == 10 ** 20 + key]
+            placed = [item for item in items if item == 10 ** 20 + key]
+            assert all(a is b for a, b in zip(equal, placed))
+
+    def test_counting_sort_keeps_bools_and_enums(self):
+        items = [True, 1, False, 0]
+        counting_sort(items)
+        assert [type(item) for item in items] == [bool, int, bool, int]
+        assert items == [False, 0, True, 1]
+        items = [Level.HIGH, 1, Level.LOW, 0]
+        sorting.sort(items, algorithm='counting_sort', stable=True)
+        assert [type(item) for item in items] == [Level, int, Level, int]
+
+    def test_bucket_sort_mutates_input(self):
+        for items in [[], [3], [5, 3], [3, 3, 3], random_ints(100, 1, 10),
+                      random_ints(100, -50, 50), random_ints(500, 1, 10 ** 9),
+                      [random.random() * 10 - 5 for _ in range(200)],
+                      [0] * 50 + [10 ** 6] * 50]:
+            sorted_items = sorted(items)
+            result = bucket_sort(items)
+            assert result is None  # Sorted in place, no output list
+            assert items == sorted_items
+
+    def test_bucket_sort_with_num_buckets(self):
+        for num_buckets in [1, 2, 10, 1000]:
+            items = random_ints(300, 1, 100)
+            sorted_items = sorted(items)
+            bucket_sort(items, num_buckets)
+            assert items == sorted_items
+
+
+class RadixSortTest(unittest.TestCase):
+
+    def test_radix_sort_lsd(self):
+        for digit_bits in [None, 1, 3, 8, 16]:
+            for items in [[], [3], [5, 3], [3, 3, 3], random_ints(100, 1, 10),
+                          random_ints(100, -1000, 1000),
+                          [random.getrandbits(64) for _ in range(200)],
+                          [random.getrandbits(64) - 2 ** 63
+                           for _ in range(200)]]:
+                sorted_items = sorted(items)
+                radix_sort_lsd(items, digit_bits)
+                assert items == sorted_items
+
+    def test_radix_sort_msd(self):
+        phone_numbers = ['+{}{}'.format(random.choice(['1', '44', '49']),
+                                        random.randint(10 ** 9, 10 ** 10 - 1))
+                         for _ in range(500)]
+        for items in [[], ['A'], ['B', 'A'], ['', 'A', '', 'AA', 'A'],
+                      'one fish two fish red fish blue fish'.split(),
+                      'Doc Grumpy Happy Sleepy Bashful Sneezy Dopey'.split(),
+                      phone_numbers, ['caf\u00e9', 'cafe', 'caf\u00e8'] * 10,
+                      ['prefix' * 500 + str(n) for n in range(100)]]:
+            sorted_items = sorted(items)
+            radix_sort_msd(items)
+            assert items == sorted_items
+
+
+class TimSortTest(unittest.TestCase):
+
+    def test_tim_sort_on_various_inputs(self):
+        for size in [0, 1, 2, 10, 63, 64, 65, 100, 1000, 5000]:
+            half = size // 2
+            inputs = [
+                random_ints(size, 1, size + 1),
+                list(range(size)),
+                list(range(size, 0, -1)),
+                random_ints(size, 1, 3),
+                sorted(random_ints(half, 1, size + 1)) +
+                sorted(random_ints(size - half, 1, size + 1)),
+            ]
+            for items in inputs:
+                sorted_items = sorted(items)
+                tim_sort(items)
+                assert items == sorted_items
+
+    def test_tim_sort_is_stable(self):
+        items = [Record(random.randint(1, 10), tag) for tag in range(2000)]
+        tim_sort(items)
+        pairs = [(item.key, item.tag) for item in items]
+        assert pairs == sorted(pairs)
+
+    def test_tim_sort_is_adaptive(self):
+        # Sorted and reverse sorted items need only one comparison per item
+        for keys in [range(1000), range(1000, 0, -1)]:
+            items = [Record(key, None) for key in keys]
+            Record.comparisons = 0
+            tim_sort(items)
+            assert Record.comparisons == 999
+        # Nearly sorted items need far fewer than n log n comparisons
+        keys = list(range(10000))
+        for _ in range(10):
+            i, j = random.randrange(10000), random.randrange(10000)
+            keys[i], keys[j] = keys[j], keys[i]
+        items = [Record(key, None) for key in keys]
+        Record.comparisons = 0
+        tim_sort(items)
+        assert [item.key for item in items] == list(range(10000))
+        assert Record.comparisons < 3 * 10000
+
+
+def record_key(record):
+    """Return the integer key of the given record."""
+    return record.key
+
+
+def record_key_string(record):
+    """Return the key of the given record as a string."""
+    return str(record.key)
+
+
+# Every public sorting function, with a key function for items that are
+# records (integer keys, or string keys for radix sort by characters)
+KEYED_SORTS = [
+    (bubble_sort, record_key),
+    (selection_sort, record_key),
+    (insertion_sort, record_key),
+    (split_sort_merge, record_key),
+    (merge_sort, record_key),
+    (tim_sort, record_key),
+    (quick_sort, record_key),
+    (heap_sort, record_key),
+    (counting_sort, record_key),
+    (bucket_sort, record_key),
+    (radix_sort_lsd, record_key),
+    (radix_sort_msd, record_key_string),
+]
+
+
+class KeyReverseStabilityTest(unittest.TestCase):
+
+    def test_sorts_with_key_and_reverse(self):
+        for sort, key in KEYED_SORTS:
+            for reverse in [False, True]:
+                records = [Record(number, tag) for tag, number
+                           in enumerate(random_ints(200, -20, 20))]
+                # Compare only keys, because unstable sorts may reorder
+                # records with equal keys
+                expected = [key(record) for record in
+                            sorted(records, key=key, reverse=reverse)]
+                sort(records, key=key, reverse=reverse)
+                assert [key(record) for record in records] == expected, \
+                    (sort.__name__, reverse)
+
+    def test_sorts_with_reverse_only(self):
+        for sort, key in KEYED_SORTS:
+            items = random_ints(100, 1, 50)
+            if sort is radix_sort_msd:
+                items = [str(item) for item in items]
+            expected = sorted(items, reverse=True)
+            sort(items, reverse=True)
+            assert items == expected, sort.__name__
+
+    def test_sorts_compute_each_key_once(self):
+        for sort, key in KEYED_SORTS:
+            calls = []
+
+            def counting_key(record):
+                calls.append(record)
+                return key(record)
+            records = [Record(number, tag) for tag, number
+                       in enumerate(random_ints(100, 1, 30))]
+            sort(records, key=counting_key, reverse=True)
+            assert len(calls) == 100, sort.__name__
+
+    def test_sorts_with_key_never_compare_items(self):
+        # Records are only compared by their keys, not with each other
+        for sort, key in KEYED_SORTS:
+            records = [Record(number, tag) for tag, number
+                       in enumerate(random_ints(100, 1, 30))]
+            Record.comparisons = 0
+            sort(records, key=key)
+            assert Record.comparisons == 0, sort.__name__
+
+    def test_quick_sort_range_with_key(self):
+        items = list(range(20))
+        quick_sort(items, 5, 14, key=lambda item: -item)
+        assert items == (list(range(5)) + list(range(14, 4, -1)) +
+                         list(range(15, 20)))
+
+    def test_stability_matrix(self):
+        # Stable sorts keep records with equal keys in their original order
+        # (by tag) every time, and unstable sorts reorder some of them
+        expected_stable = {
+            bubble_sort: True, selection_sort: False, insertion_sort: True,
+            split_sort_merge: True, merge_sort: True, tim_sort: True,
+            quick_sort: False, heap_sort: False, counting_sort: True,
+            bucket_sort: False, radix_sort_lsd: True, radix_sort_msd: True,
+        }
+        generator = random.Random(3)
+        for sort, key in KEYED_SORTS:
+            assert sort.stable is expected_stable[sort], sort.__name__
+            kept_order = True
+            for trial in range(20):
+                for reverse in [False, True]:
+                    records = [Record(generator.randint(1, 10), tag)
+                               for tag in range(100)]
+                    sort(records, key=key, reverse=reverse)
+                    # sorted is stable, so it gives the expected tag order
+                    expected = sorted(records, key=lambda record:
+                                      record.tag)
+                    expected.sort(key=key, reverse=reverse)
+                    if [record.tag for record in records] != \
+                            [record.tag for record in expected]:
+                        kept_order = False
+            assert kept_order is sort.stable, sort.__name__
+
+
+class SelectionTest(unittest.TestCase):
+
+    def inputs(self, size):
+        half = size // 2
+        return [random_ints(size, 1, size), random_ints(size, 1, 3),
+                list(range(size)), list(range(size, 0, -1)), [7] * size,
+                list(range(half)) + list(range(size - half, 0, -1))]
+
+    def test_quickselect(self):
+        for size in [1, 2, 5, 16, 17, 100, 501]:
+            for items in self.inputs(size):
+                expected = sorted(items)
+                for k in [0, size // 3, size // 2, size - 1]:
+                    copy = list(items)
+                    assert quickselect(copy, k) == expected[k]
+                    # Items are partitioned around the kth smallest item
+                    assert all(item <= copy[k] for item in copy[:k])
+                    assert all(item >= copy[k] for item in copy[k + 1:])
+                    assert sorted(copy) == expected
+
+    def test_nth_element_with_key(self):
+        records = [Record(key, tag) for tag, key
+                   in enumerate(random_ints(100, 1, 20))]
+        expected = sorted(record.key for record in records)
+        Record.comparisons = 0
+        nth_element(records, 50, key=lambda record: record.key)
+        assert Record.comparisons == 0  # Only keys are compared
+        assert records[50].key == expected[50]
+
+    def test_nth_element_with_index_out_of_range(self):
+        with self.assertRaises(IndexError):
+            nth_element([], 0)
+        with self.assertRaises(IndexError):
+            nth_element([3, 1, 2], 3)
+
+    def test_quickselect_makes_linear_comparisons(self):
+        # Median of medians bounds comparisons by a constant times n
+        for size in [1000, 4000]:
+            for items in self.inputs(size):
+                records = [Record(key, tag) for tag, key in enumerate(items)]
+                Record.comparisons = 0
+                quickselect(records, size // 2)
+                assert Record.comparisons < 30 * size
+
+    def test_partial_sort(self):
+        for size in [0, 1, 5, 100, 300]:
+            for items in self.inputs(size):
+                expected = sorted(items)
+                for k in [0, 1, size // 10, size, size + 5]:
+                    copy = list(items)
+                    partial_sort(copy, k)
+                    assert copy[:k] == expected[:k]
+                    assert sorted(copy) == expected
+
+    def test_partial_sort_with_key(self):
+        routes = [('route{}'.format(index), cost) for index, cost
+                  in enumerate(random_ints(1000, 1, 10000))]
+
+        def cost(route):
+            return route[1]
+        partial_sort(routes, 100, key=cost)
+        assert [cost(route) for route in routes[:100]] == \
+            sorted(cost(route) for route in routes)[:100]
+
+    def test_top_k(self):
+        for size in [0, 1, 5, 100, 300]:
+            for items in self.inputs(size):
+                expected = sorted(items)
+                for k in [0, 1, size // 10, size, size + 5]:
+                    # Items are read from an iterator only once
+                    assert top_k(iter(items), k) == expected[:k]
+
+    def test_top_k_with_key_keeps_first_equal_items(self):
+        records = [Record(key, tag) for tag, key in enumerate([3, 1, 2, 1, 1])]
+        result = top_k(records, 2, key=lambda record: record.key)
+        assert sorted(record.tag for record in result) == [1, 3]
+
+    def test_select_with_median_of_medians_pivots(self):
+        # A depth limit of 0 uses median of medians pivots from the start
+        for size in [1, 5, 6, 26, 1000]:
+            for items in self.inputs(size):
+                expected = sorted(items)
+                records = [Record(key, tag) for tag, key in enumerate(items)]
+                Record.comparisons = 0
+                _select(records, 0, size - 1, size // 2, 0)
+                assert records[size // 2].key == expected[size // 2]
+                assert Record.comparisons < 30 * size
+
+
+class CountOperationsTest(unittest.TestCase):
+
+    def test_count_operations_sorts_items(self):
+        for sort in SORTS.values():
+            items = random_ints(50, 1, 20)
+            if sort is radix_sort_msd:
+                items = [str(item) for item in items]
+            expected = sorted(items)
+            stats = count_operations(sort, items)
+            assert isinstance(stats, SortStats)
+            # Items are sorted and have their own types, not proxy types
+            assert items == expected, sort.__name__
+            assert all(type(item) is type(expected[0]) for item in items)
+
+    def test_count_operations_on_insertion_sort(self):
+        # Reversed items are compared and shifted past every other item
+        stats = count_operations(insertion_sort, [4, 3, 2, 1, 0])
+        assert stats.comparisons == 10
+        assert stats.writes == 14  # 10 shifts and 4 insertions
+        # Shifting 4 and inserting 3 in front of it exchanges them
+        assert stats.swaps == 1
+        assert stats.max_depth == 2  # insertion_sort calls a helper
+
+    def test_count_operations_counts_swaps(self):
+        # Selection sort swaps each minimum item into place, even with itself
+        stats = count_operations(selection_sort, [3, 2, 1])
+        assert stats.comparisons == 3
+        assert stats.swaps == 2
+        assert stats.writes == 4
+        # Bubble sort on reversed items swaps every pair
+        stats = count_operations(bubble_sort, [4, 3, 2, 1, 0])
+        assert stats.swaps == 10
+        assert stats.writes == 20
+
+    def test_count_operations_measures_call_depth(self):
+        # Recursive merge sort splits 1000 items about 6 times before ranges
+        # are small enough for insertion sort
+        stats = count_operations(merge_sort, random_ints(1000, 1, 1000))
+        assert 7 <= stats.max_depth <= 10
+        stats = count_operations(merge_sort, random_ints(1000, 1, 1000),
+                                 bottom_up=True)
+        assert stats.max_depth <= 4
+        assert count_operations(bubble_sort, [2, 1]).max_depth == 1
+
+    def test_count_operations_measures_memory(self):
+        stats = count_operations(merge_sort, random_ints(1000, 1, 1000))
+        # Merge sort allocates a buffer of 500 item references
+        assert stats.peak_bytes >= 500 * 8
+        stats = count_operations(heap_sort, random_ints(1000, 1, 1000))
+        assert stats.peak_bytes < 500 * 8
+
+    def test_count_operations_with_key_counts_key_comparisons(self):
+        records = [Record(key, tag) for tag, key
+                   in enumerate(random_ints(100, 1, 20))]
+        Record.comparisons = 0
+        stats = count_operations(merge_sort, records,
+                                 key=lambda record: record.key)
+        assert Record.comparisons == 0
+        assert stats.comparisons > 0
+        assert [record.key for record in records] == \
+            sorted(record.key for record in records)
+
+    def test_count_operations_on_mixed_types(self):
+        items = [3, 2.5, 1, 0.5]
+        stats = count_operations(insertion_sort, items)
+        assert items == [0.5, 1, 2.5, 3]
+        assert stats.comparisons == 6
+
+
+class SortDispatcherTest(unittest.TestCase):
+
+    def test_choose_sort(self):
+        size = 1000
+        assert choose_sort([3, 1, 2])[0] == 'insertion_sort'
+        assert choose_sort(list(range(size)))[0] == 'tim_sort'
+        assert choose_sort(list(range(size, 0, -1)))[0] == 'tim_sort'
+        assert choose_sort(random_ints(size, 1, size))[0] == 'counting_sort'
+        assert choose_sort(random_ints(size, 1, 50 * size))[0] == \
+            'radix_sort_lsd'
+        assert choose_sort(random_ints(size, 1, 2 ** 62))[0] == 'quick_sort'
+        assert choose_sort([random.random() for _ in range(size)])[0] == \
+            'quick_sort'
+        assert choose_sort([str(item) for item in
+                            random_ints(size, 1, 3)])[0] == 'quick_sort'
+        # Unhashable items are sorted too
+        assert choose_sort([[item] for item in
+                            random_ints(size, 1, 2 ** 62)])[0] == 'quick_sort'
+
+    def test_choose_sort_stable(self):
+        size = 1000
+        assert choose_sort(random_ints(size, 1, 2 ** 62), stable=True)[0] \
+            == 'merge_sort'
+        assert choose_sort(random_ints(size, 1, size), stable=True)[0] == \
+            'counting_sort'
+
+    def test_sort_on_various_inputs(self):
+        size = 1000
+        for items in [[], [3], [3, 1, 2], list(range(size)),
+                      list(range(size, 0, -1)), random_ints(size, 1, size),
+                      random_ints(size, -size, 50 * size),
+                      random_ints(size, 1, 2 ** 62), random_ints(size, 1, 3),
+                      [random.random() for _ in range(size)],
+                      [str(item) for item in random_ints(size, 1, size)]]:
+            for reverse in [False, True]:
+                copy = list(items)
+                sorting.sort(copy, reverse=reverse)
+                assert copy == sorted(items, reverse=reverse)
+
+    def test_sort_with_key_computes_keys_once(self):
+        for max_key in [10, 10 ** 6, 2 ** 62]:
+            records = [Record(key, tag) for tag, key
+                       in enumerate(random_ints(500, 1, max_key))]
+            calls = []
+
+            def key(record):
+                calls.append(record)
+                return record.key
+            for reverse in [False, True]:
+                del calls[:]
+                copy = list(records)
+                sorting.sort(copy, key=key, reverse=reverse, stable=True)
+                assert len(calls) == 500
+                assert copy == sorted(records, key=key, reverse=reverse)
+
+    def test_sort_logs_and_overrides_choice(self):
+        items = random_ints(1000, 1, 1000)
+        with self.assertLogs('sorting', 'DEBUG') as logs:
+            sorting.sort(list(items))
+            sorting.sort(list(items), algorithm='heap_sort')
+            sorting.sort(list(items), algorithm=merge_sort)
+        assert 'counting_sort' in logs.output[0]
+        assert 'heap_sort (given)' in logs.output[1]
+        assert 'merge_sort (given)' in logs.output[2]
+        copy = list(items)
+        sorting.sort(copy, algorithm='bubble_sort', reverse=True)
+        assert copy == sorted(items, reverse=True)
+
+    def test_sort_with_given_algorithm_and_stable(self):
+        records = [Record(key, tag) for tag, key
+                   in enumerate(random_ints(500, 1, 10))]
+        copy = list(records)
+        sorting.sort(copy, key=record_key, algorithm='merge_sort',
+                     stable=True)
+        assert [record.tag for record in copy] == \
+            [record.tag for record in sorted(records, key=record_key)]
+        for algorithm in ['heap_sort', quick_sort, 'bucket_sort']:
+            copy = list(records)
+            with self.assertRaises(ValueError):
+                sorting.sort(copy, key=record_key, algorithm=algorithm,
+                             stable=True)
+            assert copy == records  # Items were not sorted
+
+
+class BenchmarkTest(unittest.TestCase):
+
+    def test_distributions(self):
+        generator = random.Random(0)
+        for name, distribution in DISTRIBUTIONS.items():
+            for size in [0, 1, 2, 101]:
+                items = distribution(size, generator)
+                assert len(items) == size, name
+        assert DISTRIBUTIONS['sorted'](5, generator) == [0, 1, 2, 3, 4]
+        assert DISTRIBUTIONS['reversed'](5, generator) == [4, 3, 2, 1, 0]
+        assert DISTRIBUTIONS['organ_pipe'](5, generator) == [0, 1, 2, 1, 0]
+        assert len(set(DISTRIBUTIONS['few_unique'](1000, generator))) <= 10
+        items = DISTRIBUTIONS['nearly_sorted'](1000, generator)
+        assert sorted(items) == list(range(1000))
+        assert sum(1 for index, item in enumerate(items)
+                   if item != index) <= 20
+        assert all(0 <= item < 2 ** 64
+                   for item in DISTRIBUTIONS['wide'](100, generator))
+        assert all(11 <= len(str(item)) <= 12 for item
+                   in DISTRIBUTIONS['phone_numbers'](100, generator))
+        assert STRING_FORMATS['phone_numbers'](4915123456789) == \
+            '+4915123456789'
+
+    def test_benchmark_sort_counts(self):
+        # Insertion sort on reversed items compares and shifts every pair
+        result = benchmark_sort(insertion_sort, [4, 3, 2, 1, 0])
+        assert result['comparisons'] == 10
+        assert result['writes'] == 14  # 10 shifts and 4 insertions
+        assert result['seconds'] >= 0
+        assert result['peak_bytes'] >= 0
+        # Bubble sort on sorted items makes one pass and no writes
+        result = benchmark_sort(bubble_sort, [0, 1, 2, 3, 4])
+        assert result['comparisons'] == 4
+        assert result['writes'] == 0
+
+    def test_benchmark_sort_rejects_broken_sort(self):
+        with self.assertRaises(RuntimeError):
+            benchmark_sort(lambda items: None, [2, 1])
+
+    def test_run_benchmarks(self):
+        results = run_benchmarks(sizes=[30, 60], repeat=1,
+                                 quadratic_limit=40)
+        # Quadratic sorts are skipped for size 60, and counting sort for
+        # both sizes of the two wide distributions
+        assert len(results) == \
+            2 * len(DISTRIBUTIONS) * len(BENCHMARK_SORTS) - \
+            len(DISTRIBUTIONS) * 4 - 2 * 2
+        assert not any(result['algorithm'] == 'counting_sort' and
+                       result['distribution'] == 'wide'
+                       for result in results)
+        for result in results:
+            assert sorted(result) == sorted(BENCHMARK_FIELDS)
+            assert result['algorithm'] in BENCHMARK_SORTS
+        results = run_benchmarks(['merge_sort'], [10], ['sorted'])
+        assert len(results) == 1
+        # Insertion sort (for so few items) compares each adjacent pair once
+        assert results[0]['comparisons'] == 9
+
+    def test_copying_merge_sort_baseline(self):
+        items = random_ints(1000, 1, 1000)
+        copy = list(items)
+        copying_merge_sort(copy)
+        assert copy == sorted(items)
+        results = run_benchmarks(['merge_sort', 'copying_merge_sort',
+                                  'bottom_up_merge_sort'], [1000], ['random'])
+        peak_bytes = {result['algorithm']: result['peak_bytes']
+                      for result in results}
+        # Splitting into new lists allocates more than one scratch buffer
+        assert peak_bytes['copying_merge_sort'] > peak_bytes['merge_sort']
+        assert peak_bytes['copying_merge_sort'] > \
+            peak_bytes['bottom_up_merge_sort']
+
+    def test_write_benchmark_results(self):
+        results = run_benchmarks(['merge_sort', 'radix_sort_msd'], [20],
+                                 ['random', 'few_unique'])
+        output = io.StringIO()
+        write_benchmark_results(results, output, 'csv')
+        rows = list(csv.DictReader(io.StringIO(output.getvalue())))
+        assert [row['algorithm'] for row in rows] == \
+            ['merge_sort', 'radix_sort_msd'] * 2
+        assert rows[0]['size'] == '20'
+        output = io.StringIO()
+        write_benchmark_results(results, output, 'json')
+        assert json.loads(output.getvalue()) == results
+        output = io.StringIO()
+        write_benchmark_results(results, output, 'table')
+        assert len(output.getvalue().splitlines()) == 5
+        with self.assertRaises(ValueError):
+            write_benchmark_results(results, output, 'xml')
+
+
+@unittest.skipIf(numpy is None, 'NumPy is not installed')
+class NumPySortTest(unittest.TestCase):
+
+    def test_is_sorted_on_arrays(self):
+        assert is_sorted(numpy.array([], dtype=numpy.int64)) is True
+        assert is_sorted(numpy.array([3, 3, 5, 7])) is True
+        assert is_sorted(numpy.array([3, 5, 3])) is False
+        assert is_sorted(numpy.array([7, 5, 5, 3]), reverse=True) is True
+
+    def test_sorts_on_integer_arrays(self):
+        for sort in [counting_sort, bucket_sort, radix_sort_lsd]:
+            for dtype in [numpy.int8, numpy.int64, numpy.uint16]:
+                for reverse in [False, True]:
+                    minimum = 0 if dtype is numpy.uint16 else -100
+                    items = numpy.array(random_ints(500, minimum, 100),
+                                        dtype=dtype)
+                    expected = numpy.sort(items)
+                    if reverse:
+                        expected = expected[::-1]
+                    sort(items, reverse=reverse)
+                    assert items.dtype == dtype
+                    assert (items == expected).all(), sort.__name__
+
+    def test_radix_sort_lsd_on_extreme_integer_arrays(self):
+        items = numpy.array([2 ** 63 - 1, -2 ** 63, 0, -5, 7])
+        radix_sort_lsd(items)
+        assert items.tolist() == [-2 ** 63, -5, 0, 7, 2 ** 63 - 1]
+        items = numpy.array([2 ** 64 - 1, 0, 2 ** 63, 5], dtype=numpy.uint64)
+        radix_sort_lsd(items)
+        assert items.tolist() == [0, 5, 2 ** 63, 2 ** 64 - 1]
+
+    def test_bucket_sort_on_float_arrays(self):
+        items = numpy.array([random.uniform(-1, 1) for _ in range(500)])
+        expected = numpy.sort(items)
+        bucket_sort(items)
+        assert (items == expected).all()
+
+    def test_integer_sorts_reject_float_arrays(self):
+        for sort in [counting_sort, radix_sort_lsd]:
+            items = numpy.array([1.5, 0.5, 2.7, 2.2])
+            with self.assertRaises(TypeError):
+                sort(items)
+            assert items.tolist() == [1.5, 0.5, 2.7, 2.2]  # Unchanged
+            indexes = numpy.arange(3)
+            with self.assertRaises(TypeError):
+                sort(indexes, key=lambda index: [1.7, 1.2, 0.3][index])
+            assert indexes.tolist() == [0, 1, 2]
+
+    def test_stable_sorts_with_key_on_arrays(self):
+        keys = random_ints(300, 0, 9)
+        for sort in [counting_sort, radix_sort_lsd]:
+            indexes = numpy.arange(300)
+            sort(indexes, key=lambda index: keys[index])
+            assert indexes.tolist() == sorted(range(300),
+                                              key=lambda index: keys[index])
+
+    def test_stable_sort_of_float_arrays_is_vectorized(self):
+        items = numpy.array([random.uniform(-1, 1) for _ in range(500)])
+        assert choose_sort(items, stable=True)[0] == 'bucket_sort'
+        expected = numpy.sort(items)
+        with self.assertLogs('sorting', 'DEBUG') as logs:
+            sorting.sort(items, stable=True)
+            sorting.sort(items, algorithm='bucket_sort', stable=True)
+        assert 'bucket_sort' in logs.output[0]
+        assert (items == expected).all()
+        # Sorting a list of floats stably still avoids bucket sort
+        assert choose_sort(items.tolist(), stable=True)[0] != 'bucket_sort'
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -1,26 +1,520 @@
 #!python
 
-def contains(text, pattern):
+from array import array
+from collections import deque
+import mmap
+
+# Names of string search engines that Pattern can use: 'native' uses the
+# str.find method (written in C), and the others are implemented below
+ENGINES = ('native', 'kmp', 'horspool', 'two_way')
+# Number of characters (or bytes) read at a time by streaming searches
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+
+def contains(text, pattern, engine='auto'):
     """Return a boolean indicating whether pattern occurs in text."""
     assert isinstance(text, str), 'text is not a string: {}'.format(text)
-    assert isinstance(pattern, str), 'pattern is not a string: {}'.format(text)
-    # TODO: Implement contains here (iteratively and/or recursively)
+    assert isinstance(pattern, str), \
+        'pattern is not a string: {}'.format(pattern)
+    return Pattern(pattern, engine).contains(text)
 
 
-def find_index(text, pattern):
+def find_index(text, pattern, engine='auto'):
     """Return the starting index of the first occurrence of pattern in text,
     or None if not found."""
     assert isinstance(text, str), 'text is not a string: {}'.format(text)
-    assert isinstance(pattern, str), 'pattern is not a string: {}'.format(text)
-    # TODO: Implement find_index here (iteratively and/or recursively)
+    assert isinstance(pattern, str), \
+        'pattern is not a string: {}'.format(pattern)
+    return Pattern(pattern, engine).search(text)
 
 
-def find_all_indexes(text, pattern):
+def find_all_indexes(text, pattern, engine='auto'):
     """Return a list of starting indexes of all occurrences of pattern in text,
     or an empty list if not found."""
     assert isinstance(text, str), 'text is not a string: {}'.format(text)
-    assert isinstance(pattern, str), 'pattern is not a string: {}'.format(text)
-    # TODO: Implement find_all_indexes here (iteratively and/or recursively)
+    assert isinstance(pattern, str), \
+        'pattern is not a string: {}'.format(pattern)
+    return Pattern(pattern, engine).find_all(text)
+
+
+def find_all_indexes_stream(source, pattern, chunk_size=DEFAULT_CHUNK_SIZE,
+                            engine='auto'):
+    """Yield the starting index of each occurrence of pattern in the text of
+    source, read in chunks of chunk_size characters so the whole text is
+    never in memory at once. Source can be a file object (text or binary,
+    with str or bytes pattern to match), an mmap, a str or bytes, or an
+    iterable of str or bytes chunks. Indexes are counted from the start of
+    the text (in bytes for binary sources) and include occurrences that span
+    chunk boundaries.
+    Running time: O(n) for n characters of text with the kmp or two_way
+    engine (or native, in practice).
+    Memory usage: O(chunk_size + m) for a pattern of m characters."""
+    compiled = Pattern(pattern, engine)
+    if (compiled.engine == 'native' and pattern and
+            isinstance(source, mmap.mmap)):
+        # Search the mapping in place, which reads no more than the pages
+        # it needs and copies nothing
+        yield from _native_search(source, pattern, 0)
+        return
+    # Keep the last m-1 characters of each window searched before the next
+    # chunk: an occurrence that starts in them must end in the next chunk,
+    # so no occurrence is found twice
+    overlap = len(pattern) - 1
+    tail = None
+    window_start = 0  # Index of the first character of the window in text
+    for chunk in _read_chunks(source, chunk_size):
+        window = chunk if tail is None else tail + chunk
+        for index in compiled.finditer(window):
+            yield window_start + index
+        tail = window[max(0, len(window) - overlap):]
+        window_start += len(window) - len(tail)
+
+
+def _read_chunks(source, chunk_size):
+    """Yield chunks of the text of source (as described in
+    find_all_indexes_stream) of up to chunk_size characters."""
+    if isinstance(source, (str, bytes, bytearray, mmap.mmap)):
+        for start in range(0, len(source), chunk_size):
+            yield source[start:start + chunk_size]
+    elif hasattr(source, 'read'):
+        while True:
+            chunk = source.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+    else:
+        yield from source
+
+
+class Pattern(object):
+    """String (or bytes) pattern compiled once for a search engine, so it can
+    be searched for in many texts without recomputing the engine's tables.
+    All engines find every occurrence of the pattern, including overlapping
+    occurrences, in n characters of text and m characters of pattern:
+    'native': str.find, which CPython implements in C with a skip table
+        for short patterns and the two-way algorithm for long ones
+    'kmp': Knuth-Morris-Pratt, O(n + m) time, never moves back in the text
+    'horspool': Boyer-Moore-Horspool, which skips up to m characters at a
+        time, so it is fastest for long patterns, but O(n * m) time at worst
+    'two_way': Crochemore-Perrin two-way, O(n + m) time and O(1) memory
+    Engine 'auto' chooses 'native', which is the fastest in CPython."""
+
+    def __init__(self, pattern, engine='auto'):
+        """Initialize this pattern and compute the tables of the given engine.
+        Running time: O(m) for a pattern of m characters.
+        Memory usage: O(m) for the prefix table (kmp) or skip table
+        (horspool), O(1) for native and two_way."""
+        if engine == 'auto':
+            engine = 'native'
+        if engine not in ENGINES:
+            raise ValueError('Unknown string search engine: {!r}'
+                             .format(engine))
+        self.pattern = pattern
+        self.engine = engine
+        if engine == 'kmp':
+            self.prefix_table = _prefix_table(pattern)
+        elif engine == 'horspool':
+            self.skip_table = _skip_table(pattern)
+        elif engine == 'two_way':
+            self.critical_position, self.period, self.periodic = \
+                _critical_factorization(pattern)
+
+    def __repr__(self):
+        """Return a string representation of this pattern."""
+        return 'Pattern({!r}, {!r})'.format(self.pattern, self.engine)
+
+    def finditer(self, text, start=0):
+        """Return an iterator over the starting index of each occurrence of
+        this pattern in text at or after the given start index. The empty
+        pattern occurs at every index of text."""
+        if not self.pattern:
+            return iter(range(start, len(text)))
+        if self.engine == 'native':
+            return _native_search(text, self.pattern, start)
+        if self.engine == 'kmp':
+            return _kmp_search(text, self.pattern, self.prefix_table, start)
+        if self.engine == 'horspool':
+            return _horspool_search(text, self.pattern, self.skip_table,
+                                    start)
+        return _two_way_search(text, self.pattern, self.critical_position,
+                               self.period, self.periodic, start)
+
+    def search(self, text, start=0):
+        """Return the starting index of the first occurrence of this pattern
+        in text at or after the given start index, or None if not found."""
+        if not self.pattern:
+            return start if start <= len(text) else None
+        return next(self.finditer(text, start), None)
+
+    def find_all(self, text, start=0):
+        """Return a list of starting indexes of all occurrences of this
+        pattern in text at or after the given start index."""
+        return list(self.finditer(text, start))
+
+    def contains(self, text):
+        """Return a boolean indicating whether this pattern occurs in text."""
+        return self.search(text) is not None
+
+
+def _native_search(text, pattern, start):
+    """Yield the starting index of each occurrence of pattern in text at or
+    after the given start index, using the str.find method."""
+    index = text.find(pattern, start)
+    while index != -1:
+        yield index
+        # Look again one character later to find overlapping occurrences
+        index = text.find(pattern, index + 1)
+
+
+def _prefix_table(pattern):
+    """Return the Knuth-Morris-Pratt prefix table of pattern: a list whose
+    item at each index i is the length of the longest proper prefix of
+    pattern[:i+1] that is also a suffix of it."""
+    table = [0] * len(pattern)
+    length = 0  # Length of the prefix that matches before index
+    for index in range(1, len(pattern)):
+        # Fall back to shorter prefixes until the next character extends one
+        while length > 0 and pattern[index] != pattern[length]:
+            length = table[length - 1]
+        if pattern[index] == pattern[length]:
+            length += 1
+        table[index] = length
+    return table
+
+
+def _kmp_search(text, pattern, table, start):
+    """Yield the starting index of each occurrence of pattern in text at or
+    after the given start index, using the Knuth-Morris-Pratt algorithm with
+    the given prefix table of pattern. Each character of text is read once.
+    Running time: O(n) amortized comparisons for n characters of text."""
+    length = len(pattern)
+    matched = 0  # Number of pattern characters matched before index
+    for index in range(start, len(text)):
+        char = text[index]
+        # On a mismatch, fall back to the longest prefix of pattern that
+        # still matches the text read so far
+        while matched > 0 and char != pattern[matched]:
+            matched = table[matched - 1]
+        if char == pattern[matched]:
+            matched += 1
+            if matched == length:
+                yield index - length + 1
+                # Continue from the longest proper prefix to find overlaps
+                matched = table[matched - 1]
+
+
+def _skip_table(pattern):
+    """Return the Boyer-Moore-Horspool skip table of pattern: a dict mapping
+    each character in pattern (except its last) to the distance from its
+    last occurrence to the end of pattern. Other characters skip the whole
+    pattern length."""
+    last = len(pattern) - 1
+    return {char: last - index for index, char in enumerate(pattern[:last])}
+
+
+def _horspool_search(text, pattern, skip_table, start):
+    """Yield the starting index of each occurrence of pattern in text at or
+    after the given start index, using the Boyer-Moore-Horspool algorithm
+    with the given skip table of pattern.
+    Running time: O(n / m) comparisons for n characters of text and m of
+    pattern at best, O(n * m) at worst."""
+    length = len(pattern)
+    last = length - 1
+    last_char = pattern[last]
+    index = start
+    stop = len(text) - length
+    while index <= stop:
+        # Check the last character of the window first, then the rest
+        char = text[index + last]
+        if char == last_char and text[index:index + last] == pattern[:last]:
+            yield index
+        # Align the last occurrence of the window's last character in
+        # pattern (or skip past it, if not in pattern) with it
+        index += skip_table.get(char, length)
+
+
+def _maximal_suffix(pattern, reverse):
+    """Return the start index minus one and the period of the maximal suffix
+    of pattern (its last suffix in lexicographic order), or in the reversed
+    alphabet order if reverse is True."""
+    suffix = -1  # Index before the start of the maximal suffix
+    index = 0
+    offset = 1
+    period = 1
+    while index + offset < len(pattern):
+        char = pattern[index + offset]
+        suffix_char = pattern[suffix + offset]
+        if (char > suffix_char) if reverse else (char < suffix_char):
+            # Suffix at index is smaller, so the period covers it
+            index += offset
+            offset = 1
+            period = index - suffix
+        elif char == suffix_char:
+            # Advance through the current period, or past it when complete
+            if offset != period:
+                offset += 1
+            else:
+                index += period
+                offset = 1
+        else:
+            # Suffix at index is larger, so it becomes the maximal suffix
+            suffix = index
+            index = suffix + 1
+            offset = 1
+            period = 1
+    return suffix, period
+
+
+def _critical_factorization(pattern):
+    """Return the critical position, period and whether the period is exact
+    (so pattern is periodic) of the two-way algorithm for pattern."""
+    suffix, period = _maximal_suffix(pattern, False)
+    reverse_suffix, reverse_period = _maximal_suffix(pattern, True)
+    # The later of both maximal suffixes starts a critical factorization
+    if reverse_suffix > suffix:
+        suffix, period = reverse_suffix, reverse_period
+    # Check if the left part of pattern repeats with the period
+    if pattern[:suffix + 1] == pattern[period:period + suffix + 1]:
+        return suffix, period, True
+    # Otherwise any shift up to this size is safe
+    period = max(suffix + 1, len(pattern) - suffix - 1) + 1
+    return suffix, period, False
+
+
+def _two_way_search(text, pattern, critical, period, periodic, start):
+    """Yield the starting index of each occurrence of pattern in text at or
+    after the given start index, using the Crochemore-Perrin two-way
+    algorithm with the given critical factorization of pattern. Each window
+    matches the right part of pattern from the critical position forward,
+    then the left part backward.
+    Running time: O(n) comparisons for n characters of text."""
+    length = len(pattern)
+    stop = len(text) - length
+    index = start
+    # Length of the pattern prefix known to match after a periodic shift,
+    # minus one (so -1 when nothing is known)
+    memory = -1
+    while index <= stop:
+        # Match the right part of pattern, skipping what memory knows
+        right = max(critical, memory) + 1 if periodic else critical + 1
+        while right < length and pattern[right] == text[index + right]:
+            right += 1
+        if right < length:
+            # Shift past the mismatch in the right part
+            index += right - critical
+            memory = -1
+            continue
+        # Match the left part of pattern backward
+        left = critical
+        low = memory if periodic else -1
+        while left > low and pattern[left] == text[index + left]:
+            left -= 1
+        if left <= low:
+            yield index
+        index += period
+        if periodic:
+            # The part of pattern before the last period is known to match
+            memory = length - period - 1
+
+
+class AhoCorasick(object):
+    """Aho-Corasick automaton that finds all occurrences of a set of patterns
+    in a text in a single pass, reading each character once no matter how
+    many patterns there are. The automaton is a trie of the patterns with
+    failure links. If it is small enough, they are compiled into a full
+    transition table, stored in one flat array with one row per trie node
+    and one column per distinct character in the patterns (plus one column
+    for all other characters), so each character of text takes one table
+    lookup. A table would take s * c entries for s trie nodes and c distinct
+    characters, which is too large for many patterns over a wide alphabet
+    (like thousands of Unicode keywords), so above MAX_TABLE_SIZE entries
+    the trie's own sparse child dicts are kept instead, and failure links
+    are followed while searching, in amortized O(1) steps per character."""
+
+    # Largest number of transition table entries (8 bytes each), above which
+    # transitions are kept sparse
+    MAX_TABLE_SIZE = 1 << 20
+
+    def __init__(self, patterns):
+        """Initialize this automaton with the given strings (or bytes)
+        patterns, ignoring duplicates. Raise ValueError if any is empty.
+        Running time: O(s * c) for s trie nodes (at most the total length of
+        all patterns) and c distinct characters in patterns, or O(s) with
+        sparse transitions.
+        Memory usage: O(min(s * c, MAX_TABLE_SIZE)) for the transition table,
+        plus O(s) for the trie."""
+        self.patterns = list(dict.fromkeys(patterns))
+        if not all(self.patterns):
+            raise ValueError('Patterns must not be empty')
+        # Number each distinct character from 1, saving 0 for all others
+        self.columns = {}
+        for pattern in self.patterns:
+            for char in pattern:
+                if char not in self.columns:
+                    self.columns[char] = len(self.columns) + 1
+        width = len(self.columns) + 1
+        # Build a trie of the patterns, with the pattern that ends at each
+        # node (or -1 if none)
+        children = [{}]
+        ends = [-1]
+        for number, pattern in enumerate(self.patterns):
+            node = 0
+            for char in pattern:
+                column = self.columns[char]
+                child = children[node].get(column)
+                if child is None:
+                    child = len(children)
+                    children.append({})
+                    ends.append(-1)
+                    children[node][column] = child
+                node = child
+            ends[node] = number
+        count = len(children)
+        sparse = count * width > self.MAX_TABLE_SIZE
+        # Each node's nearest node (itself or by failure links) where a
+        # pattern ends, or -1 if none
+        outputs = array('l', [-1]) * count
+        # Each node's next node by failure links where a pattern ends
+        output_links = array('l', [-1]) * count
+        failures = array('l', [0]) * count
+        self.width = width
+        self.children = children if sparse else None
+        self.failures = failures
+        # Fill transitions in breadth-first order: each node's row is the row
+        # of its failure node (the node of the longest proper suffix of its
+        # string in the trie), which is shallower and so already filled, with
+        # its own children replacing some entries
+        transitions = None if sparse else array('l', [0]) * (count * width)
+        nodes = deque()
+        for column, child in children[0].items():
+            if not sparse:
+                transitions[column] = child
+            nodes.append(child)
+        while nodes:
+            node = nodes.popleft()
+            failure = failures[node]
+            output_links[node] = outputs[failure]
+            outputs[node] = node if ends[node] >= 0 else output_links[node]
+            if sparse:
+                for column, child in children[node].items():
+                    failures[child] = self._sparse_next(failure, column)
+                    nodes.append(child)
+                continue
+            row = node * width
+            failure_row = failure * width
+            transitions[row:row + width] = \
+                transitions[failure_row:failure_row + width]
+            for column, child in children[node].items():
+                transitions[row + column] = child
+                failures[child] = transitions[failure_row + column]
+                nodes.append(child)
+        self.transitions = transitions
+        self.outputs = outputs
+        self.output_links = output_links
+        self.ends = array('l', ends)
+
+    def _sparse_next(self, node, column):
+        """Return the node reached from the given node by a character in the
+        given column with sparse transitions: the first trie child for it of
+        the node or of its nodes by failure links, or the root node if none."""
+        children = self.children
+        failures = self.failures
+        while True:
+            child = children[node].get(column)
+            if child is not None:
+                return child
+            if node == 0:
+                return 0
+            node = failures[node]
+
+    def __repr__(self):
+        """Return a string representation of this automaton."""
+        return 'AhoCorasick({} patterns, {} nodes)'.format(
+            len(self.patterns), len(self.ends))
+
+    def find_all(self, text):
+        """Return a list of (index, pattern) tuples for all occurrences of
+        all patterns in text, including overlapping ones, where index is the
+        starting index of pattern in text. Occurrences are in order of where
+        they end, and longer patterns first if they end at the same index.
+        Running time: O(n + k) for n characters of text and k occurrences."""
+        return AhoCorasickStream(self).feed(text)
+
+    def contains_any(self, text):
+        """Return a boolean indicating whether any pattern occurs in text,
+        stopping at the first occurrence."""
+        transitions = self.transitions
+        width = self.width
+        columns = self.columns
+        outputs = self.outputs
+        node = 0
+        for char in text:
+            if transitions is not None:
+                node = transitions[node * width + columns.get(char, 0)]
+            else:
+                node = self._sparse_next(node, columns.get(char, 0))
+            if outputs[node] >= 0:
+                return True
+        return False
+
+    def stream(self):
+        """Return a new AhoCorasickStream to search text that arrives in
+        chunks for all patterns of this automaton."""
+        return AhoCorasickStream(self)
+
+
+class AhoCorasickStream(object):
+    """Search state of an Aho-Corasick automaton over a text that arrives in
+    chunks, so occurrences that span chunk boundaries are found and indexes
+    are relative to the start of the whole text."""
+
+    def __init__(self, automaton):
+        """Initialize this stream to search with the given automaton."""
+        self.automaton = automaton
+        self.reset()
+
+    def __repr__(self):
+        """Return a string representation of this stream."""
+        return 'AhoCorasickStream({!r}, offset={})'.format(self.automaton,
+                                                           self.offset)
+
+    def reset(self):
+        """Start searching a new text from its beginning."""
+        self.node = 0
+        self.offset = 0  # Number of characters fed so far
+
+    def feed(self, chunk):
+        """Search the given next chunk of text and return a list of (index,
+        pattern) tuples for all occurrences of patterns that end in it, with
+        the index of pattern's start in the whole text fed so far.
+        Running time: O(n + k) for n characters of chunk and k occurrences."""
+        automaton = self.automaton
+        transitions = automaton.transitions
+        width = automaton.width
+        columns = automaton.columns
+        outputs = automaton.outputs
+        output_links = automaton.output_links
+        ends = automaton.ends
+        patterns = automaton.patterns
+        matches = []
+        node = self.node
+        # Index of the character after the current one in the whole text
+        end = self.offset
+        for char in chunk:
+            if transitions is not None:
+                node = transitions[node * width + columns.get(char, 0)]
+            else:
+                node = automaton._sparse_next(node, columns.get(char, 0))
+            end += 1
+            # Report patterns ending here, from longest to shortest
+            output = outputs[node]
+            while output >= 0:
+                pattern = patterns[ends[output]]
+                matches.append((end - len(pattern), pattern))
+                output = output_links[output]
+        self.node = node
+        self.offset = end
+        return matches
 
 
 def test_string_algorithms(text, pattern):
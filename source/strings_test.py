@@ -1,6 +1,10 @@
 #!python
 
-from strings import contains, find_index, find_all_indexes
+from strings import contains, find_index, find_all_indexes, Pattern, \
+    ENGINES, AhoCorasick, find_all_indexes_stream
+import io
+import mmap
+import random
 import unittest
 
 
@@ -118,5 +122,224 @@ class StringsTest(unittest.TestCase):
         # ...
 
 
+def brute_force_indexes(text, pattern):
+    """Return the starting indexes of pattern in text by checking each one."""
+    if not pattern:
+        return list(range(len(text)))
+    return [index for index in range(len(text) - len(pattern) + 1)
+            if text[index:index + len(pattern)] == pattern]
+
+
+class PatternTest(unittest.TestCase):
+
+    def test_engines_with_examples(self):
+        for engine in ENGINES + ('auto',):
+            assert contains('abc', '', engine) is True
+            assert contains('abc', 'ac', engine) is False
+            assert find_index('abra cadabra', 'adab', engine) == 6
+            assert find_index('abc', 'abz', engine) is None
+            assert find_all_indexes('aaa', 'aa', engine) == [0, 1]
+            assert find_all_indexes('abcabcdabcde', 'abcd', engine) == [3, 7]
+            assert find_all_indexes('abc', '', engine) == [0, 1, 2]
+            assert find_all_indexes('', 'a', engine) == []
+
+    def test_engines_match_brute_force(self):
+        rand = random.Random(0)
+        for _ in range(2000):
+            alphabet = rand.choice(['a', 'ab', 'abc'])
+            text = ''.join(rand.choice(alphabet)
+                           for _ in range(rand.randint(0, 30)))
+            pattern = ''.join(rand.choice(alphabet)
+                              for _ in range(rand.randint(1, 6)))
+            expected = brute_force_indexes(text, pattern)
+            for engine in ENGINES:
+                assert find_all_indexes(text, pattern, engine) == expected
+
+    def test_engines_on_worst_case_texts(self):
+        # Patterns that almost match everywhere make naive search quadratic
+        text = 'a' * 2000
+        for engine in ENGINES:
+            assert Pattern('a' * 50 + 'b', engine).find_all(text) == []
+            assert Pattern('b' + 'a' * 50, engine).find_all(text) == []
+            assert len(Pattern('a' * 50, engine).find_all(text)) == 1951
+
+    def test_pattern_searched_in_many_texts(self):
+        for engine in ENGINES:
+            pattern = Pattern('abab', engine)
+            assert pattern.find_all('abababab') == [0, 2, 4]
+            assert pattern.search('xxabab') == 2
+            assert pattern.search('ababab', 1) == 2
+            assert pattern.search('abba') is None
+            assert pattern.find_all('abababab', 3) == [4]
+            assert pattern.contains('bababa') is True
+            assert pattern.contains('baab') is False
+
+    def test_pattern_tables(self):
+        assert Pattern('abacabab', 'kmp').prefix_table == \
+            [0, 0, 1, 0, 1, 2, 3, 2]
+        assert Pattern('abcab', 'horspool').skip_table == \
+            {'a': 1, 'b': 3, 'c': 2}
+        pattern = Pattern('abab', 'two_way')
+        assert pattern.period == 2 and pattern.periodic is True
+
+    def test_pattern_with_bytes(self):
+        for engine in ENGINES:
+            pattern = Pattern(b'aba', engine)
+            assert pattern.find_all(b'abababa') == [0, 2, 4]
+
+    def test_empty_pattern(self):
+        for engine in ENGINES:
+            assert Pattern('', engine).search('') == 0
+            assert Pattern('', engine).search('ab', 2) == 2
+            assert Pattern('', engine).find_all('ab') == [0, 1]
+
+    def test_unknown_engine(self):
+        with self.assertRaises(ValueError):
+            Pattern('abc', 'bogus')
+
+
+class SparseAhoCorasick(AhoCorasick):
+    """Aho-Corasick automaton that always keeps transitions sparse."""
+    MAX_TABLE_SIZE = 0
+
+
+class AhoCorasickTest(unittest.TestCase):
+
+    def test_find_all_with_overlapping_patterns(self):
+        automaton = AhoCorasick(['he', 'she', 'his', 'hers'])
+        assert automaton.find_all('ushers') == \
+            [(1, 'she'), (2, 'he'), (2, 'hers')]
+        assert automaton.find_all('ahishers') == \
+            [(1, 'his'), (3, 'she'), (4, 'he'), (4, 'hers')]
+        assert automaton.find_all('xyz') == []
+        assert automaton.find_all('') == []
+
+    def test_find_all_with_repeated_and_nested_patterns(self):
+        automaton = AhoCorasick(['a', 'aa', 'aaa', 'a'])
+        assert automaton.patterns == ['a', 'aa', 'aaa']
+        assert automaton.find_all('aaa') == \
+            [(0, 'a'), (0, 'aa'), (1, 'a'), (0, 'aaa'), (1, 'aa'), (2, 'a')]
+
+    def test_find_all_matches_single_pattern_search(self):
+        rand = random.Random(1)
+        for _ in range(500):
+            patterns = [''.join(rand.choice('abc')
+                                for _ in range(rand.randint(1, 4)))
+                        for _ in range(rand.randint(1, 8))]
+            text = ''.join(rand.choice('abcd')
+                           for _ in range(rand.randint(0, 40)))
+            expected = sorted((index, pattern) for pattern in set(patterns)
+                              for index in brute_force_indexes(text, pattern))
+            for automaton_class in [AhoCorasick, SparseAhoCorasick]:
+                automaton = automaton_class(patterns)
+                assert sorted(automaton.find_all(text)) == expected
+                assert automaton.contains_any(text) == bool(expected)
+
+    def test_contains_any(self):
+        automaton = AhoCorasick(['spam', 'scam'])
+        assert automaton.contains_any('this call is a scam') is True
+        assert automaton.contains_any('this call is fine') is False
+
+    def test_stream_finds_patterns_across_chunks(self):
+        automaton = AhoCorasick(['+1900', '0042'])
+        stream = automaton.stream()
+        assert stream.feed('call +19') == []
+        assert stream.feed('0042 ') == [(5, '+1900'), (8, '0042')]
+        assert stream.feed('+1900') == [(13, '+1900')]
+        assert stream.offset == 18
+        stream.reset()
+        assert stream.feed('0042') == [(0, '0042')]
+
+    def test_stream_matches_find_all_for_any_chunks(self):
+        rand = random.Random(2)
+        automaton = AhoCorasick(['ab', 'bab', 'abba', 'b'])
+        text = ''.join(rand.choice('ab') for _ in range(300))
+        expected = automaton.find_all(text)
+        for size in [1, 2, 3, 7, 100]:
+            stream = automaton.stream()
+            found = []
+            for start in range(0, len(text), size):
+                found.extend(stream.feed(text[start:start + size]))
+            assert found == expected
+
+    def test_sparse_transitions_for_wide_alphabets(self):
+        rand = random.Random(3)
+        patterns = [''.join(chr(rand.randrange(0x4e00, 0x4e00 + 5000))
+                            for _ in range(4)) for _ in range(2000)]
+        automaton = AhoCorasick(patterns)
+        # A full table would hold millions of entries
+        assert automaton.transitions is None
+        text = 'x' + patterns[7] + patterns[42][:2] + patterns[42]
+        found = automaton.find_all(text)
+        assert (1, patterns[7]) in found
+        assert (7, patterns[42]) in found
+        assert automaton.contains_any(text) is True
+        assert automaton.contains_any('no keywords here') is False
+        assert AhoCorasick(['he', 'she']).transitions is not None
+
+    def test_bytes_patterns(self):
+        automaton = AhoCorasick([b'GET', b'POST'])
+        assert automaton.find_all(b'GET / POST /x') == \
+            [(0, b'GET'), (6, b'POST')]
+
+    def test_empty_pattern(self):
+        with self.assertRaises(ValueError):
+            AhoCorasick(['abc', ''])
+
+
+class StreamingSearchTest(unittest.TestCase):
+
+    def test_stream_matches_straddling_chunk_boundaries(self):
+        text = 'abra cadabra abracadabra'
+        expected = find_all_indexes(text, 'abra')
+        for engine in ENGINES:
+            for chunk_size in [1, 2, 3, 4, 5, 100]:
+                found = find_all_indexes_stream(io.StringIO(text), 'abra',
+                                                chunk_size, engine)
+                assert list(found) == expected
+
+    def test_stream_overlapping_occurrences(self):
+        for chunk_size in [1, 2, 3]:
+            found = find_all_indexes_stream('aaaaa', 'aaa', chunk_size)
+            assert list(found) == [0, 1, 2]
+
+    def test_stream_binary_file_and_chunk_iterator(self):
+        data = b'call +1900 ok\ncall +1555 ok\ncall +1900 fraud\n'
+        found = find_all_indexes_stream(io.BytesIO(data), b'+1900', 4)
+        assert list(found) == [5, 33]
+        chunks = iter([b'call +19', b'00', b' ok +', b'1900'])
+        found = find_all_indexes_stream(chunks, b'+1900', engine='kmp')
+        assert list(found) == [5, 14]
+
+    def test_stream_mmap(self):
+        with mmap.mmap(-1, 4096) as mapped:
+            mapped[1000:1005] = b'fraud'
+            mapped[4091:4096] = b'fraud'
+            for engine in ENGINES:
+                found = find_all_indexes_stream(mapped, b'fraud', 512, engine)
+                assert list(found) == [1000, 4091]
+
+    def test_stream_is_lazy(self):
+        def chunks():
+            yield 'abc abc'
+            raise AssertionError('read past the first occurrence')
+        found = find_all_indexes_stream(chunks(), 'abc')
+        assert next(found) == 0
+        assert next(found) == 4
+
+    def test_stream_matches_find_all_indexes(self):
+        rand = random.Random(3)
+        for _ in range(300):
+            text = ''.join(rand.choice('ab')
+                           for _ in range(rand.randint(0, 40)))
+            pattern = ''.join(rand.choice('ab')
+                              for _ in range(rand.randint(0, 4)))
+            chunk_size = rand.randint(1, 6)
+            for engine in ENGINES:
+                found = find_all_indexes_stream(io.StringIO(text), pattern,
+                                                chunk_size, engine)
+                assert list(found) == find_all_indexes(text, pattern)
+
+
 if __name__ == '__main__':
     unittest.main()